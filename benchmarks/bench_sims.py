@@ -0,0 +1,139 @@
+r"""Crude CPU/GPU timings of the simulation variants, not part of the tests
+
+Usage:
+    ``python benchmarks/bench_sims.py [names ...]``
+
+Runs all benchmarks when no names are given, see ``BENCHMARKS``.
+"""
+import os
+import sys
+import time
+
+import torch
+from torch import tensor
+
+from mrphy import γH, dt0
+from mrphy import beffective, sims, slowsims, mobjs
+
+device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+dkw = {'dtype': torch.float64, 'device': device}
+γ, dt = γH.to(**dkw), dt0.to(**dkw)
+T1, T2 = tensor([[1.]], **dkw), tensor([[4e-2]], **dkw)
+
+
+def _timeit(fn, *, nRepeat=1):
+    if device.type == 'cuda':
+        torch.cuda.synchronize()
+    t = time.time()
+    for _ in range(nRepeat):
+        fn()
+    if device.type == 'cuda':
+        torch.cuda.synchronize()
+    return (time.time()-t)/nRepeat
+
+
+def _spins(N, nM, nT):
+    M0 = torch.rand((N, nM, 3), **dkw).requires_grad_()
+    beff = (torch.rand((N, nM, 3, nT), **dkw)-0.5).requires_grad_()
+    return M0, beff
+
+
+def _fwdbwd(fn, M0, beff, **kw):
+    return lambda: torch.sum(fn(M0, beff, **kw)).backward()
+
+
+def bench_engines():
+    M0, beff = _spins(1, 256, 2000)
+    kw = {'T1': T1, 'T2': T2, 'γ': γ, 'dt': dt}
+    _fwdbwd(sims.blochsim, M0, beff, engine='jit', **kw)()  # compilation
+    for engine in ('loop', 'jit'):
+        dur = _timeit(_fwdbwd(sims.blochsim, M0, beff, engine=engine, **kw))
+        print(f'forward+backward, engine={engine}: {dur:.3f}s')
+
+
+def bench_threads():
+    M0, beff = _spins(2, 4096, 500)
+    kw = {'T1': T1, 'T2': T2, 'γ': γ, 'dt': dt}
+    nCores = os.cpu_count() or 1
+    for nThreads in sorted({1, nCores} | {2**i for i in
+                                          range(nCores.bit_length())}):
+        dur = _timeit(_fwdbwd(sims.blochsim, M0, beff, nThreads=nThreads,
+                              **kw))
+        print(f'forward+backward, nThreads={nThreads}: {dur:.3f}s')
+
+
+def bench_history():
+    M0, beff = _spins(2, 256, 2000)
+    kw = {'T1': T1, 'T2': T2, 'γ': γ, 'dt': dt}
+    for kw_ in ({}, {'ckpt': 'sqrt'}, {'doReversible': True},
+                {'cacheRot': True}):
+        dur = _timeit(_fwdbwd(sims.blochsim, M0, beff, **kw, **kw_))
+        print(f'forward+backward, {kw_}: {dur:.3f}s')
+
+
+def bench_hvp():
+    N, nM, nT = 2, 8, 256
+    M0, beff = _spins(N, nM, nT)
+    xs = (M0, beff)
+    vs = tuple(torch.randn_like(x) for x in xs)
+
+    def fn_hvp(fn):
+        Mo = fn(M0, beff, T1=T1, T2=T2, γ=γ, dt=dt)
+        gs = torch.autograd.grad(torch.sum(Mo*Mo), xs, create_graph=True)
+        torch.autograd.grad(sum(torch.sum(g*v) for g, v in zip(gs, vs)), xs)
+
+    for fn in (slowsims.blochsim, sims.blochsim):
+        dur = _timeit(lambda: fn_hvp(fn))
+        print(f'hvp, {fn.__module__}.{fn.__name__}: {dur:.3f}s')
+
+
+def bench_scan():
+    M0, beff = _spins(1, 256, 2000)
+    kw = {'T1': T1, 'T2': T2, 'γ': γ, 'dt': dt}
+    for fn in (sims.blochsim, sims.blochsim_scan):
+        dur = _timeit(_fwdbwd(fn, M0, beff, **kw))
+        print(f'forward+backward, sims.{fn.__name__}: {dur:.3f}s')
+
+
+def bench_rfgr2beff():
+    N, Nd, nT, nCoils = 1, (32, 32, 32), 256, 32
+    loc = torch.rand((N, *Nd, 3), **dkw)-0.5
+    rf = torch.rand((N, 2, nT, nCoils), **dkw)
+    gr = torch.rand((N, 3, nT), **dkw)
+    b1Map = torch.rand((N, *Nd, 2, nCoils), **dkw)
+    out = loc.new_empty((N, *Nd, 3, nT))
+    for kw in ({}, {'out': out}):
+        dur = _timeit(lambda: beffective.rfgr2beff(rf, gr, loc, b1Map=b1Map,
+                                                   **kw))
+        print(f'rfgr2beff, nCoils={nCoils}, {list(kw)}: {dur:.3f}s')
+
+
+def bench_beff2ab():
+    beff = torch.rand((1, 64, 64, 3, 1000), **dkw)-0.5
+    kw = {'E1': tensor(.99, **dkw), 'E2': tensor(.9, **dkw), 'γ': γ, 'dt': dt}
+    for kw_ in ({}, {'blkSize': 64}):
+        dur = _timeit(lambda: beffective.beff2ab(beff, **kw, **kw_))
+        print(f'beff2ab, {kw_}: {dur:.3f}s')
+
+
+def bench_steadystate():
+    cube, pulse = mobjs.Examples.spincube(), mobjs.Examples.pulse()
+    dur = tensor(1e-2)
+
+    def fn_loop(nTR=300):
+        op = pulse.to_operator(cube)
+        for _ in range(nTR):
+            cube.M_ = op(cube.M_)
+            cube.freeprec(dur, doUpdate=True)
+
+    print(f'steadystate: {_timeit(lambda: cube.steadystate(pulse, dur)):.3f}s')
+    print(f'300 TRs, w/ to_operator: {_timeit(fn_loop):.3f}s')
+
+
+BENCHMARKS = {k[6:]: v for k, v in dict(globals()).items()
+              if k.startswith('bench_')}
+
+if __name__ == '__main__':
+    for name in (sys.argv[1:] or BENCHMARKS):
+        print(f'\n{name}:')
+        BENCHMARKS[name]()
@@ -3,16 +3,12 @@ r"""B-effective related functions"""
 import torch
 import torch.nn.functional as F
 from torch import tensor, Tensor
-from typing import Optional, Tuple
+from typing import Iterable, Optional, Tuple
 
 from mrphy import γH, dt0, π
-from mrphy import utils
 
-# TODO:
-# - Faster init of AB in `beff2ab`
-
-
-__all__ = ['beff2ab', 'beff2uφ', 'rfgr2beff']
+__all__ = ['ab_compose', 'ab_power', 'ab_reduce', 'beff2ab', 'beff2ab_steps',
+           'beff2uφ', 'rfgr2beff']
 
 
 def beff2uϕ(beff: Tensor, γ2πdt: Tensor, *, dim=-1) -> Tuple[Tensor, Tensor]:
@@ -40,76 +36,266 @@ def beff2uϕ(beff: Tensor, γ2πdt: Tensor, *, dim=-1) -> Tuple[Tensor, Tensor]:
 def beff2ab(
     beff: Tensor, *,
     E1: Tensor = tensor(0.), E2: Tensor = tensor(0.), γ: Tensor = γH,
-    dt: Tensor = dt0
+    dt: Tensor = dt0, blkSize: Optional[int] = None
 ) -> Tuple[Tensor, Tensor]:
     r"""Compute Hargreave's 𝐴/𝐵, mat/vec, from B-effectives
 
     See: `doi:10.1002/mrm.1170 <https://doi.org/10.1002/mrm.1170>`_.
 
     Usage:
-        ``A, B = beff2ab(beff, *, E1, E2, γ, dt)``
+        ``A, B = beff2ab(beff, *, E1, E2, γ, dt, blkSize)``
 
     Inputs:
         - ``beff``: `(N,*Nd,xyz,nT)`, B-effective.
     Optionals:
-        - ``T1``: `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Sec", T1 relaxation.
-        - ``T2``: `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Sec", T2 relaxation.
+        - ``E1``: `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, a.u., T1 decay per step, \
+          ``exp(-dt/T1)``.
+        - ``E2``: `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, a.u., T2 decay per step, \
+          ``exp(-dt/T2)``.
         - ``γ``:  `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Hz/Gauss", gyro ratio.
         - ``dt``: `()` ⊻ `(N ⊻ 1,)`, "Sec", dwell time.
+        - ``blkSize``: int ⊻ ``None``, compose time in blocks of \
+          ``blkSize`` steps: per step maps of a block are computed at once, \
+          :func:`beff2ab_steps`, and composed in a tree; blocks are composed \
+          in order. Default, ``None``, steps in-place without allocations or \
+          host syncs; under autograd, where in-place steps are not allowed, \
+          it falls back to blocks of `64`.
     Outputs:
         - ``A``: `(N, *Nd, xyz, 3)`, `A[:,iM,:,:]`, is the `iM`-th 𝐴.
         - ``B``: `(N, *Nd, xyz)`, `B[:,iM,:]`, is the `iM`-th 𝐵.
     """
-    shape = beff.shape
     device, dtype, ndim = beff.device, beff.dtype, beff.ndim-2
+    NNd, nT = beff.shape[0:-2], beff.shape[-1]
 
-    dkw = {'device': device, 'dtype': dtype}
     E1, E2, γ, dt = (x.to(device) for x in (E1, E2, γ, dt))
 
     # reshaping
-    E1, E2, γ, dt = (x.reshape(x.shape+(ndim-x.ndim)*(1,))
-                     for x in (E1, E2, γ, dt))  # (N, *Nd) compatible
+    E1, E2, γ, dt = (x.reshape(x.shape+(ndim-x.ndim)*(1,)+(1, 1))
+                     for x in (E1, E2, γ, dt))  # (N, *Nd, 1, 1) compatible
 
-    E1, E2, γ2πdt = E1[..., None], E2[..., None, None], 2*π*γ*dt
-    E1_1 = E1.squeeze(dim=-1) - 1
+    γ2πdt = 2*π*γ*dt
+    E = torch.cat(torch.broadcast_tensors(E2, E2, E1), dim=-2)  # (..., xyz, 1)
 
-    # C/Python `reshape/view` is different from Fortran/MatLab/Julia `reshape`
-    NNd, nT = shape[0:-2], shape[-1]
-    s1, s0 = NNd+(1, 1), NNd+(1, 4)
+    if blkSize is None and torch.is_grad_enabled() and any(
+            x.requires_grad for x in (beff, E1, E2, γ, dt)):
+        blkSize = 64
 
-    AB = torch.cat([torch.ones(s1, **dkw), torch.zeros(s0, **dkw),
-                    torch.ones(s1, **dkw), torch.zeros(s0, **dkw),
-                    torch.ones(s1, **dkw), torch.zeros(s1, **dkw)],
-                   dim=-1).view(NNd+(3, 4))  # -> (N, *Nd, xyz, 3+1)
+    if blkSize is None:
+        AB = torch.eye(3, 4, device=device, dtype=dtype).expand(NNd+(3, 4))
+        AB = AB.contiguous()  # -> (N, *Nd, xyz, 3+1)
+        _ab_sweep_(AB, beff, γ2πdt, E, E1-1)
+    else:
+        AB = None
+        for t in range(0, nT, blkSize):
+            AB1 = ab_reduce(_ab_steps(beff[..., t:t+blkSize], γ2πdt[..., 0],
+                                      E[..., None, :, :]))
+            AB = AB1 if AB is None else ab_compose(AB1, AB)
 
-    # simulation
-    for t in range(nT):
-        u, ϕ = beff2uϕ(beff[..., t], γ2πdt)
+    A, B = AB[..., 0:3], AB[..., 3]
 
-        if torch.any(ϕ != 0):
-            AB1 = utils.uϕrot(u, ϕ, AB)
-        else:
-            AB1 = AB
+    return A, B
+
+
+def _ab_sweep_(AB: Tensor, beff: Tensor, γ2πdt: Tensor, E: Tensor,
+               e1_1: Tensor) -> Tensor:
+    r"""Apply the steps of ``beff`` onto ``AB``, in-place
+
+    Each step rotates, ``cϕ⋅AB + sϕ⋅u×AB + (1-cϕ)⋅u(uᵀAB)``, and relaxes.
+    All intermediates are preallocated, and there is no host sync, steps with
+    zero B-effective have ``u = 0``, ``ϕ = 0``, an identity rotation.
+
+    Inputs:
+        - ``AB``: `(N, *Nd, xyz, 3+1)`, contiguous, affine map to apply on.
+        - ``beff``: `(N, *Nd, xyz, nT)`, "Gauss", B-effective.
+        - ``γ2πdt``: `(N ⊻ 1, *Nd ⊻ 1, 1, 1)`, "rad/Gauss".
+        - ``E``: `(N ⊻ 1, *Nd ⊻ 1, xyz, 1)`, relaxation, `(E2, E2, E1)`.
+        - ``e1_1``: `(N ⊻ 1, *Nd ⊻ 1, 1, 1)`, ``E1-1``.
+    Outputs:
+        - ``AB``: `(N, *Nd, xyz, 3+1)`, the input ``AB``, updated.
+    """
+    NNd = AB.shape[:-2]
+    u = AB.new_empty(NNd+(3, 1))
+    ϕ, cϕ, sϕ = (AB.new_empty(NNd+(1, 1)) for _ in range(3))
+    utAB, uxAB = AB.new_empty(NNd+(1, 4)), AB.new_empty(NNd+(3, 4))
+
+    for t in range(beff.shape[-1]):
+        torch.mul(beff[..., t:t+1], γ2πdt, out=u)
+        torch.linalg.vector_norm(u, dim=-2, keepdim=True, out=ϕ)
+        torch.cos(ϕ, out=cϕ)
+        torch.sin(ϕ, out=sϕ).neg_()  # negate: BxM -> MxB
+        u.div_(ϕ.clamp_(min=1e-30))
+
+        # Rotation
+        torch.matmul(u.transpose(-1, -2), AB, out=utAB)
+        torch.cross(u, AB, dim=-2, out=uxAB)
+        AB.mul_(cϕ).addcmul_(uxAB, sϕ)
+        AB.addcmul_(u, utAB.mul_(cϕ.sub_(1)), value=-1)
 
         # Relaxation
-        AB1[..., 0:2, :] *= E2
-        AB1[..., 2, :] *= E1
-        AB1[..., 2, 3] -= E1_1
-        AB, AB1 = AB1, AB
+        AB.mul_(E)
+        AB[..., 2:3, 3:4].sub_(e1_1)
 
-    A, B = AB[..., 0:3], AB[..., 3]
+    return AB
 
-    return A, B
+
+def beff2ab_steps(
+    beff: Tensor, *,
+    T1: Optional[Tensor] = None, T2: Optional[Tensor] = None,
+    γ: Tensor = γH, dt: Tensor = dt0
+) -> Tensor:
+    r"""Compute per time step 𝐴/𝐵 affine maps, vectorized, from B-effectives
+
+    Each step of a Bloch simulation is an affine map, 𝑀 → 𝐴𝑀 + 𝐵, with 𝐴 the
+    rotation of :func:`~mrphy.utils.uϕrot` followed by relaxation. This
+    function computes the `(3, 3+1)` matrices, ``[𝐴 | 𝐵]``, of all steps at
+    once, without a loop over time.
+
+    Usage:
+        ``AB = beff2ab_steps(beff, *, T1, T2, γ, dt)``
+
+    Inputs:
+        - ``beff``: `(N,*Nd,xyz,nT)`, B-effective.
+    Optionals:
+        - ``T1``: `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Sec", T1 relaxation.
+        - ``T2``: `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Sec", T2 relaxation.
+        - ``γ``:  `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Hz/Gauss", gyro ratio.
+        - ``dt``: `()` ⊻ `(N ⊻ 1,)`, "Sec", dwell time.
+    Outputs:
+        - ``AB``: `(N, *Nd, nT, xyz, 3+1)`, ``AB[..., t, :, :]`` is the \
+          ``[𝐴 | 𝐵]`` of the `t`-th step.
+
+    See Also:
+        :func:`~mrphy.beffective.beff2ab`
+    """
+    device, ndim = beff.device, beff.ndim-2
+    γ, dt = (x.to(device) for x in (γ, dt))
+    γ, dt = (x.reshape(x.shape+(ndim-x.ndim)*(1,)) for x in (γ, dt))
+
+    assert((T1 is None) == (T2 is None))  # both or neither
+    if T1 is None:
+        E = None
+    else:
+        T1, T2 = (x.to(device) for x in (T1, T2))
+        T1, T2 = (x.reshape(x.shape+(ndim-x.ndim)*(1,)) for x in (T1, T2))
+        E1, E2 = (torch.exp(-dt/x)[..., None, None, None] for x in (T1, T2))
+        E = torch.cat((E2, E2, E1), dim=-2)  # -> (N, *Nd, 1, xyz, 1)
+
+    return _ab_steps(beff, (2*π*γ*dt)[..., None], E)
+
+
+def _ab_steps(beff: Tensor, γ2πdt: Tensor, E: Optional[Tensor]) -> Tensor:
+    r"""Per time step 𝐴/𝐵 affine maps, see :func:`beff2ab_steps`
+
+    Inputs:
+        - ``beff``: `(N, *Nd, xyz, nT)`, "Gauss", B-effective.
+        - ``γ2πdt``: `(N ⊻ 1, *Nd ⊻ 1, 1)`, "rad/Gauss".
+        - ``E``: `(N ⊻ 1, *Nd ⊻ 1, 1, xyz, 1)` ⊻ ``None``, relaxation, \
+          `(E2, E2, E1)`, ``None`` for no relaxation.
+    Outputs:
+        - ``AB``: `(N, *Nd, nT, xyz, 3+1)`.
+    """
+    beff = beff.movedim(-1, -2)  # -> (N, *Nd, nT, xyz)
+    u, ϕ = beff2uϕ(beff, γ2πdt)  # (N,*Nd,nT,xyz), (N,*Nd,nT)
+
+    # R = cϕ⋅I + (1-cϕ)⋅uuᵀ + sϕ⋅[u]ₓ, `[u]ₓ` for the cross product matrix.
+    cϕ, sϕ = torch.cos(ϕ)[..., None, None], torch.sin(ϕ)[..., None, None]
+    ux, uy, uz = u.unbind(dim=-1)
+    zero = torch.zeros_like(ux)
+    u_x = torch.stack((zero, -uz, uy,
+                       uz, zero, -ux,
+                       -uy, ux, zero), dim=-1).unflatten(-1, (3, 3))
+
+    dkw = {'device': beff.device, 'dtype': beff.dtype}
+    A = (cϕ*torch.eye(3, **dkw) + (1-cϕ)*(u[..., None]*u[..., None, :])
+         + sϕ*u_x)  # -> (N, *Nd, nT, xyz, 3)
+    B = torch.zeros(A.shape[:-1]+(1,), **dkw)
+
+    if E is not None:
+        A = A*E
+        B = B + (1-E)*tensor([[0.], [0.], [1.]], **dkw)
+
+    AB = torch.cat((A, B), dim=-1)  # -> (N, *Nd, nT, xyz, 3+1)
+    return AB
+
+
+def ab_compose(AB2: Tensor, AB1: Tensor) -> Tensor:
+    r"""Compose affine maps, ``[𝐴₂ | 𝐵₂]∘[𝐴₁ | 𝐵₁] = [𝐴₂𝐴₁ | 𝐴₂𝐵₁+𝐵₂]``
+
+    Usage:
+        ``AB = ab_compose(AB2, AB1)``
+    Inputs:
+        - ``AB2``: `(..., xyz, 3+1)`, the affine map applied second.
+        - ``AB1``: `(..., xyz, 3+1)`, the affine map applied first.
+    Outputs:
+        - ``AB``: `(..., xyz, 3+1)`, ``AB2∘AB1``, broadcasted.
+    """
+    AB = AB2[..., 0:3] @ AB1
+    AB[..., 3] += AB2[..., 3]
+    return AB
+
+
+def ab_reduce(AB: Tensor) -> Tensor:
+    r"""Compose ``AB[..., t, :, :]`` over ``t`` by pairwise tree reduction
+
+    Depth is ``ceil(log2(nT))``, each level composes all its pairs in one
+    batched ``matmul``, so parallelism is across time as well as spins.
+
+    Usage:
+        ``AB = ab_reduce(AB)``
+    Inputs:
+        - ``AB``: `(..., nT, xyz, 3+1)`, per step affine maps in time order, \
+          e.g., from :func:`beff2ab_steps`.
+    Outputs:
+        - ``AB``: `(..., xyz, 3+1)`, the affine map of all ``nT`` steps.
+    """
+    while AB.shape[-3] > 1:
+        n = AB.shape[-3]
+        AB_pairs = ab_compose(AB[..., 1:n:2, :, :], AB[..., 0:n-1:2, :, :])
+        AB = (AB_pairs if n % 2 == 0 else
+              torch.cat((AB_pairs, AB[..., n-1:n, :, :]), dim=-3))
+    return AB[..., 0, :, :]
+
+
+def ab_power(AB: Tensor, n: Tensor) -> Tensor:
+    r"""Compose ``AB[..., t, :, :]`` with itself ``n[t]`` times
+
+    Uses repeated squaring, i.e., ``ceil(log2(max(n)+1))`` levels of batched
+    compositions.
+
+    Usage:
+        ``AB = ab_power(AB, n)``
+    Inputs:
+        - ``AB``: `(..., nT, xyz, 3+1)`, affine maps.
+        - ``n``: `(nT,)`, int, non-negative exponents.
+    Outputs:
+        - ``AB``: `(..., nT, xyz, 3+1)`, ``AB[..., t, :, :]`` to the \
+          ``n[t]``-th power.
+    """
+    n = n.to(device=AB.device)
+    ABo = torch.eye(3, 4, device=AB.device, dtype=AB.dtype).expand_as(AB)
+    while True:
+        odd = (n % 2 == 1)[:, None, None]
+        ABo = torch.where(odd, ab_compose(AB, ABo), ABo)
+        n = n // 2
+        if not torch.any(n):
+            break
+        AB = ab_compose(AB, AB)
+    return ABo
 
 
 def rfgr2beff(
     rf: Tensor, gr: Tensor, loc: Tensor, *,
-    Δf: Optional[Tensor] = None, b1Map: Optional[Tensor] = None, γ: Tensor = γH
+    Δf: Optional[Tensor] = None, b1Map: Optional[Tensor] = None,
+    γ: Tensor = γH, out: Optional[Tensor] = None
 ) -> Tensor:
     r"""Compute B-effectives from rf and gradients
 
+    Coils are combined as one batched matmul, of ``b1Map`` as real matrices,
+    see :func:`_rfgr2beff_prep`, written into ``beff`` directly, without
+    temporaries of `nCoils` times the size of ``beff``.
+
     Usage:
-        ``beff = rfgr2beff(rf, gr, loc, *, Δf, b1Map, γ)``
+        ``beff = rfgr2beff(rf, gr, loc, *, Δf, b1Map, γ, out)``
     Inputs:
         - ``rf``: `(N,xy,nT,(nCoils))`, "Gauss", `xy` for separating real and \
           imag part.
@@ -117,46 +303,144 @@ def rfgr2beff(
         - ``loc``: `(N,*Nd,xyz)`, "cm", locations.
     Optionals:
         - ``Δf``: `(N,*Nd,)`, "Hz", off-resonance.
-        - ``b1Map``: `(N, *Nd, xy (, nCoils)`, a.u., transmit sensitivity.
+        - ``b1Map``: `(N ⊻ 1, *Nd ⊻ 1, xy (, nCoils)`, a.u., transmit \
+          sensitivity.
         - ``γ``:  `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Hz/Gauss", gyro ratio.
+        - ``out``: `(N,*Nd,xyz,nT)`, contiguous, in-place holder of ``beff``.
     Outputs:
         - ``beff``: `(N,*Nd,xyz,nT)`, "Gauss"
     """
     assert(rf.device == gr.device == loc.device)
-    device = rf.device
 
     shape = loc.shape
-    N, Nd, ndim = shape[0], shape[1:-1], loc.ndim-2
-
-    Bz = (loc.reshape(N, -1, 3) @ gr).reshape((N, *Nd, 1, -1))
+    N, Nd, nT = shape[0], shape[1:-1], gr.shape[-1]
 
-    if Δf is not None:  # Δf: -> (N, *Nd, 1, 1); 3 from 1(dim-N) + 2(dim-xtra)
-        γ = γ.to(device=device)
-        Δf, γ = (x.reshape(x.shape+(ndim+3-x.ndim)*(1,)) for x in (Δf, γ))
-        Bz += Δf/γ
+    rfs, _, locf, Bz0, W = _rfgr2beff_prep(rf, gr, loc, Δf=Δf, b1Map=b1Map,
+                                           γ=γ)
 
-    # rf -> (N, *len(Nd)*(1,), xy, nT, (nCoils))
-    rf = rf.reshape((-1,) + ndim*(1,) + rf.shape[1:])
     # Real as `Bx`, Imag as `By`.
-    if b1Map is None:
-        if rf.ndim == Bz.ndim+1:  # (N, *len(Nd)*(1,), xy, nT, nCoils)
-            rf = torch.sum(rf, dim=-1)  # -> (N, *len(Nd)*(1,), xy, nT)
+    rfT = rfs[..., 0].transpose(1, 2)  # -> (N, xy⋅nCoils ⊻ xy, nT)
+
+    # `out=` kernels do not support autograd, nor do in-place copies into
+    # `out` suit it, whose backward clones ∂L/∂beff per copy.
+    doGrad = torch.is_grad_enabled() and any(
+        x is not None and x.requires_grad for x in (rf, gr, loc, Δf, b1Map, γ))
+
+    if doGrad:
+        Bz = locf @ gr
+        if Bz0 is not None:
+            Bz.add_(Bz0)
+        # w/o broadcasting, ∂L/∂rf has no per spin temporaries
+        Bxy = (rfT[:, None].expand(N, locf.shape[1], 2, nT) if W is None else
+               (W.flatten(1, 2) @ rfT).view(N, -1, 2, nT))
+        beff = torch.cat((Bxy, Bz[..., None, :]), dim=-2)
+        beff = beff.view(N, *Nd, 3, nT)
+        return beff if out is None else out.copy_(beff)
+
+    out = loc.new_empty((N, *Nd, 3, nT)) if out is None else out
+    assert(out.shape == (N, *Nd, 3, nT) and out.is_contiguous())
+    outf = out.view(N, -1, 3, nT)
+
+    torch.matmul(locf, gr, out=outf[..., 2, :])  # Bz
+    if Bz0 is not None:
+        outf[..., 2, :].add_(Bz0)
+
+    if W is None:
+        outf[..., 0:2, :].copy_(rfT[:, None])
+    else:
+        torch.matmul(W, rfT[:, None], out=outf[..., 0:2, :])
 
-        Bx, By = rf[..., 0:1, :].expand_as(Bz), rf[..., 1:2, :].expand_as(Bz)
+    return out
+
+
+def _rfgr2beff_prep(
+    rf: Tensor, gr: Tensor, loc: Tensor, *,
+    Δf: Optional[Tensor] = None, b1Map: Optional[Tensor] = None, γ: Tensor = γH
+) -> Tuple[Tensor, Tensor, Tensor, Optional[Tensor], Optional[Tensor]]:
+    r"""Operands of :func:`rfgr2beff`, rearranged for per time step use
+
+    Usage:
+        ``rfs, grs, locf, Bz0, W = _rfgr2beff_prep(rf, gr, loc, *, Δf,``\
+        `` b1Map, γ)``
+    Inputs:
+        - ``rf``, ``gr``, ``loc``, ``Δf``, ``b1Map``, ``γ``: See \
+          :func:`rfgr2beff`.
+    Outputs:
+        - ``rfs``: `(N, nT, xy⋅nCoils ⊻ xy, 1)`, "Gauss", real and imag \
+          parts per coil, coils summed if ``b1Map is None``.
+        - ``grs``: `(N, nT, xyz, 1)`, "Gauss/cm".
+        - ``locf``: `(N, nM, xyz)`, "cm", ``loc`` with `Nd` flattened to `nM`.
+        - ``Bz0``: `(N ⊻ 1, nM ⊻ 1, 1)` ⊻ `None`, "Gauss", ``Δf/γ``.
+        - ``W``: `(N, nM, xy, xy⋅nCoils)` ⊻ `None`, ``b1Map`` as real \
+          matrices, ``W @ rfs[:, t]`` is `Bx, By` of step `t`.
+    """
+    N, ndim = loc.shape[0], loc.ndim-2
+    device = rf.device
+    locf = loc.reshape(N, -1, 3)
+
+    grs = gr.transpose(1, 2)[..., None]
+
+    rf = rf if rf.ndim == 4 else rf[..., None]  # (N, xy, nT, nCoils)
+    if b1Map is None:
+        rfs, W = torch.sum(rf, dim=-1).transpose(1, 2)[..., None], None
     else:
-        if b1Map.ndim == 1+len(Nd)+1:
+        b1Map = b1Map.to(device)
+        if b1Map.ndim == 1+ndim+1:
             b1Map = b1Map[..., None]  # (N, *Nd, xy) -> (N, *Nd, xy, 1)
-        if rf.ndim == b1Map.ndim:  # rf missing the nCoil dim
-            rf = rf[..., None]
+        # broadcast `N ⊻ 1, *Nd ⊻ 1` before flattening `Nd`
+        b1Map = b1Map.expand(loc.shape[:-1]+b1Map.shape[-2:])
+        b1Map = b1Map.reshape(N, -1, 2, b1Map.shape[-1])
+        b1x, b1y = b1Map[..., 0:1, :], b1Map[..., 1:2, :]
+        # [Bx; By] = [b1x, -b1y; b1y, b1x] @ [rfx; rfy], complex product
+        W = torch.cat((torch.cat((b1x, -b1y), dim=-1),
+                       torch.cat((b1y, b1x), dim=-1)), dim=-2)
+        rfs = rf.permute(0, 2, 1, 3).reshape(N, rf.shape[2], -1, 1)
+
+    if Δf is None:
+        Bz0 = None
+    else:
+        γ = γ.to(device=device)
+        Δf, γ = (x.reshape(x.shape+(ndim+1-x.ndim)*(1,)) for x in (Δf, γ))
+        Bz0 = (Δf/γ)
+        Bz0 = Bz0.reshape(Bz0.shape[0], -1, 1)  # (N ⊻ 1, nM ⊻ 1, 1)
 
-        b1Map = b1Map.to(device)
-        b1Map = b1Map[..., None, :]  # -> (N, *Nd, xy, 1, nCoils)
-        Bx = torch.sum((b1Map[..., 0:1, :, :]*rf[..., 0:1, :, :]
-                        - b1Map[..., 1:2, :, :]*rf[..., 1:2, :, :]),
-                       dim=-1).expand_as(Bz)  # -> (N, *Nd, x, nT)
-        By = torch.sum((b1Map[..., 0:1, :, :]*rf[:, :, 1:2, ...]
-                        + b1Map[..., 1:2, :, :]*rf[:, :, 0:1, ...]),
-                       dim=-1).expand_as(Bz)  # -> (N, *Nd, y, nT)
-
-    beff = torch.cat([Bx, By, Bz], dim=-2)  # -> (N, *Nd, xyz, nT)
-    return beff
+    return rfs, grs, locf, Bz0, W
+
+
+def _rfgr2beff_steps(
+    rfs: Tensor, grs: Tensor, locf: Tensor,
+    Bz0: Optional[Tensor], W: Optional[Tensor], *, out: Tensor,
+    ts: Optional[Iterable[int]] = None
+):
+    r"""Per time step :func:`rfgr2beff`, a generator
+
+    Usage:
+        ``for beff in _rfgr2beff_steps(*_rfgr2beff_prep(...), *, out, ts):``
+    Inputs:
+        - ``rfs``, ``grs``, ``locf``, ``Bz0``, ``W``: See \
+          :func:`_rfgr2beff_prep`.
+        - ``out``: `(N, *Nd, xyz, 1)`, contiguous, in-place holder.
+    Optionals:
+        - ``ts``: iterable of int, time steps to compute, in order, default \
+          to all steps, ``range(nT)``.
+    Yields:
+        - ``out``: `(N, *Nd, xyz, 1)`, "Gauss", B-effective of the step, \
+          overwritten by the next one.
+    """
+    N, nM = locf.shape[:2]
+    outf = out.view(N, nM, 3)
+    bz = locf.new_empty((N, nM, 1))
+    bxy = None if W is None else locf.new_empty((N, nM, 2, 1))
+
+    for t in (range(grs.shape[1]) if ts is None else ts):
+        torch.matmul(locf, grs[:, t], out=bz)
+        if Bz0 is not None:
+            bz.add_(Bz0)
+        outf[..., 2:3].copy_(bz)
+
+        if W is None:
+            outf[..., 0:2].copy_(rfs[:, t, None, :, 0])
+        else:
+            torch.matmul(W, rfs[:, t, None], out=bxy)
+            outf[..., 0:2].copy_(bxy[..., 0])
+        yield out
@@ -1,18 +1,27 @@
 r"""Classes for MRI excitation simulations
 """
 import copy
-from typing import Optional
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple, Union
 import inspect
+import numbers
+import operator
+import warnings
 
 import numpy as np
 from scipy import interpolate
 import torch
+import torch.distributed as dist
 from torch import tensor, Tensor
+from torch.autograd import Function
+from torch.autograd.function import _ContextMethodMixin as CTX
+from torch.utils.checkpoint import checkpoint
 
 from mrphy import γH, dt0, gmax0, smax0, rfmax0, T1G, T2G, π
 from mrphy import utils, beffective, sims
 
-__all__ = ['Pulse', 'SpinArray', 'SpinCube', 'Examples']
+__all__ = ['Pulse', 'PulseOperator', 'SpinArray', 'SpinCube',
+           'Examples']
 
 
 class Pulse(object):
@@ -52,7 +61,7 @@ class Pulse(object):
 
     _readonly = ('device', 'dtype', 'is_cuda', 'shape')
     _limits = ('gmax', 'smax', 'rfmax')
-    __slots__ = set(_readonly + _limits + ('rf', 'gr', 'dt', 'desc'))
+    __slots__ = set(_readonly + _limits + ('rf', 'gr', 'dt', 'desc', '_ops'))
 
     def __init__(
         self,
@@ -73,6 +82,7 @@ class Pulse(object):
         object.__setattr__(self, 'device', device)
         object.__setattr__(self, 'dtype', dtype)
         object.__setattr__(self, 'is_cuda', self.device.type == 'cuda')
+        object.__setattr__(self, '_ops', OrderedDict())  # see `to_operator`
 
         kw = {'device': self.device, 'dtype': self.dtype}
 
@@ -96,6 +106,8 @@ class Pulse(object):
         if 'deepcopy' in (_.function for _ in inspect.stack()):
             # Hack, this enables `deepcopy()` w/o overriding `__deepcopy__()`.
             # Generator is faster than list comprehension.
+            # A copy's cache keys, by `id()`, would never hit: start empty.
+            v = OrderedDict() if k == '_ops' else v
             object.__setattr__(self, k, v)
             return
 
@@ -217,6 +229,22 @@ class Pulse(object):
         desc = f"{self.desc} + interpT\'ed: dt = {dt_n_np}"
         return Pulse(rf_n, gr_n, dt=dt, desc=desc, **dkw)
 
+    def runlength(self) -> Tensor:
+        r"""Lengths of runs where both ``rf`` and ``gr`` stay constant
+
+        Within such a run, B-effectives are constant for any spin, which
+        :func:`~mrphy.sims.blochsim_rle` can exploit.
+
+        Usage:
+            ``runs = pulse.runlength()``
+        Outputs:
+            - ``runs``: `(nRuns,)`, int64, ``runs.sum() == nT``.
+        """
+        N, nT = self.shape[0], self.shape[2]
+        rfgr = torch.cat((self.rf.movedim(2, -1).reshape(N, -1, nT), self.gr),
+                         dim=1)  # -> (N, xy*(nCoils)+xyz, nT)
+        return utils.runlength(rfgr, dim=-1)
+
     def to(
         self, *,
         device: torch.device = torch.device('cpu'),
@@ -237,6 +265,133 @@ class Pulse(object):
         return Pulse(self.rf, self.gr, dt=self.dt, desc=self.desc,
                      device=device, dtype=dtype)
 
+    def to_operator(
+        self, spinarray: 'SpinArray', *,
+        doRelax: bool = True, doCache: bool = True, **kw
+    ) -> 'PulseOperator':
+        r"""The pulse on ``spinarray``, as an affine map, 𝑀 → 𝐴𝑀 + 𝐵
+
+        Computes Hargreave's 𝐴/𝐵 once, see
+        :func:`~mrphy.mobjs.SpinArray.pulse2ab`, for applying the pulse to
+        many initial magnetizations, e.g., across repetitions and segments.
+
+        Usage:
+            ``op = pulse.to_operator(spinarray, *, doRelax, doCache, loc_,``\
+            `` Δf_, b1Map_)``
+            ``op = pulse.to_operator(spincube, *, doRelax, doCache, b1Map_)``
+        Inputs:
+            - ``spinarray``: mrphy.mobjs.SpinArray ⊻ mrphy.mobjs.SpinCube.
+        Optionals:
+            - ``doRelax``: [T/f], do relaxation during the pulse.
+            - ``doCache``: [T/f], reuse the operator computed by this pulse \
+              from the same spin-parameter tensors, see \
+              :class:`~mrphy.mobjs.PulseOperator`.
+            - ``kw``: keywords to ``spinarray.pulse2ab``, e.g., ``loc_``, \
+              ``Δf_`` and ``b1Map_``.
+        Outputs:
+            - ``op``: mrphy.mobjs.PulseOperator.
+
+        .. note::
+            Operators requiring autograd, i.e., any of their inputs requires
+            grad under grad mode, are not cached, they are computed afresh
+            with the graph for their own backward.
+        """
+        sp, xs = spinarray, (self.rf, self.gr, self.dt)+tuple(kw.values())
+        xs += tuple(getattr(spinarray, k, None)
+                    for k in ('mask', 'T1_', 'T2_', 'γ_', 'loc_', 'Δf_'))
+
+        doCache = doCache and not (torch.is_grad_enabled() and any(
+            isinstance(x, Tensor) and x.requires_grad for x in xs))
+
+        if not doCache:
+            return PulseOperator(*sp.pulse2ab(self, doRelax=doRelax, **kw))
+
+        # tensors by identity and in-place version, kept alive by the entry,
+        # so that their ids are not reused
+        key = (type(sp).__name__, sp.shape, doRelax, tuple(kw.keys()),
+               *((id(x), x._version) if isinstance(x, Tensor) else x
+                 for x in xs))
+        ops = self._ops
+        if key in ops:
+            ops.move_to_end(key)
+            return ops[key][1]
+
+        op = PulseOperator(*sp.pulse2ab(self, doRelax=doRelax, **kw))
+        ops[key] = (xs, op)
+        while len(ops) > PulseOperator.cacheSize:
+            ops.popitem(last=False)
+        return op
+
+    def clear_cache(self):
+        r"""Drop the operators cached by :func:`~mrphy.mobjs.Pulse.to_operator`
+
+        Usage:
+            ``pulse.clear_cache()``
+        """
+        self._ops.clear()
+        return
+
+    def share_memory_(self) -> 'Pulse':
+        r"""Move the waveforms into shared memory, in-place
+
+        Usage:
+            ``pulse = pulse.share_memory_()``
+        Outputs:
+            - ``pulse``: mrphy.mobjs.Pulse object, whose ``rf``, ``gr`` and \
+              ``dt`` are shared with processes it is sent to, w/o copies.
+        """
+        for x in (self.rf, self.gr, self.dt):
+            x.share_memory_()
+        return self
+
+
+class PulseOperator(object):
+    r"""A pulse applied to spins, as Hargreave's affine map, 𝑀 → 𝐴𝑀 + 𝐵
+
+    Usage:
+        ``op = PulseOperator(A_, B_)``
+        ``op = pulse.to_operator(spinarray, *, doRelax, doCache, ...)``
+        ``M_ = op(M_)``
+    Inputs:
+        - ``A_``: `(N, nM, xyz, 3)`, ``A_[:,iM,:,:]``, is the `iM`-th 𝐴.
+        - ``B_``: `(N, nM, xyz)`, ``B_[:,iM,:]``, is the `iM`-th 𝐵.
+
+    Properties:
+        - ``A_``: `(N, nM, xyz, 3)`.
+        - ``B_``: `(N, nM, xyz)`.
+        - ``cacheSize``: int, class-wide, at most how many operators \
+          :func:`~mrphy.mobjs.Pulse.to_operator` keeps per pulse, least \
+          recently used ones are dropped first.
+
+    .. tip::
+        Operators of :func:`~mrphy.mobjs.Pulse.to_operator` are cached on the
+        pulse, by the identity and in-place version of the pulse and spin
+        parameter tensors, w/o looking at their contents: assigning new
+        tensors, or modifying them in-place, misses the cache as expected.
+        The cache is freed w/ the pulse, or by ``pulse.clear_cache()``.
+    """
+
+    cacheSize = 8
+    __slots__ = ('A_', 'B_')
+
+    def __init__(self, A_: Tensor, B_: Tensor):
+        assert(A_.shape == B_.shape+(3,))
+        self.A_, self.B_ = A_, B_
+        return
+
+    def __call__(self, M_: Tensor) -> Tensor:
+        r"""Apply the operator to magnetizations, in one batched matmul
+
+        Usage:
+            ``M_ = op(M_)``
+        Inputs:
+            - ``M_``: `(..., N, nM, xyz)`, initial magnetizations, leading \
+              dimensions for, e.g., distinct initial states.
+        Outputs:
+            - ``M_``: `(..., N, nM, xyz)`.
+        """
+        return (self.A_ @ M_[..., None])[..., 0] + self.B_
+
 
 class SpinArray(object):
     r"""mrphy.mobjs.SpinArray object
@@ -392,6 +547,13 @@ class SpinArray(object):
     def applypulse(
         self, pulse: Pulse, *,
         doEmbed: bool = False, doRelax: bool = True, doUpdate: bool = False,
+        doFastRFoff: bool = False, doFuseBeff: bool = False,
+        chunkSize: Optional[int] = None, memBudget: Optional[int] = None,
+        nThreads: Optional[int] = None,
+        nProcs: Optional[int] = None, startMethod: Optional[str] = None,
+        workspace: Optional[utils.Workspace] = None,
+        ckpt: Union[None, int, str] = None, doReversible: bool = False,
+        cacheRot: Union[bool, int] = False,
         loc: Optional[Tensor] = None, loc_: Optional[Tensor] = None,
         Δf: Optional[Tensor] = None, Δf_: Optional[Tensor] = None,
         b1Map: Optional[Tensor] = None, b1Map_: Optional[Tensor] = None
@@ -400,9 +562,13 @@ class SpinArray(object):
 
         Typical usage:
             ``M = spinarray.applypulse(pulse, *, loc, doEmbed=True, doRelax,``\
-            `` doUpdate, Δf, b1Map)``
+            `` doUpdate, doFastRFoff, doFuseBeff, chunkSize ⊻ memBudget,``\
+            `` nThreads, nProcs, startMethod, workspace, ckpt, doReversible,``\
+            `` cacheRot, Δf, b1Map)``
             ``M_ = spinarray.applypulse(pulse, *, loc_, doEmbed=False, `` \
-            ``doRelax, doUpdate, Δf_, b1Map_)``
+            ``doRelax, doUpdate, doFastRFoff, doFuseBeff, chunkSize ⊻ ``\
+            ``memBudget, nThreads, nProcs, startMethod, workspace, ckpt, ``\
+            ``doReversible, cacheRot, Δf_, b1Map_)``
         Inputs:
             - ``pulse``: mrphy.mobjs.Pulse.
             - ``loc`` ⊻ ``loc_``: `(N,*Nd ⊻ nM,xyz)`, "cm", locations.
@@ -410,6 +576,39 @@ class SpinArray(object):
             - ``doEmbed``: [t/F], return ``M`` or ``M_``
             - ``doRelax``: [T/f], do relaxation during Bloch simulation.
             - ``doUpdate``: [t/F], update ``self.M_``
+            - ``doFastRFoff``: [t/F], simulate windows where ``pulse.rf`` is \
+              zero in closed form, unless ``pulse.rf`` requires grad, see \
+              :func:`~mrphy.sims.blochsim`.
+            - ``doFuseBeff``: [t/F], compute B-effective per time step inside \
+              the simulation loop, see :func:`~mrphy.sims.blochsim_rfgr`. \
+              Not combined with ``doFastRFoff``, ``chunkSize`` ⊻ \
+              ``memBudget``, ``nThreads``, ``nProcs`` or ``workspace``. \
+              Ignored when grad is needed w.r.t. ``T1_``, ``T2_``, ``γ_`` \
+              or ``pulse.dt``.
+            - ``chunkSize``: int, stream spins through B-effective \
+              computation and simulation, ``chunkSize`` spins at a time.
+            - ``memBudget``: int, "Byte", alternative to ``chunkSize``, an \
+              approximate memory cap for the per chunk B-effective and spin \
+              history.
+            - ``nThreads``: int, shard spins over worker threads, see \
+              :func:`~mrphy.sims.blochsim`.
+            - ``nProcs``: int, simulate disjoint spin ranges on a pool of \
+              ``nProcs`` worker processes, w/o autograd, ignored w/ a warning \
+              when grad is needed. See the note below.
+            - ``startMethod``: [`'fork'`, `'spawn'`, `'forkserver'`], \
+              ``torch.multiprocessing`` start method of the pool, default to \
+              the platform's.
+            - ``workspace``: mrphy.utils.Workspace, buffers of simulations \
+              are borrowed from it, see :func:`~mrphy.sims.blochsim`. Not \
+              used with ``nProcs``.
+            - ``ckpt``: `None` ⊻ int ⊻ `'sqrt'`, checkpointing of spin \
+              history for backward, trading memory for a recomputation, see \
+              :func:`~mrphy.sims.blochsim`.
+            - ``doReversible``: [t/F], reversible adjoint, spin history \
+              recomputed backward in time, see :func:`~mrphy.sims.blochsim`.
+            - ``cacheRot``: [t/F] ⊻ int, keep the rotations of forward for \
+              backward, per call, or if they fit in an int "Byte" budget, \
+              see :func:`~mrphy.sims.blochsim`. Not used with ``doFuseBeff``.
             - ``Δf``⊻ ``Δf_``: `(N,*Nd ⊻ nM)`, "Hz", off-resonance.
             - ``b1Map`` ⊻ ``b1Map_``: `(N,*Nd ⊻ nM,xy,(nCoils))`, transmit \
               sensitivity.
@@ -420,6 +619,29 @@ class SpinArray(object):
             When ``doUpdate == True and doEmbed == False``, the output compact
             magnetization Tensor is a reference to ``self.M_``, and needs
             caution when being accessed.
+
+        .. note::
+            Besides ``self.M_`` and ``pulse``'s ``rf`` and ``gr``, the output
+            is differentiable w.r.t. ``self.T1_``, ``self.T2_``, ``self.γ_``
+            and ``pulse.dt``, e.g., for parameter mapping, see
+            :class:`~mrphy.sims.BlochSim`.
+
+        .. note::
+            With ``chunkSize`` ⊻ ``memBudget``, the `(N, nM, xyz, nT)`
+            B-effective is never formed for all spins at once. When grad is
+            needed, each chunk is checkpointed, i.e., its B-effective and spin
+            history are recomputed chunk by chunk during backward, where
+            derivatives w.r.t. the pulse accumulate across chunks.
+
+        .. note::
+            With ``nProcs``, the compact spin properties and the pulse are
+            copied into shared memory once, unless already shared, see
+            ``share_memory_()``; the caller's tensors are left as they are.
+            Workers read the copies, and write their spin ranges into a
+            shared output ``M_``. Ranges are ``chunkSize`` ⊻ ``memBudget``
+            chunks if given, otherwise ``nProcs`` even splits. Autograd does
+            not cross processes: when grad is needed, ``nProcs`` is ignored
+            with a warning. Only for CPU.
         """
         assert ((loc_ is None) != (loc is None))  # XOR
         loc_ = (loc_ if loc is None else self.extract(loc))
@@ -430,9 +652,6 @@ class SpinArray(object):
         assert ((b1Map_ is None) or (b1Map is None))
         b1Map_ = (b1Map_ if b1Map is None else self.extract(b1Map))
 
-        beff_ = self.pulse2beff(pulse, loc_=loc_,
-                                Δf_=Δf_, b1Map_=b1Map_, doEmbed=False)
-
         if doRelax:
             kw_bsim = {'T1': self.T1_, 'T2': self.T2_}
         else:
@@ -440,13 +659,350 @@ class SpinArray(object):
 
         kw_bsim['γ'] = self.γ_
         kw_bsim['dt'] = pulse.dt
-
-        M_ = sims.blochsim(self.M_, beff_, **kw_bsim)
+        kw_bsim['nThreads'] = nThreads
+        kw_bsim['workspace'] = workspace
+        kw_bsim['ckpt'] = ckpt
+        kw_bsim['doReversible'] = doReversible
+        kw_bsim['cacheRot'] = cacheRot
+
+        if doFastRFoff:  # RF-off of all batches and coils, `(nT,)`
+            nT = pulse.shape[2]
+            rfoff = torch.all(pulse.rf.movedim(2, 0).reshape(nT, -1) == 0,
+                              dim=1)
+            # trained RF is not constant within windows, left to `blochsim`
+            if torch.is_grad_enabled() and pulse.rf.requires_grad:
+                rfoff = None
+            kw_bsim.update({'doFastRFoff': True, 'rfoff': rfoff})
+
+        assert((chunkSize is None) or (memBudget is None))
+        if doFuseBeff:
+            assert(not doFastRFoff and chunkSize is None and
+                   memBudget is None and nThreads is None and
+                   nProcs is None and workspace is None)
+            # blochsim_rfgr is not differentiable w.r.t. T1, T2, γ, dt
+            doFuseBeff = not (torch.is_grad_enabled() and any(
+                x is not None and x.requires_grad
+                for x in (kw_bsim['T1'], kw_bsim['T2'], self.γ_, pulse.dt)))
+
+        if nProcs is not None and torch.is_grad_enabled() and any(
+                x is not None and x.requires_grad
+                for x in (self.M_, kw_bsim['T1'], kw_bsim['T2'], self.γ_,
+                          loc_, Δf_, b1Map_, pulse.rf, pulse.gr, pulse.dt)):
+            warnings.warn('`nProcs` ignored, autograd does not cross '
+                          'processes, simulating in-process')
+            nProcs = None
+
+        if doFuseBeff:
+            pulse = pulse.to(device=self.device, dtype=self.dtype)
+            M_ = sims.blochsim_rfgr(self.M_, pulse.rf, pulse.gr, loc_,
+                                    Δf=Δf_, b1Map=b1Map_, T1=kw_bsim['T1'],
+                                    T2=kw_bsim['T2'], γ=self.γ_, dt=pulse.dt,
+                                    ckpt=ckpt, doReversible=doReversible)
+        elif nProcs is not None:
+            M_ = self._applypulse_procs(pulse, kw_bsim, nProcs, startMethod,
+                                        chunkSize, memBudget, loc_=loc_,
+                                        Δf_=Δf_, b1Map_=b1Map_)
+        elif (chunkSize is None) and (memBudget is None):
+            beff_ = self.pulse2beff(pulse, loc_=loc_,
+                                    Δf_=Δf_, b1Map_=b1Map_, doEmbed=False)
+            M_ = sims.blochsim(self.M_, beff_, **kw_bsim)
+        else:
+            M_ = self._applypulse_chunks(pulse, kw_bsim, chunkSize, memBudget,
+                                         loc_=loc_, Δf_=Δf_, b1Map_=b1Map_)
         if doUpdate:
             self.M_ = M_
         M_ = (self.embed(M_) if doEmbed else M_)
         return M_
 
+    def _applypulse_chunks(
+        self, pulse: Pulse, kw_bsim: dict,
+        chunkSize: Optional[int], memBudget: Optional[int], *,
+        loc_: Tensor, Δf_: Optional[Tensor], b1Map_: Optional[Tensor]
+    ) -> Tensor:
+        r"""Spin-chunked ``applypulse``, see :func:`applypulse`
+
+        Usage:
+            ``M_ = spinarray._applypulse_chunks(pulse, kw_bsim, chunkSize,``\
+            `` memBudget, *, loc_, Δf_, b1Map_)``
+        Inputs:
+            - ``pulse``: mrphy.mobjs.Pulse.
+            - ``kw_bsim``: dict, keywords to :func:`~mrphy.sims.blochsim`, \
+              where ``T1``, ``T2`` and ``γ`` are compact, `(N, nM)`.
+            - ``chunkSize`` ⊻ ``memBudget``: see :func:`applypulse`.
+            - ``loc_``, ``Δf_``, ``b1Map_``: compact spin properties.
+        Outputs:
+            - ``M_``: `(N, nM, xyz)`
+        """
+        pulse = pulse.to(device=self.device, dtype=self.dtype)
+        rf, gr = pulse.rf, pulse.gr
+
+        if chunkSize is None:
+            chunkSize = self._memBudget2chunkSize(
+                pulse, memBudget, kw_bsim,
+                (self.M_, kw_bsim['T1'], kw_bsim['T2'], self.γ_, loc_, Δf_,
+                 b1Map_))
+
+        kw_bsim = kw_bsim.copy()
+        T1_, T2_, γ_ = (kw_bsim.pop(k) for k in ('T1', 'T2', 'γ'))
+
+        def fn_sim(rf, gr, M_, T1_, T2_, γ_, loc_, Δf_, b1Map_):
+            beff_ = beffective.rfgr2beff(rf, gr, loc_, Δf=Δf_, b1Map=b1Map_,
+                                         γ=γ_)
+            return sims.blochsim(M_, beff_, T1=T1_, T2=T2_, γ=γ_, **kw_bsim)
+
+        # checkpoint only when autograd may need the chunks' spin history
+        doCkpt = torch.is_grad_enabled()
+
+        M_ = self.M_.new_empty(self.M_.shape)  # compact output
+        for i in range(0, self.nM, chunkSize):
+            ind = slice(i, i+chunkSize)
+            args = tuple(None if x is None else x[:, ind]
+                         for x in (self.M_, T1_, T2_, γ_, loc_, Δf_, b1Map_))
+            M_[:, ind] = (checkpoint(fn_sim, rf, gr, *args,
+                                     use_reentrant=False)
+                          if doCkpt else fn_sim(rf, gr, *args))
+        return M_
+
+    def _applypulse_procs(
+        self, pulse: Pulse, kw_bsim: dict, nProcs: int,
+        startMethod: Optional[str],
+        chunkSize: Optional[int], memBudget: Optional[int], *,
+        loc_: Tensor, Δf_: Optional[Tensor], b1Map_: Optional[Tensor]
+    ) -> Tensor:
+        r"""Multi-process ``applypulse``, see :func:`applypulse`
+
+        Usage:
+            ``M_ = spinarray._applypulse_procs(pulse, kw_bsim, nProcs,``\
+            `` startMethod, chunkSize, memBudget, *, loc_, Δf_, b1Map_)``
+        Inputs:
+            - ``pulse``: mrphy.mobjs.Pulse.
+            - ``kw_bsim``: dict, keywords to :func:`~mrphy.sims.blochsim`, \
+              where ``T1``, ``T2`` and ``γ`` are compact, `(N, nM)`.
+            - ``nProcs``, ``startMethod``: see :func:`applypulse`.
+            - ``chunkSize`` ⊻ ``memBudget``: see :func:`applypulse`.
+            - ``loc_``, ``Δf_``, ``b1Map_``: compact spin properties.
+        Outputs:
+            - ``M_``: `(N, nM, xyz)`, in shared memory.
+        """
+        assert(not self.is_cuda)
+        pulse = pulse.to(device=self.device, dtype=self.dtype)
+
+        kw_bsim = kw_bsim.copy()
+        T1_, T2_, γ_ = (kw_bsim.pop(k) for k in ('T1', 'T2', 'γ'))
+        kw_bsim.pop('workspace', None)  # buffers do not cross processes
+
+        # shared copies, the caller's tensors are not moved
+        rf, gr, M_, T1_, T2_, γ_, loc_, Δf_, b1Map_ = (
+            x if x is None or x.is_shared() else
+            torch.empty_like(x).share_memory_().copy_(x.detach())
+            for x in (pulse.rf, pulse.gr, self.M_, T1_, T2_, γ_, loc_, Δf_,
+                      b1Map_))
+        Mo_ = M_.new_empty(M_.shape).share_memory_()
+
+        if (chunkSize is None) and (memBudget is None):
+            chunkSize = -(-self.nM // nProcs)  # ceil
+        elif chunkSize is None:
+            chunkSize = self._memBudget2chunkSize(
+                pulse, memBudget, kw_bsim,
+                (self.M_, T1_, T2_, γ_, loc_, Δf_, b1Map_))
+
+        args = [(slice(i, i+chunkSize), rf, gr, M_, T1_, T2_, γ_, loc_, Δf_,
+                 b1Map_, Mo_, kw_bsim)
+                for i in range(0, self.nM, chunkSize)]
+
+        mp = torch.multiprocessing.get_context(startMethod)
+        with mp.Pool(nProcs, initializer=torch.set_num_threads,
+                     initargs=(1,)) as pool:
+            pool.starmap(_applypulse_range, args)
+        return Mo_
+
+    def _memBudget2chunkSize(
+        self, pulse: Pulse, memBudget: int, kw_bsim: dict,
+        xs: Tuple[Optional[Tensor], ...]
+    ) -> int:
+        r"""Spins per chunk, whose B-effective and spin history fit memBudget
+
+        Usage:
+            ``chunkSize = spinarray._memBudget2chunkSize(pulse, memBudget,``\
+            `` kw_bsim, xs)``
+        Inputs:
+            - ``pulse``: mrphy.mobjs.Pulse.
+            - ``memBudget``: int, "Byte", see :func:`applypulse`.
+            - ``kw_bsim``: dict, keywords to :func:`~mrphy.sims.blochsim`.
+            - ``xs``: tuple, the compact spin properties, ``None`` allowed, \
+              the spin history is only counted if any of them or the pulse \
+              requires grad.
+        Outputs:
+            - ``chunkSize``: int.
+        """
+        N, nT = self.shape[0], pulse.shape[2]
+        es = torch.empty((), dtype=self.dtype).element_size()
+
+        xs = xs + (pulse.rf, pulse.gr, pulse.dt)
+        doHist = torch.is_grad_enabled() and any(
+            x is not None and x.requires_grad for x in xs)
+
+        # Beff, and w/ grad, the `∂L/∂(Bx, By)` copy of `rfgr2beff` backward
+        nbyte = 3*nT*es + (2*nT*es if doHist else 0)
+
+        kw = {'doHist': doHist, 'engine': kw_bsim.get('engine', 'loop'),
+              'ckpt': kw_bsim['ckpt'], 'doReversible': kw_bsim['doReversible']}
+        nbyte_sim, nbyte_rot = (
+            sims.BlochSim.nbytes_per_spin(nT, self.dtype, doRot=doRot, **kw)
+            for doRot in (False, True))
+
+        # rotations are cached per call, or if a chunk's fit in "Byte"s
+        cacheRot = kw_bsim['cacheRot']
+        if cacheRot is True:
+            return max(1, memBudget // (N*(nbyte+nbyte_rot)))
+        chunkSize = max(1, memBudget // (N*(nbyte+nbyte_sim)))
+        if (cacheRot is not False and
+                N*chunkSize*(nbyte_rot-nbyte_sim) <= cacheRot):
+            chunkSize = max(1, memBudget // (N*(nbyte+nbyte_rot)))
+        return chunkSize
+
+    def applypulse_dist(
+        self, pulse: Pulse, fn_loss, *,
+        group: Optional[dist.ProcessGroup] = None, **kw
+    ) -> Tensor:
+        r"""Apply a pulse to this rank's shard, and a loss over all ranks
+
+        Spins are sharded across ranks of a ``torch.distributed`` process
+        group, e.g., `'gloo'`, with ``self`` being this rank's shard, see
+        :func:`shard`. Every rank simulates its own shard, and evaluates its
+        shard's loss. The returned loss is summed over ranks. Its backward,
+        which every rank must call, all-reduces the derivatives w.r.t.
+        ``pulse.rf`` and ``pulse.gr``, so all ranks end up with the same
+        gradients, of the loss over all spins.
+
+        Usage:
+            ``loss = spinarray.applypulse_dist(pulse, fn_loss, *, group,``\
+            `` **kw)``
+        Inputs:
+            - ``pulse``: mrphy.mobjs.Pulse.
+            - ``fn_loss``: callable, ``loss_ = fn_loss(M_)``, scalar loss of \
+              this rank's `(N, nM, xyz)` compact output, additive across \
+              shards.
+        Optionals:
+            - ``group``: ``torch.distributed`` process group, default to the \
+              default group.
+            - ``kw``: keywords to :func:`applypulse`, with ``doEmbed=False``.
+        Outputs:
+            - ``loss``: `()`, loss of all ranks.
+        """
+        rf, gr = (_AllReduceGrad.apply(x, group) for x in (pulse.rf, pulse.gr))
+        pulse = Pulse(rf, gr, dt=pulse.dt, gmax=pulse.gmax, smax=pulse.smax,
+                      rfmax=pulse.rfmax, desc=pulse.desc,
+                      device=pulse.device, dtype=pulse.dtype)
+
+        loss_ = fn_loss(self.applypulse(pulse, doEmbed=False, **kw))
+
+        loss = loss_.detach().clone()
+        dist.all_reduce(loss, group=group)
+        return loss_ + (loss - loss_.detach())  # value of all, grad of mine
+
+    def applyrepeat(
+        self, pulse: Pulse, dur: Tensor, K: Union[int, Sequence[int]], *,
+        doEmbed: bool = False, doSpoil: bool = False, doUpdate: bool = False,
+        loc: Optional[Tensor] = None, loc_: Optional[Tensor] = None,
+        Δf: Optional[Tensor] = None, Δf_: Optional[Tensor] = None,
+        b1Map: Optional[Tensor] = None, b1Map_: Optional[Tensor] = None
+    ) -> Tensor:
+        r"""Apply ``pulse`` then free precession of ``dur``, ``K`` times
+
+        One TR, ``pulse`` then ``freeprec(dur)``, is an affine map, see
+        :func:`~mrphy.mobjs.SpinArray.steadystate`. Its ``K``-th powers are
+        composed by repeated squaring, :func:`~mrphy.beffective.ab_power`,
+        i.e., `O(log(max(K)))` batched `3x4` compositions, instead of ``K``
+        sequential ``applypulse`` and ``freeprec``. Differentiable.
+
+        Usage:
+            ``M_ = spinarray.applyrepeat(pulse, dur, K, *, doEmbed, doSpoil,``\
+            `` doUpdate, loc ⊻ loc_, Δf ⊻ Δf_, b1Map ⊻ b1Map_)``
+        Inputs:
+            - ``pulse``: mrphy.mobjs.Pulse.
+            - ``dur``: `()` ⊻ `(N ⊻ 1,)`, "Sec", duration of free-precession \
+              after the pulse.
+            - ``K``: int ⊻ `(nK,)` ints, non-negative, repetition indices \
+              whose states to return. Ints include numpy ints and 0-d \
+              integer tensors.
+            - ``loc`` ⊻ ``loc_``: `(N,*Nd ⊻ nM,xyz)`, "cm", locations.
+        Optionals:
+            - ``doEmbed``: [t/F], return ``M`` or ``M_``.
+            - ``doSpoil``: [t/F], ideal spoiling at the end of each TR, see \
+              :func:`~mrphy.mobjs.SpinArray.steadystate`.
+            - ``doUpdate``: [t/F], update ``self.M_``, with the state of the \
+              last entry of ``K``.
+            - ``Δf`` ⊻ ``Δf_``: `(N,*Nd ⊻ nM)`, "Hz", off-resonance.
+            - ``b1Map`` ⊻ ``b1Map_``: `(N,*Nd ⊻ nM,xy,(nCoils))`, transmit \
+              sensitivity.
+        Outputs:
+            - ``M`` ⊻ ``M_``: `(N,*Nd ⊻ nM,(nK),xyz)`, states after ``K`` \
+              TRs from ``self.M``, `nK` is absent for an int ``K``.
+        """
+        assert ((Δf_ is None) or (Δf is None))
+        Δf_ = (Δf_ if Δf is None else self.extract(Δf))
+
+        Ap_, Bp_ = self.pulse2ab(pulse, loc=loc, loc_=loc_, Δf_=Δf_,
+                                 b1Map=b1Map, b1Map_=b1Map_)
+        Af_, Bf_ = self._freeprec_ab(dur, doSpoil=doSpoil, Δf_=Δf_)
+
+        # One TR, `M → Af(ApM+Bp)+Bf`, as `[A | B]`, `(N, nM, xyz, 3+1)`
+        AB_ = torch.cat((Af_ @ Ap_, Af_ @ Bp_[..., None] + Bf_[..., None]),
+                        dim=-1)
+
+        # int, numpy ints, 0-d tensors ⊻ sequences of them
+        isInt = (K.ndim == 0 if isinstance(K, (Tensor, np.ndarray)) else
+                 isinstance(K, numbers.Integral))
+        ks = [operator.index(k) for k in ((K,) if isInt else K)]
+        assert(len(ks) > 0 and all(k >= 0 for k in ks))
+        ks = torch.tensor(ks)
+
+        AB_ = AB_[..., None, :, :].expand(AB_.shape[:2]+(len(ks), 3, 4))
+        AB_ = beffective.ab_power(AB_, ks)  # -> (N, nM, nK, xyz, 3+1)
+
+        A_, B_ = AB_[..., 0:3], AB_[..., 3]
+        M_ = (A_ @ self.M_[..., None, :, None])[..., 0] + B_
+        if isInt:
+            M_ = M_[..., 0, :]
+
+        if doUpdate:
+            self.M_ = M_ if isInt else M_[..., -1, :]
+        M_ = (self.embed(M_) if doEmbed else M_)
+        return M_
+
+    def _shard_mask(self, rank: int, nShards: int) -> Tuple[Tensor, slice]:
+        r"""Mask and compact indices of a shard, see :func:`shard`
+        """
+        ind = slice(rank*self.nM//nShards, (rank+1)*self.nM//nShards)
+        mask = torch.zeros_like(self.mask)
+        mask.view(-1)[torch.nonzero(self.mask.reshape(-1))[ind, 0]] = True
+        return mask, ind
+
+    def shard(self, rank: int, nShards: int) -> 'SpinArray':
+        r"""A shard of the spinarray, e.g., for a rank of a process group
+
+        The ``nM`` compact spins are split into ``nShards`` contiguous,
+        near-even shards, the ``rank``-th of which is returned, as compact
+        indices ``slice(rank*nM//nShards, (rank+1)*nM//nShards)``.
+
+        Usage:
+            ``spinarray_r = spinarray.shard(rank, nShards)``
+        Inputs:
+            - ``rank``: int, index of the shard, ``0 <= rank < nShards``.
+            - ``nShards``: int, number of shards, e.g., the world size.
+        Outputs:
+            - ``spinarray_r``: mrphy.mobjs.SpinArray object, of the same \
+              ``shape``, with ``mask`` of only the shard's spins, whose \
+              compact attributes are views of the spinarray's.
+        """
+        assert(0 <= rank < nShards)
+        mask, ind = self._shard_mask(rank, nShards)
+        return SpinArray(self.shape, mask, T1_=self.T1_[:, ind],
+                         T2_=self.T2_[:, ind], γ_=self.γ_[:, ind],
+                         M_=self.M_[:, ind], device=self.device,
+                         dtype=self.dtype)
+
     def asdict(self, *, toNumpy: bool = True, doEmbed: bool = True) -> dict:
         r"""Convert mrphy.mobjs.SpinArray object to dict
 
@@ -589,6 +1145,37 @@ class SpinArray(object):
         M_ = (self.embed(M_) if doEmbed else M_)
         return M_
 
+    def _freeprec_ab(
+        self, dur: Tensor, *, doSpoil: bool, Δf_: Optional[Tensor]
+    ) -> Tuple[Tensor, Tensor]:
+        r"""Free precession of ``dur``, as an affine map, 𝑀 → 𝐴𝑀 + 𝐵
+
+        Read off by mapping the basis and the origin, ``freeprec([I | 0])``
+        is ``[A + B | B]``, so as to reuse the derivatives of
+        :func:`~mrphy.sims.freeprec`.
+
+        Usage:
+            ``A_, B_ = spinarray._freeprec_ab(dur, *, doSpoil, Δf_)``
+        Inputs:
+            - ``dur``: `()` ⊻ `(N ⊻ 1,)`, "Sec", duration of free-precession.
+            - ``doSpoil``: [t/F], null the transverse magnetization after.
+            - ``Δf_``: `(N ⊻ 1, nM)` ⊻ ``None``, "Hz", off-resonance.
+        Outputs:
+            - ``A_``: `(N, nM, xyz, 3)`.
+            - ``B_``: `(N, nM, xyz)`.
+        """
+        dkw = {'device': self.device, 'dtype': self.dtype}
+        M0_ = torch.eye(4, 3, **dkw).expand(self.shape[:1]+(self.nM, 4, 3))
+        fn = lambda x: None if x is None else x[..., None]  # noqa: E731
+        AB_ = sims.freeprec(M0_, dur.to(**dkw), T1=fn(self.T1_),
+                            T2=fn(self.T2_), Δf=fn(Δf_)).transpose(-1, -2)
+        B_ = AB_[..., 3]
+        A_ = AB_[..., 0:3] - B_[..., None]
+        if doSpoil:  # null the transverse outputs
+            ẑ = tensor([0., 0., 1.], **dkw)
+            A_, B_ = A_*ẑ[:, None], B_*ẑ
+        return A_, B_
+
     def mask_(self, *, mask: Tensor) -> Tensor:
         r"""Extract the compact region of an input external ``mask``.
 
@@ -614,6 +1201,42 @@ class SpinArray(object):
         """
         return self.mask.numel()
 
+    def pulse2ab(
+        self, pulse: Pulse, *, doRelax: bool = True,
+        loc: Optional[Tensor] = None, loc_: Optional[Tensor] = None,
+        Δf: Optional[Tensor] = None, Δf_: Optional[Tensor] = None,
+        b1Map: Optional[Tensor] = None, b1Map_: Optional[Tensor] = None
+    ) -> Tuple[Tensor, Tensor]:
+        r"""Compute Hargreave's 𝐴/𝐵 of ``pulse`` with spinarray's parameters
+
+        Usage:
+            ``A_, B_ = spinarray.pulse2ab(pulse, *, doRelax, loc ⊻ loc_,``\
+            `` Δf ⊻ Δf_, b1Map ⊻ b1Map_)``
+        Inputs:
+            - ``pulse``: mrphy.mobjs.Pulse.
+            - ``loc`` ⊻ ``loc_``: `(N,*Nd ⊻ nM,xyz)`, "cm", locations.
+        Optionals:
+            - ``doRelax``: [T/f], do relaxation during the pulse.
+            - ``Δf`` ⊻ ``Δf_``: `(N,*Nd ⊻ nM)`, "Hz", off-resonance.
+            - ``b1Map`` ⊻ ``b1Map_``: `(N,*Nd ⊻ nM,xy,(nCoils))`, transmit \
+              sensitivity.
+        Outputs:
+            - ``A_``: `(N, nM, xyz, 3)`, see \
+              :func:`~mrphy.beffective.beff2ab`.
+            - ``B_``: `(N, nM, xyz)`.
+        """
+        pulse = pulse.to(device=self.device, dtype=self.dtype)
+        beff_ = self.pulse2beff(pulse, loc=loc, loc_=loc_, Δf=Δf, Δf_=Δf_,
+                                b1Map=b1Map, b1Map_=b1Map_)
+
+        dt = pulse.dt[:, None]  # (N ⊻ 1, 1)
+        if doRelax:
+            E1, E2 = torch.exp(-dt/self.T1_), torch.exp(-dt/self.T2_)
+        else:
+            E1 = E2 = torch.ones((), device=self.device, dtype=self.dtype)
+
+        return beffective.beff2ab(beff_, E1=E1, E2=E2, γ=self.γ_, dt=pulse.dt)
+
     def pulse2beff(
         self, pulse: Pulse, *, doEmbed: bool = False,
         loc: Optional[Tensor] = None, loc_: Optional[Tensor] = None,
@@ -662,6 +1285,65 @@ class SpinArray(object):
         """
         return self.shape
 
+    def steadystate(
+        self, pulse: Pulse, dur: Tensor, *,
+        doEmbed: bool = False, doSpoil: bool = False, doUpdate: bool = False,
+        loc: Optional[Tensor] = None, loc_: Optional[Tensor] = None,
+        Δf: Optional[Tensor] = None, Δf_: Optional[Tensor] = None,
+        b1Map: Optional[Tensor] = None, b1Map_: Optional[Tensor] = None
+    ) -> Tensor:
+        r"""Steady state of repeating ``pulse`` then free precession of ``dur``
+
+        One TR, ``pulse`` then ``freeprec(dur)``, is an affine map, 𝑀 → 𝐴𝑀 +
+        𝐵, composed of :func:`~mrphy.mobjs.SpinArray.pulse2ab` and the map of
+        :func:`~mrphy.sims.freeprec`. The steady state, 𝑀 = 𝐴𝑀 + 𝐵, is solved
+        directly, ``(I-A)M = B``, in one batched `3x3` linear solve, instead
+        of simulating TRs until convergence. Differentiable, autograd goes
+        through the solve, :func:`~mrphy.sims.freeprec` and
+        :func:`~mrphy.beffective.beff2ab`.
+
+        Usage:
+            ``M_ = spinarray.steadystate(pulse, dur, *, doEmbed, doSpoil,``\
+            `` doUpdate, loc ⊻ loc_, Δf ⊻ Δf_, b1Map ⊻ b1Map_)``
+        Inputs:
+            - ``pulse``: mrphy.mobjs.Pulse.
+            - ``dur``: `()` ⊻ `(N ⊻ 1,)`, "Sec", duration of free-precession \
+              after the pulse, ``TR`` minus the pulse length.
+            - ``loc`` ⊻ ``loc_``: `(N,*Nd ⊻ nM,xyz)`, "cm", locations.
+        Optionals:
+            - ``doEmbed``: [t/F], return ``M`` or ``M_``.
+            - ``doSpoil``: [t/F], ideal spoiling, null the transverse \
+              magnetization at the end of each TR, e.g., spoiled GRE.
+            - ``doUpdate``: [t/F], update ``self.M_``.
+            - ``Δf`` ⊻ ``Δf_``: `(N,*Nd ⊻ nM)`, "Hz", off-resonance.
+            - ``b1Map`` ⊻ ``b1Map_``: `(N,*Nd ⊻ nM,xy,(nCoils))`, transmit \
+              sensitivity.
+        Outputs:
+            - ``M`` ⊻ ``M_``: `(N,*Nd ⊻ nM,xyz)`, steady state right after \
+              the pulse.
+
+        .. note::
+            Relaxation is needed for the steady state to be unique, otherwise
+            ``I-A`` is singular.
+        """
+        assert ((Δf_ is None) or (Δf is None))
+        Δf_ = (Δf_ if Δf is None else self.extract(Δf))
+
+        A_, B_ = self.pulse2ab(pulse, loc=loc, loc_=loc_, Δf_=Δf_,
+                               b1Map=b1Map, b1Map_=b1Map_)
+
+        Af_, Bf_ = self._freeprec_ab(dur, doSpoil=doSpoil, Δf_=Δf_)
+
+        # `M = A(AfM+Bf)+B`, steady state right after the pulse.
+        A_, B_ = A_ @ Af_, (A_ @ Bf_[..., None])[..., 0] + B_
+        dkw = {'device': self.device, 'dtype': self.dtype}
+        M_ = torch.linalg.solve(torch.eye(3, **dkw) - A_, B_)
+
+        if doUpdate:
+            self.M_ = M_
+        M_ = (self.embed(M_) if doEmbed else M_)
+        return M_
+
     def to(
         self, *,
         device: torch.device = torch.device('cpu'),
@@ -682,6 +1364,58 @@ class SpinArray(object):
         return SpinArray(self.shape, self.mask, T1_=self.T1_, T2_=self.T2_,
                          γ_=self.γ_, M_=self.M_, device=device, dtype=dtype)
 
+    def share_memory_(self) -> 'SpinArray':
+        r"""Move the compact attributes into shared memory, in-place
+
+        Usage:
+            ``spinarray = spinarray.share_memory_()``
+        Outputs:
+            - ``spinarray``: mrphy.mobjs.SpinArray object, whose ``M_``, \
+              ``T1_``, ``T2_`` and ``γ_`` are shared with processes it is \
+              sent to, w/o copies.
+        """
+        for k_ in self._compact:
+            getattr(self, k_).share_memory_()
+        return self
+
+
+class _AllReduceGrad(Function):
+    r"""Identity, whose backward sums gradients over ranks of a group
+    """
+    @staticmethod
+    def forward(
+        ctx: CTX, x: Tensor, group: Optional[dist.ProcessGroup]
+    ) -> Tensor:
+        ctx.group = group
+        return x.view_as(x)
+
+    @staticmethod
+    def backward(ctx: CTX, grad: Tensor) -> Tuple[Tensor, None]:
+        grad = grad.clone(memory_format=torch.contiguous_format)
+        dist.all_reduce(grad, group=ctx.group)
+        return grad, None
+
+
+def _applypulse_range(
+    ind: slice, rf: Tensor, gr: Tensor, M_: Tensor,
+    T1_: Optional[Tensor], T2_: Optional[Tensor], γ_: Tensor,
+    loc_: Tensor, Δf_: Optional[Tensor], b1Map_: Optional[Tensor],
+    Mo_: Tensor, kw_bsim: dict
+):
+    r"""Worker of :func:`~mrphy.mobjs.SpinArray._applypulse_procs`
+
+    Simulates spins ``ind`` of shared memory inputs, into shared ``Mo_``.
+    """
+    M_, T1_, T2_, γ_, loc_, Δf_, b1Map_ = (
+        None if x is None else x[:, ind]
+        for x in (M_, T1_, T2_, γ_, loc_, Δf_, b1Map_))
+    with torch.no_grad():
+        beff_ = beffective.rfgr2beff(rf, gr, loc_, Δf=Δf_, b1Map=b1Map_,
+                                     γ=γ_)
+        Mo_[:, ind] = sims.blochsim(M_, beff_, T1=T1_, T2=T2_, γ=γ_,
+                                    **kw_bsim)
+    return
+
 
 class SpinCube(SpinArray):
     r"""mrphy.mobjs.SpinCube object
@@ -839,13 +1573,25 @@ class SpinCube(SpinArray):
     def applypulse(
         self, pulse: Pulse, *,
         doEmbed: bool = False, doRelax: bool = True, doUpdate: bool = False,
+        doFastRFoff: bool = False, doFuseBeff: bool = False,
+        chunkSize: Optional[int] = None, memBudget: Optional[int] = None,
+        nThreads: Optional[int] = None,
+        nProcs: Optional[int] = None, startMethod: Optional[str] = None,
+        workspace: Optional[utils.Workspace] = None,
+        ckpt: Union[None, int, str] = None, doReversible: bool = False,
+        cacheRot: Union[bool, int] = False,
         b1Map: Optional[Tensor] = None, b1Map_: Optional[Tensor] = None
     ) -> Tensor:
         r"""Apply a pulse to the spincube object
 
         Usage:
-            ``M = spincube.applypulse(pulse, *, doEmbed=True, doRelax, b1Map)``
+            ``M = spincube.applypulse(pulse, *, doEmbed=True, doRelax,``\
+            `` doFastRFoff, doFuseBeff, chunkSize ⊻ memBudget, nThreads,``\
+            `` nProcs, startMethod, workspace, ckpt, doReversible, cacheRot,``\
+            `` b1Map)``
             ``M_ = spincube.applypulse(pulse, *, doEmbed=False, doRelax,``\
+            `` doFastRFoff, doFuseBeff, chunkSize ⊻ memBudget, nThreads,``\
+            `` nProcs, startMethod, workspace, ckpt, doReversible, cacheRot,``\
             `` b1Map_)``
 
         Inputs:
@@ -853,6 +1599,25 @@ class SpinCube(SpinArray):
         Optionals:
             - ``doEmbed``: [t/F], return ``M`` or ``M_``.
             - ``doRelax``: [T/f], do relaxation during Bloch simulation.
+            - ``doFastRFoff``: [t/F], simulate windows where ``pulse.rf`` is \
+              zero in closed form, unless ``pulse.rf`` requires grad, see \
+              :func:`~mrphy.sims.blochsim`.
+            - ``doFuseBeff``: [t/F], B-effective computed inside the \
+              simulation loop, see :func:`~mrphy.mobjs.SpinArray.applypulse`.
+            - ``chunkSize`` ⊻ ``memBudget``: spin-chunked simulation, see \
+              :func:`~mrphy.mobjs.SpinArray.applypulse`.
+            - ``nThreads``: int, shard spins over worker threads, see \
+              :func:`~mrphy.sims.blochsim`.
+            - ``nProcs``, ``startMethod``: multi-process simulation over \
+              shared memory, see :func:`~mrphy.mobjs.SpinArray.applypulse`.
+            - ``workspace``: mrphy.utils.Workspace, buffers of simulations \
+              are borrowed from it, see :func:`~mrphy.sims.blochsim`.
+            - ``ckpt``: `None` ⊻ int ⊻ `'sqrt'`, checkpointing of spin \
+              history, see :func:`~mrphy.sims.blochsim`.
+            - ``doReversible``: [t/F], reversible adjoint, see \
+              :func:`~mrphy.sims.blochsim`.
+            - ``cacheRot``: [t/F] ⊻ int, keep the rotations of forward for \
+              backward, see :func:`~mrphy.sims.blochsim`.
             - ``b1Map`` ⊻ ``b1Map_``: `(N,*Nd ⊻ nM,xy,(nCoils))`, transmit \
               sensitivity.
         Outputs:
@@ -863,9 +1628,54 @@ class SpinCube(SpinArray):
 
         return self.spinarray.applypulse(pulse, doEmbed=doEmbed,
                                          doRelax=doRelax, doUpdate=doUpdate,
+                                         doFastRFoff=doFastRFoff,
+                                         doFuseBeff=doFuseBeff,
+                                         chunkSize=chunkSize,
+                                         memBudget=memBudget,
+                                         nThreads=nThreads, nProcs=nProcs,
+                                         startMethod=startMethod,
+                                         workspace=workspace, ckpt=ckpt,
+                                         doReversible=doReversible,
+                                         cacheRot=cacheRot,
                                          Δf_=self.Δf_, loc_=self.loc_,
                                          b1Map_=b1Map_)
 
+    def applyrepeat(
+        self, pulse: Pulse, dur: Tensor, K: Union[int, Sequence[int]], *,
+        doEmbed: bool = False, doSpoil: bool = False, doUpdate: bool = False,
+        b1Map: Optional[Tensor] = None, b1Map_: Optional[Tensor] = None
+    ) -> Tensor:
+        r"""Apply ``pulse`` then free precession of ``dur``, ``K`` times
+
+        See :func:`~mrphy.mobjs.SpinArray.applyrepeat`.
+
+        Usage:
+            ``M = spincube.applyrepeat(pulse, dur, K, *, doEmbed=True,``\
+            `` doSpoil, doUpdate, b1Map)``
+            ``M_ = spincube.applyrepeat(pulse, dur, K, *, doEmbed=False,``\
+            `` doSpoil, doUpdate, b1Map_)``
+        Inputs:
+            - ``pulse``: mrphy.mobjs.Pulse.
+            - ``dur``: `()` ⊻ `(N ⊻ 1,)`, "Sec", duration of free-precession \
+              after the pulse.
+            - ``K``: int ⊻ `(nK,)` ints, non-negative, repetition indices \
+              whose states to return. Ints include numpy ints and 0-d \
+              integer tensors.
+        Optionals:
+            - ``doEmbed``: [t/F], return ``M`` or ``M_``.
+            - ``doSpoil``: [t/F], ideal spoiling at the end of each TR.
+            - ``doUpdate``: [t/F], update ``self.M_``, with the state of the \
+              last entry of ``K``.
+            - ``b1Map`` ⊻ ``b1Map_``: `(N,*Nd ⊻ nM,xy,(nCoils))`, transmit \
+              sensitivity.
+        Outputs:
+            - ``M`` ⊻ ``M_``: `(N,*Nd ⊻ nM,(nK),xyz)`.
+        """
+        return self.spinarray.applyrepeat(pulse, dur, K, doEmbed=doEmbed,
+                                          doSpoil=doSpoil, doUpdate=doUpdate,
+                                          loc_=self.loc_, Δf_=self.Δf_,
+                                          b1Map=b1Map, b1Map_=b1Map_)
+
     def freeprec(
         self, dur: Tensor, *,
         doEmbed: bool = False, doRelax: bool = True, doUpdate: bool = False
@@ -893,6 +1703,39 @@ class SpinCube(SpinArray):
         return self.spinarray.freeprec(dur, Δf_=self.Δf_, doEmbed=doEmbed,
                                        doRelax=doRelax, doUpdate=doUpdate)
 
+    def steadystate(
+        self, pulse: Pulse, dur: Tensor, *,
+        doEmbed: bool = False, doSpoil: bool = False, doUpdate: bool = False,
+        b1Map: Optional[Tensor] = None, b1Map_: Optional[Tensor] = None
+    ) -> Tensor:
+        r"""Steady state of repeating ``pulse`` then free precession of ``dur``
+
+        See :func:`~mrphy.mobjs.SpinArray.steadystate`.
+
+        Usage:
+            ``M = spincube.steadystate(pulse, dur, *, doEmbed=True, doSpoil,``\
+            `` doUpdate, b1Map)``
+            ``M_ = spincube.steadystate(pulse, dur, *, doEmbed=False,``\
+            `` doSpoil, doUpdate, b1Map_)``
+        Inputs:
+            - ``pulse``: mrphy.mobjs.Pulse.
+            - ``dur``: `()` ⊻ `(N ⊻ 1,)`, "Sec", duration of free-precession \
+              after the pulse.
+        Optionals:
+            - ``doEmbed``: [t/F], return ``M`` or ``M_``.
+            - ``doSpoil``: [t/F], ideal spoiling at the end of each TR.
+            - ``doUpdate``: [t/F], update ``self.M_``.
+            - ``b1Map`` ⊻ ``b1Map_``: `(N,*Nd ⊻ nM,xy,(nCoils))`, transmit \
+              sensitivity.
+        Outputs:
+            - ``M`` ⊻ ``M_``: `(N,*Nd ⊻ nM,xyz)`, steady state right after \
+              the pulse.
+        """
+        return self.spinarray.steadystate(pulse, dur, doEmbed=doEmbed,
+                                          doSpoil=doSpoil, doUpdate=doUpdate,
+                                          loc_=self.loc_, Δf_=self.Δf_,
+                                          b1Map=b1Map, b1Map_=b1Map_)
+
     def asdict(self, *, toNumpy: bool = True, doEmbed: bool = True) -> dict:
         r"""Convert mrphy.mobjs.SpinCube object to dict
 
@@ -918,6 +1761,29 @@ class SpinCube(SpinArray):
         d.update(self.spinarray.asdict(toNumpy=toNumpy, doEmbed=doEmbed))
         return d
 
+    def pulse2ab(
+        self, pulse: Pulse, *, doRelax: bool = True,
+        b1Map: Optional[Tensor] = None, b1Map_: Optional[Tensor] = None
+    ) -> Tuple[Tensor, Tensor]:
+        r"""Compute Hargreave's 𝐴/𝐵 of ``pulse`` with spincube's parameters
+
+        Usage:
+            ``A_, B_ = spincube.pulse2ab(pulse, *, doRelax, b1Map ⊻ b1Map_)``
+        Inputs:
+            - ``pulse``: mrphy.mobjs.Pulse.
+        Optionals:
+            - ``doRelax``: [T/f], do relaxation during the pulse.
+            - ``b1Map`` ⊻ ``b1Map_``: `(N,*Nd ⊻ nM,xy,(nCoils))`, transmit \
+              sensitivity.
+        Outputs:
+            - ``A_``: `(N, nM, xyz, 3)`, see \
+              :func:`~mrphy.mobjs.SpinArray.pulse2ab`.
+            - ``B_``: `(N, nM, xyz)`.
+        """
+        return self.spinarray.pulse2ab(pulse, doRelax=doRelax,
+                                       loc_=self.loc_, Δf_=self.Δf_,
+                                       b1Map=b1Map, b1Map_=b1Map_)
+
     def pulse2beff(
         self, pulse: Pulse, *,
         doEmbed: bool = False,
@@ -937,8 +1803,8 @@ class SpinCube(SpinArray):
         Outputs:
             - ``beff`` ⊻ ``beff_``: `(N,*Nd ⊻ nM,xyz,nT)`.
         """
-        return self.spinarray.pulse2beff(pulse, self.loc_, doEmbed=doEmbed,
-                                         Δf_=self.Δf_,
+        return self.spinarray.pulse2beff(pulse, doEmbed=doEmbed,
+                                         loc_=self.loc_, Δf_=self.Δf_,
                                          b1Map=b1Map, b1Map_=b1Map_)
 
     def to(
@@ -962,6 +1828,44 @@ class SpinCube(SpinArray):
                         T1_=self.T1_, T2_=self.T2_, γ_=self.γ_, M_=self.M_,
                         device=device, dtype=dtype)
 
+    def share_memory_(self) -> 'SpinCube':
+        r"""Move the compact attributes into shared memory, in-place
+
+        Usage:
+            ``spincube = spincube.share_memory_()``
+        Outputs:
+            - ``spincube``: mrphy.mobjs.SpinCube object, whose ``loc_``, \
+              ``Δf_``, and ``spinarray``'s compact attributes are shared with \
+              processes it is sent to, w/o copies.
+        """
+        self.spinarray.share_memory_()
+        for k_ in self._compact:
+            getattr(self, k_).share_memory_()
+        return self
+
+    def shard(self, rank: int, nShards: int) -> 'SpinCube':
+        r"""A shard of the spincube, e.g., for a rank of a process group
+
+        See :func:`~mrphy.mobjs.SpinArray.shard`.
+
+        Usage:
+            ``spincube_r = spincube.shard(rank, nShards)``
+        Inputs:
+            - ``rank``: int, index of the shard, ``0 <= rank < nShards``.
+            - ``nShards``: int, number of shards, e.g., the world size.
+        Outputs:
+            - ``spincube_r``: mrphy.mobjs.SpinCube object, of the same \
+              ``shape``, ``fov`` and ``ofst``, with ``mask`` of only the \
+              shard's spins.
+        """
+        assert(0 <= rank < nShards)
+        mask, ind = self._shard_mask(rank, nShards)
+        return SpinCube(self.shape, self.fov, mask=mask, ofst=self.ofst,
+                        Δf_=self.Δf_[:, ind], T1_=self.T1_[:, ind],
+                        T2_=self.T2_[:, ind], γ_=self.γ_[:, ind],
+                        M_=self.M_[:, ind], device=self.device,
+                        dtype=self.dtype)
+
 
 class SpinBolus(SpinArray):
     def __init__(
@@ -1,37 +1,855 @@
 r"""Simulation codes with explicit Jacobian operations.
 """
 
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import warnings
 
 import torch
 from torch import Tensor
 from torch.autograd import Function
+from torch.autograd.function import once_differentiable
 from torch.autograd.function import _ContextMethodMixin as CTX
+import torch.autograd.forward_ad as fwAD
 
 from mrphy import γH, dt0, π
+from mrphy import utils, beffective
 
 
-# TODO:
-# - Avoid caching when needs_input_grad is False
-# - Create `BlochSim_rfgr` that directly computes grads w.r.t. `rf` and `gr`.
+__all__ = ['blochsim', 'blochsim_rfgr', 'blochsim_rle', 'blochsim_scan']
 
+_contiguous_format = torch.contiguous_format
+_engines = ('loop', 'jit')
+_kAnchor = 256  # default time steps between anchors of reversible adjoints
 
-__all__ = ['blochsim']
 
-_contiguous_format = torch.contiguous_format
+def _sweep_fwd_(
+    Mhst: Optional[Tensor], Mi: Tensor, γBeff: Tensor, γ2πdt: Optional[Tensor],
+    E: Optional[Tensor], e1_1: Optional[Tensor]
+) -> Tensor:
+    r"""Forward sweep of `BlochSim`, TorchScript compatible
+
+    Same rotation and relaxation algebra as the loop in `BlochSim.forward`,
+    written out of place so that TorchScript can compile the whole sweep.
+    ``Mhst``, if provided, is filled in-place. If ``γ2πdt`` is provided,
+    ``γBeff`` is taken as ``Beff``, and scaled per step.
+    Returns ``m`` of the last time point.
+    """
+    m0 = Mi
+    for t in range(γBeff.shape[-1]):
+        γbeff = γBeff[..., t:t+1]
+        if γ2πdt is not None:
+            γbeff = γ2πdt*γbeff
+        # Rotation
+        ϕ = torch.norm(γbeff, p=2, dim=-2, keepdim=True).clamp_(min=1e-12)
+        u = γbeff/ϕ
+        sϕ, cϕ_1 = torch.sin(ϕ), torch.cos(ϕ).sub_(1)
+
+        utm0 = torch.sum(u*m0, dim=-2, keepdim=True)
+        m1 = torch.addcmul(m0, sϕ, torch.cross(u, m0, dim=-2), value=-1)
+        m1.addcmul_(cϕ_1, torch.addcmul(m0, utm0, u, value=-1))
+
+        # Relaxation
+        if (E is not None) and (e1_1 is not None):
+            m1.mul_(E)
+            m1[..., 2:3, :].sub_(e1_1)
+
+        if Mhst is not None:
+            Mhst[..., t:t+1].copy_(m1)
+        m0 = m1
+    return m0
+
+
+def _sweep_bwd_(
+    h1: Tensor, Mi: Tensor, Mhst: Tensor, γBeff: Tensor,
+    E: Optional[Tensor], e1_1: Optional[Tensor], gE: Optional[Tensor],
+    doGBeff: bool = True
+) -> Tensor:
+    r"""Adjoint sweep of `BlochSim`, TorchScript compatible
+
+    Same algebra as the loop in `BlochSim.backward`. ``γBeff`` is overwritten
+    by ``-γ2πdt*∂L/∂B``, ``h1`` is expected to be pre-scaled by ``-γ2πdt``.
+    ``gE``, if provided, accumulates ``∂L/∂E``, see `_bwd_steps_`. W/o
+    ``doGBeff``, ``∂L/∂B`` is skipped, ``γBeff`` is left intact.
+    Returns ``h0`` of the first time point.
+    """
+    nT = γBeff.shape[-1]
+    m1 = Mhst[..., nT-1:nT]
+    for t in range(nT-1, -1, -1):
+        m0 = Mi if t == 0 else Mhst[..., t-1:t]
+        γbeff = γBeff[..., t:t+1]
+
+        # %% Ajoint Relaxation:
+        if (E is not None) and (e1_1 is not None):
+            m1[..., 2:3, :].add_(e1_1)  # m₁ → m̃₁ ≔ Rm₀ = E⁻¹m₁
+            m1.div_(E)
+            if gE is not None:  # ∂L/∂E += ∂L/∂m₁⊙(m̃₁ - ẑ)
+                gE.addcmul_(h1, m1)
+                gE[..., 2:3, :].sub_(h1[..., 2:3, :])
+            h1 = h1*E  # h₁ → h̃₁ ≔ ∂L/∂m̃₁ = E∂L/∂m₁
+
+        # %% Adjoint Rotations:
+        ϕ = torch.norm(γbeff, p=2, dim=-2, keepdim=True)
+        sϕ, cϕ_1 = torch.sin(ϕ), torch.cos(ϕ).sub_(1)
+        ϕ.clamp_(min=1e-12)
+        u = γbeff/ϕ
+
+        utm0 = torch.sum(u*m0, dim=-2, keepdim=True)
+        uth1 = torch.sum(u*h1, dim=-2, keepdim=True)
+        uxh1 = torch.cross(u, h1, dim=-2)
+
+        # h₀ = h̃₁ + (cϕ-1)*(h̃₁ - uᵀh̃₁*u) + sϕ*u×h̃₁
+        h0 = torch.addcmul(h1, cϕ_1, torch.addcmul(h1, uth1, u, value=-1))
+        h0.addcmul_(sϕ, uxh1)
+        if not doGBeff:
+            m1, h1 = m0, h0
+            continue
+
+        # %% Assemble ∂L/∂B[..., t], store into γbeff
+        cϕ_1.div_(ϕ), sϕ.div_(ϕ)  # cϕ-1, sϕ → (cϕ-1)/ϕ, sϕ/ϕ
+        g = torch.cross(m0, h1, dim=-2).mul_(sϕ)
+        g.addcmul_(cϕ_1, torch.addcmul(h1*utm0, uth1, m0))
+
+        m1.addcmul_(sϕ, m0, value=-1)  # (m̃₁-sϕ/ϕ⋅m₀)
+        tmp = torch.sum(m1.mul_(uxh1), dim=-2, keepdim=True)
+        g.addcmul_(torch.addcmul(tmp, cϕ_1, uth1*utm0, value=2), u, value=-1)
+        γbeff.copy_(g)
+
+        m1, h1 = m0, h0
+    return h1
+
+
+_jit_sweeps = []
+
+
+def _get_jit_sweeps():
+    r"""TorchScript compiled ``(_sweep_fwd_, _sweep_bwd_)``, lazily scripted"""
+    if not _jit_sweeps:
+        with warnings.catch_warnings():  # `torch.jit` deprecation warnings
+            warnings.simplefilter('ignore')
+            _jit_sweeps.extend((torch.jit.script(_sweep_fwd_),
+                                torch.jit.script(_sweep_bwd_)))
+    return _jit_sweeps
+
+
+def _fwd_steps_(
+    m0: Tensor, m1s, γbeffs, fn_relax_,
+    u: Tensor, ϕ: Tensor, cϕ_1: Tensor, sϕ: Tensor, rots=None
+) -> Tensor:
+    r"""Forward time loop of :class:`BlochSim`, in-place
+
+    Inputs:
+        - ``m0``: `(N, *Nd, xyz, 1)`, Magnetic spins before the loop.
+        - ``m1s``: iterable of `(N, *Nd, xyz, 1)`, holders of spins after \
+          each step, ``m1s[t]`` must not be ``m0`` of step `t`.
+        - ``γbeffs``: iterable of `(N, *Nd, xyz, 1)`, "rad", ``γ2πdt⋅beff`` \
+          of each step.
+        - ``fn_relax_``: callable, in-place relaxation of ``m1``.
+        - ``u``: `(N, *Nd, xyz, 1)`; ``ϕ``, ``cϕ_1``, ``sϕ``: \
+          `(N, *Nd, 1, 1)`, temporary buffers.
+        - ``rots``: iterable of ``(u, ϕ, cϕ_1, sϕ)``, holders of each step's \
+          rotation, kept for :func:`_bwd_steps_`. If omitted, the temporary \
+          buffers are reused across steps.
+    Outputs:
+        - ``m0``: `(N, *Nd, xyz, 1)`, Magnetic spins after the loop.
+    """
+    rots = itertools.repeat((u, ϕ, cϕ_1, sϕ)) if rots is None else rots
+    for m1, γbeff, (u_, ϕ_, cϕ_1_, sϕ_) in zip(m1s, γbeffs, rots):
+        # Rotation
+        torch.norm(γbeff, dim=-2, keepdim=True, out=ϕ_)
+        # compute `sin`, `cos` before `ϕ.clamp_()`, as in `_bwd_steps_`
+        torch.sin(ϕ_, out=sϕ_)
+        torch.cos(ϕ_, out=cϕ_1_)
+        cϕ_1_.sub_(1)  # (cϕ-1)
+
+        ϕ_.clamp_(min=1e-12)
+        torch.div(γbeff, ϕ_, out=u_)
+
+        # wiki/Rotation_matrix#Rotation_matrix_from_axis_and_angle
+        # Angle is `-ϕ` as Bloch-eq is 𝑀×𝐵
+        # m₁ = R(u, -ϕ)m₀ = cϕ*m₀ + (1-cϕ)*uᵀm₀*u - sϕ*u×m₀
+        # m₁ = m₀ - sϕ*u×m₀ + (cϕ-1)*(m₀ - uᵀm₀*u), in-place friendly
+        torch.mul(u_, m0, out=m1)  # using m₁ as an temporary storage
+        # ϕ reused as uᵀm₀
+        torch.sum(m1, dim=-2, keepdim=True, out=ϕ)
+
+        torch.cross(u_, m0, dim=-2, out=m1)  # u×m₀
+        # m₀ - sϕ*(u×m₀)
+        torch.addcmul(m0, sϕ_, m1, value=-1, out=m1)
+
+        torch.addcmul(m0, ϕ, u_, value=-1, out=u)  # m₀ - uᵀm₀*u
+
+        # m₀-sϕ*u×m₀+(cϕ-1)*(m₀-uᵀm₀*u)
+        torch.addcmul(m1, cϕ_1_, u, out=m1)
+
+        # Relaxation
+        fn_relax_(m1)
+
+        m0 = m1
+
+    return m0
+
+
+def _bwd_steps_(
+    h1: Tensor, h0: Tensor, m1: Tensor, m0s, γbeffs,
+    E: Optional[Tensor], e1_1: Optional[Tensor], fn_gbeff_,
+    u: Tensor, uxh1: Tensor,
+    ϕ: Tensor, cϕ_1: Tensor, sϕ: Tensor, utm0: Tensor, uth1: Tensor,
+    rots=None, gE: Optional[Tensor] = None, doGBeff: bool = True
+) -> Tuple[Tensor, Tensor]:
+    r"""Backward time loop of :class:`BlochSim`, in-place
+
+    Inputs:
+        - ``h1``: `(N, *Nd, xyz, 1)`, ``-γ2πdt⋅∂L/∂Mo``.
+        - ``h0``: `(N, *Nd, xyz, 1)`, temporary buffer, ping-pong w/ ``h1``.
+        - ``m1``: `(N, *Nd, xyz, 1)`, spins after the last step, overwritten.
+        - ``m0s``: iterable of `(N, *Nd, xyz, 1)`, spins before each step, \
+          in reversed time order, overwritten.
+        - ``γbeffs``: iterable of `(N, *Nd, xyz, 1)`, ``γ2πdt⋅beff`` of each \
+          step, in reversed time order, overwritten by ``∂L/∂beff``.
+        - ``E``, ``e1_1``: relaxation coefficients, see :func:`_relax_fwd`.
+        - ``fn_gbeff_``: callable, ``fn_gbeff_(γbeff)``, called with each \
+          step's ``∂L/∂beff``, before the next step.
+        - ``u``, ``uxh1``: `(N, *Nd, xyz, 1)`; ``ϕ``, ``cϕ_1``, ``sϕ``, \
+          ``utm0``, ``uth1``: `(N, *Nd, 1, 1)`, temporary buffers.
+        - ``rots``: iterable of ``(u, ϕ, cϕ_1, sϕ)``, each step's rotation \
+          kept by :func:`_fwd_steps_`, in reversed time order, overwritten. \
+          If omitted, they are recomputed from ``γbeffs``.
+        - ``gE``: `(N, *Nd, xyz, 1)`, accumulates ``∂L/∂E`` of all steps, \
+          ``-γ2πdt``-scaled as ``h1``, where the `z` entry is ``∂L/∂E1``, \
+          and the `xy` ones sum to ``∂L/∂E2``. Ignored w/o relaxations.
+        - ``doGBeff``: [T/f], w/o it, ``∂L/∂beff`` is skipped, i.e., only \
+          ``h`` is propagated, ``γbeffs`` are left intact, and \
+          ``fn_gbeff_`` is not called.
+    Outputs:
+        - ``h1``: `(N, *Nd, xyz, 1)`, ``-γ2πdt⋅∂L/∂Mi``.
+        - ``h0``: `(N, *Nd, xyz, 1)`, the other ping-pong buffer.
+    """
+    # assert((E is None) == (e1_1 is None))  # both or neither
+    if E is None:  # relaxations ignored
+        fn_relax_h1_ = lambda h1: None  # noqa: E731
+        fn_relax_m1_ = lambda m1: None  # noqa: E731
+    else:
+        fn_relax_h1_ = lambda h1: h1.mul_(E)  # noqa: E731
+
+        def fn_relax_m1_(m1):
+            m1[..., 2:3, :].add_(e1_1)
+            m1.div_(E)
+            return
+
+    if (E is None) or (gE is None):
+        fn_gE_ = lambda h1, m1: None  # noqa: E731
+    else:
+        def fn_gE_(h1, m1):  # ∂L/∂E += ∂L/∂m₁⊙(m̃₁ - ẑ)
+            gE.addcmul_(h1, m1)
+            gE[..., 2:3, :].sub_(h1[..., 2:3, :])
+            return
+
+    for m0, γbeff in zip(m0s, γbeffs):
+        # %% Ajoint Relaxation:
+        fn_relax_m1_(m1)  # m₁ → m̃₁ ≔ Rm₀ = E⁻¹m₁
+        fn_gE_(h1, m1)
+        fn_relax_h1_(h1)  # h₁ → h̃₁ ≔ ∂L/∂m̃₁ = E∂L/∂m₁
+
+        # %% Adjoint Rotations:
+        # Prepare all the elements
+        if rots is not None:  # kept by forward, used as buffers of the step
+            u, ϕ, cϕ_1, sϕ = next(rots)
+        else:
+            torch.norm(γbeff, dim=-2, keepdim=True, out=ϕ)
+            # compute `sin`, `cos` before `ϕ.clamp_()`
+            torch.sin(ϕ, out=sϕ)
+            torch.cos(ϕ, out=cϕ_1)
+            cϕ_1.sub_(1)
+
+            ϕ.clamp_(min=1e-12)
+            torch.div(γbeff, ϕ, out=u)
+
+        # TODO: Resolve singularities of ϕ=0, control pov?
+        # torch.logical_not(ϕ, out=ϕis0)
+        # if torch.any(ϕis0):
+        #     u[ϕis0[..., 0, 0]] = u_dflt
+
+        torch.mul(u, m0, out=h0)
+        torch.sum(h0, dim=-2, keepdim=True, out=utm0)  # uᵀm₀
+
+        # %% Assemble h₀: (R(u, -ϕ)ᵀ ≡ R(u, ϕ))
+        # h₀ ≔ R(u, ϕ)h̃₁ = cϕ*h₁ + (1-cϕ)*uᵀh₁*u + sϕ*u×h₁
+        # h₀ = h̃₁ + (cϕ-1)*(h̃₁ - uᵀh̃₁*u) + sϕ*u×h̃₁, in-place
+        torch.mul(u, h1, out=h0)  # using h0 as an temporary storage
+        torch.sum(h0, dim=-2, keepdim=True, out=uth1)  # uᵀh̃₁
+
+        torch.cross(u, h1, dim=-2, out=uxh1)  # u×h̃₁
+        torch.addcmul(h1, uth1, u, value=-1, out=h0)  # h̃₁-uᵀh̃₁*u
+
+        # h̃₁ + (cϕ-1)*(h̃₁-uᵀh̃₁*u)
+        torch.addcmul(h1, cϕ_1, h0, out=h0)
+
+        # Finish: h₀ = h̃₁ + (cϕ-1)*(h̃₁ - uᵀh̃₁*u) + sϕ*u×h̃₁
+        torch.addcmul(h0, sϕ, uxh1, value=1, out=h0)
+
+        if not doGBeff:
+            m1, h1, h0 = m0, h0, h1
+            continue
+
+        # %% Assemble ∂L/∂B[..., t], store into γbeff
+        # -γδt⋅(+sϕ/ϕ⋅m₀×h̃₁
+        #       +(cϕ-1)/ϕ⋅(uᵀm₀⋅h̃₁+uᵀh̃₁⋅m₀)
+        #       +((sϕ/ϕ⋅m₀-m̃₁)ᵀ(u×h̃₁)-2(cϕ-1)/ϕ⋅uᵀm₀⋅uᵀh̃1)*u )
+
+        cϕ_1.div_(ϕ), sϕ.div_(ϕ)  # cϕ-1, sϕ → (cϕ-1)/ϕ, sϕ/ϕ
+        # if torch.any(ϕis0):  # handle division-by-0
+        #     cϕ_1[ϕis0], sϕ[ϕis0] = 0, 1
+
+        # %%% sϕ/ϕ⋅(m₀×h̃₁)
+        torch.cross(m0, h1, dim=-2, out=γbeff)  # m₀×h̃₁
+        γbeff.mul_(sϕ)  # sϕ/ϕ⋅(m₀×h̃₁)
+
+        # %%% sϕ/ϕ⋅(m₀×h̃₁) + (cϕ-1)/ϕ⋅(uᵀm₀⋅h̃₁+uᵀh̃₁⋅m₀)
+        h1.mul_(utm0)  # uᵀm₀⋅h̃₁
+        torch.addcmul(h1, uth1, m0, out=h1)  # (uᵀm₀⋅h̃₁+uᵀh̃₁⋅m₀)
+        torch.addcmul(γbeff, cϕ_1, h1, value=1, out=γbeff)
+
+        # %%% sϕ/ϕ⋅(m₀×h̃₁) + (cϕ-1)/ϕ⋅(uᵀm₀⋅h̃₁+uᵀh̃₁⋅m₀)
+        #     -((m̃₁-sϕ/ϕ⋅m₀)ᵀ(u×h̃₁) + 2(cϕ-1)/ϕ⋅uᵀh̃1⋅uᵀm₀)⋅u
+
+        # (m̃₁-sϕ/ϕ⋅m₀)ᵀ(u×h̃₁)
+        torch.addcmul(m1, sϕ, m0, value=-1, out=m1)  # (m̃₁-sϕ/ϕ⋅m₀)
+        m1.mul_(uxh1)
+        torch.sum(m1, dim=-2, keepdim=True, out=sϕ)
+
+        # ((m̃₁-sϕ/ϕ⋅m₀)ᵀ(u×h̃₁) + 2(cϕ-1)/ϕ⋅uᵀh̃₁⋅uᵀm₀)
+        uth1.mul_(utm0)  # uᵀh̃1⋅uᵀm₀
+        torch.addcmul(sϕ, cϕ_1, uth1, value=2, out=cϕ_1)
+
+        torch.addcmul(γbeff, cϕ_1, u, value=-1, out=γbeff)
+
+        fn_gbeff_(γbeff)  # ∂L/∂B[..., t], before the buffer is reused
+
+        m1, h1, h0 = m0, h0, h1
+
+    return h1, h0
+
+
+def _jvp_steps(
+    m0: Tensor, ṁ0: Tensor, Beff: Tensor, Ḃeff: Optional[Tensor],
+    γ2πdt: Tensor, dγ2πdt: Optional[Tensor],
+    E: Optional[Tensor], e1_1: Optional[Tensor], Ė: Optional[Tensor],
+    Ms: Optional[Tensor] = None, Ṁs: Optional[Tensor] = None
+) -> Tensor:
+    r"""Tangent time loop of :class:`BlochSim`, forward-mode
+
+    Propagates the tangent ``ṁ`` alongside the spins ``m``, one step at a
+    time, w/o keeping any history, unless ``Ms`` ⊻ ``Ṁs`` are provided.
+
+    Inputs:
+        - ``m0``, ``ṁ0``: `(N, *Nd, xyz, 1)`, spins before the loop, and \
+          their tangent.
+        - ``Beff``: `(N, *Nd, xyz, nT)`, "Gauss"; ``Ḃeff``: its tangent ⊻ \
+          `None`.
+        - ``γ2πdt``: `(N ⊻ 1, *Nd ⊻ 1, 1, 1)`; ``dγ2πdt``: its tangent ⊻ \
+          `None`.
+        - ``E``, ``e1_1``: relaxation coefficients, see :func:`_relax_fwd`; \
+          ``Ė``: tangent of ``E``, see :func:`_relax_jvp`, ⊻ `None`.
+    Optionals:
+        - ``Ms``: `(N, *Nd, xyz, nT)`, kept history of the spins after each \
+          step, read in place of the recomputed spins.
+        - ``Ṁs``: `(N, *Nd, xyz, nT)`, filled in-place by the tangents after \
+          each step.
+    Outputs:
+        - ``ṁ0``: `(N, *Nd, xyz, 1)`, tangent of spins after the loop.
+    """
+    def fn_rot(x, u, cϕ_1, sϕ):  # R(u, -ϕ)x, see `_fwd_steps_`
+        utx = torch.sum(u*x, dim=-2, keepdim=True)
+        x1 = torch.addcmul(x, sϕ, torch.cross(u, x, dim=-2), value=-1)
+        return x1.addcmul_(cϕ_1, torch.addcmul(x, utx, u, value=-1))
+
+    for t in range(Beff.shape[-1]):
+        w = γ2πdt*Beff[..., t:t+1]  # rotation vector, ϕ⋅u
+        ẇ = None if Ḃeff is None else γ2πdt*Ḃeff[..., t:t+1]
+        if dγ2πdt is not None:
+            ẇ = (dγ2πdt*Beff[..., t:t+1] if ẇ is None else
+                 ẇ.addcmul_(dγ2πdt, Beff[..., t:t+1]))
+
+        ϕ = torch.norm(w, dim=-2, keepdim=True)
+        sϕ, cϕ_1, sincϕ = torch.sin(ϕ), torch.cos(ϕ)-1, torch.sinc(ϕ/π)
+        ϕ.clamp_(min=1e-12)
+        u = w/ϕ
+
+        # ṁ₁ = R(u, -ϕ)ṁ₀ + Ṙ(u, -ϕ)m₀
+        ṁ1 = fn_rot(ṁ0, u, cϕ_1, sϕ)
+        if ẇ is not None:  # w.r.t. ẇ = ϕ̇⋅u + ϕ⋅u̇, ϕ̇ = uᵀẇ
+            dϕ = torch.sum(u*ẇ, dim=-2, keepdim=True)
+            ẇ.addcmul_(dϕ, u, value=-1)  # ϕ⋅u̇, ⟂ u
+            utm0 = torch.sum(u*m0, dim=-2, keepdim=True)
+            # -cϕ⋅ϕ̇⋅u×m₀ - sϕ⋅ϕ̇⋅(m₀-uᵀm₀⋅u) - sϕ/ϕ⋅(ϕu̇)×m₀
+            # + (1-cϕ)/ϕ⋅((ϕu̇)ᵀm₀⋅u + uᵀm₀⋅ϕu̇)
+            ṁ1.addcmul_((cϕ_1+1)*dϕ, torch.cross(u, m0, dim=-2), value=-1)
+            ṁ1.addcmul_(sϕ*dϕ, torch.addcmul(m0, utm0, u, value=-1),
+                        value=-1)
+            ṁ1.addcmul_(sincϕ, torch.cross(ẇ, m0, dim=-2), value=-1)
+            tmp = torch.addcmul(utm0*ẇ, torch.sum(ẇ*m0, dim=-2,
+                                                  keepdim=True), u)
+            ṁ1.addcmul_(cϕ_1/ϕ, tmp, value=-1)
+
+        m1 = fn_rot(m0, u, cϕ_1, sϕ)
+
+        # m₂ = E⊙m₁ - (E1-1)ẑ: ṁ₂ = E⊙ṁ₁ + Ė⊙(m₁ - ẑ)
+        if E is not None:
+            ṁ1.mul_(E)
+            if Ė is not None:
+                m1[..., 2:3, :].sub_(1)
+                ṁ1.addcmul_(Ė, m1)
+                m1[..., 2:3, :].add_(1)
+            m1.mul_(E)[..., 2:3, :].sub_(e1_1)
+
+        if Ṁs is not None:
+            Ṁs[..., t:t+1].copy_(ṁ1)
+        m0, ṁ0 = (m1 if Ms is None else Ms[..., t:t+1]), ṁ1
+
+    return ṁ0
+
+
+_sTaylor = 0.05  # `ϕ² = s` below which `_rot_coefs` are Taylor series
+_coefsTaylor = ((1., -1/6, 1/120, -1/5040, 1/362880),  # a
+                (1/2, -1/24, 1/720, -1/40320, 1/3628800),  # b
+                (-1/3, 1/30, -1/840, 1/45360, -1/3991680),  # α
+                (-1/12, 1/180, -1/6720, 1/453600, -1/47900160))  # β
+
+
+def _rot_coefs(s: Tensor) -> Tuple[Tensor, Tensor, Tensor, Tensor]:
+    r"""Coefficients of rotations by ``w``, smooth in ``s = wᵀw = ϕ²``
+
+    ``R(w)m = m - a⋅w×m + b⋅w×(w×m)``, i.e., ``R(u, -ϕ)m``, w/ ``a = sϕ/ϕ``,
+    ``b = (1-cϕ)/ϕ²``, and ``α = 2∂a/∂s``, ``β = 2∂b/∂s``. Taylor series of
+    ``s`` for small ``s``, so that these, and their forward-mode derivatives,
+    stay finite and accurate at ``w = 0``.
+
+    Usage:
+        ``a, b, α, β = _rot_coefs(s)``
+    """
+    isSmall = s < _sTaylor
+    sc = s.clamp(min=_sTaylor)
+    ϕ = sc.sqrt()
+    sϕ, cϕ = torch.sin(ϕ), torch.cos(ϕ)
+    cϕ_1 = 1-cϕ
+    coefs = (sϕ/ϕ, cϕ_1/sc, (ϕ*cϕ-sϕ)/(sc*ϕ), (ϕ*sϕ-cϕ_1-cϕ_1)/sc**2)
+
+    # Series on the primal, w/ their derivatives explicit, as in :func:`_2π`.
+    s_, ṡ = fwAD.unpack_dual(s)
+
+    def fn_horner(cs):
+        x = cs[-1]
+        for c in reversed(cs[:-1]):
+            x = x*s_ + c
+        return x
+
+    def fn_taylor(cs):
+        x = fn_horner(cs)
+        if ṡ is None:
+            return x
+        return fwAD.make_dual(
+            x, fn_horner([i*c for i, c in enumerate(cs)][1:])*ṡ)
+
+    return tuple(torch.where(isSmall, fn_taylor(cs), x)
+                 for cs, x in zip(_coefsTaylor, coefs))
+
+
+def _2π(x: Tensor) -> Tensor:
+    r"""``2π⋅x``, on the primal and tangent apart for dual tensors
+
+    On dual tensors, ops w/ python scalars take a slow path in pytorch.
+    """
+    x_, ẋ = fwAD.unpack_dual(x)
+    return 2*π*x_ if ẋ is None else fwAD.make_dual(2*π*x_, 2*π*ẋ)
+
+
+def _adj_step(
+    h1: Tensor, m0: Tensor, w: Tensor, E: Optional[Tensor], doGE: bool
+) -> Tuple[Tensor, Tensor, Optional[Tensor]]:
+    r"""One adjoint step of :class:`BlochSim`, out-of-place
+
+    Same algebra as :func:`_bwd_steps_`, in the forms of :func:`_rot_coefs`,
+    reading ``m0`` only. Plain ops, so that it also runs on forward-mode dual
+    tensors, see :class:`BlochSimGrad`.
+
+    Usage:
+        ``h0, p, gE = _adj_step(h1, m0, w, E, doGE)``
+    Inputs:
+        - ``h1``: `(N, *Nd, xyz, 1)`, ``∂L/∂m₁``, spins after the step.
+        - ``m0``: `(N, *Nd, xyz, 1)`, spins before the step.
+        - ``w``: `(N, *Nd, xyz, 1)`, rotation vector, ``γ2πdt⋅beff``.
+        - ``E``: relaxation coefficients, see :func:`_relax_fwd`, ⊻ `None`.
+        - ``doGE``: bool, whether to compute ``gE``.
+    Outputs:
+        - ``h0``: `(N, *Nd, xyz, 1)`, ``∂L/∂m₀``.
+        - ``p``: `(N, *Nd, xyz, 1)`, ``∂L/∂w``.
+        - ``gE``: `(N, *Nd, xyz, 1)`, the step's share of ``∂L/∂E`` ⊻ `None`.
+    """
+    s = torch.sum(w*w, dim=-2, keepdim=True)
+    a, b, α, β = _rot_coefs(s)
+
+    gE = None
+    if E is not None:
+        if doGE:  # ∂L/∂E = ∂L/∂m₁⊙(m̃₁ - ẑ), m̃₁ = R(w)m₀
+            wxm = torch.cross(w, m0, dim=-2)
+            m1 = m0 - a*wxm + b*torch.cross(w, wxm, dim=-2)
+            gE = h1*torch.cat((m1[..., :2, :], -(1-m1[..., 2:, :])), dim=-2)
+        h1 = h1*E  # h₁ → h̃₁ ≔ ∂L/∂m̃₁ = E∂L/∂m₁
+
+    # h₀ = R(w)ᵀh̃₁ = h̃₁ + a⋅w×h̃₁ + b⋅w×(w×h̃₁)
+    wxh = torch.cross(w, h1, dim=-2)
+    h0 = h1 + a*wxh + b*torch.cross(w, wxh, dim=-2)
+
+    # p = ∂(h̃₁ᵀR(w)m₀)/∂w
+    #   = -a⋅m₀×h̃₁ - α⋅wᵀ(m₀×h̃₁)⋅w + b⋅(wᵀm₀⋅h̃₁ + wᵀh̃₁⋅m₀ - 2m₀ᵀh̃₁⋅w)
+    #     + β⋅(wᵀh̃₁⋅wᵀm₀ - s⋅m₀ᵀh̃₁)⋅w
+    mxh = torch.cross(m0, h1, dim=-2)
+    wtm, wth, mth, wtmxh = (torch.sum(x*y, dim=-2, keepdim=True)
+                            for x, y in ((w, m0), (w, h1), (m0, h1),
+                                         (w, mxh)))
+    p = (b*(wtm*h1 + wth*m0) - a*mxh
+         + (β*(wth*wtm - s*mth) - α*wtmxh - (b+b)*mth)*w)
+    return h0, p, gE
+
+
+def _hist_segs(Mi: Tensor, Mhst: Tensor, Mseg: Optional[Tensor],
+               k: Optional[int], nT: int, fn_seg_, isReversed: bool):
+    r"""Segments of the spin history kept by :class:`BlochSim`
+
+    Yields ``(s, t0, t1, mc, Ms)``, the spins before step ``t0``, ``mc``, and
+    after each of the steps ``t0:t1``, ``Ms``. W/o ``k``, ``Mhst`` is the
+    full history, a single segment. Otherwise, ``Mhst`` holds checkpoints,
+    or float64 anchors, every ``k`` steps, from which each segment is
+    recomputed into ``Mseg``, by ``fn_seg_``, see :func:`_ckpt_fwd_`.
+    """
+    if k is None:
+        yield 0, 0, nT, Mi, Mhst
+        return
+    segs = list(enumerate(range(0, nT, k)))
+    for s, t0 in (reversed(segs) if isReversed else segs):
+        t1 = min(t0+k, nT)
+        mc, Ms = Mhst[..., s:s+1].to(Mi.dtype), Mseg.narrow(-1, 0, t1-t0)
+        fn_seg_(mc, Ms, t0, t1)
+        yield s, t0, t1, mc, Ms
+
+
+def _adj_grads(
+    h1: Tensor, segs, Beff: Tensor,
+    T1: Optional[Tensor], T2: Optional[Tensor], γ: Tensor, dt: Tensor,
+    needs_grad: Tuple[bool, ...], fn_x
+) -> list:
+    r"""Derivatives of :class:`BlochSim` by steps of :func:`_adj_step`
+
+    Inputs:
+        - ``h1``: `(N, *Nd, xyz, 1)`, ``∂L/∂Mo``.
+        - ``segs``: iterable of ``(t0, t1, mc, Ms)``, in reversed time \
+          order, see :func:`_hist_segs`.
+        - ``Beff``, ``T1``, ``T2``, ``γ``, ``dt``: see :class:`BlochSim`.
+        - ``needs_grad``: `(6,)`, derivatives w.r.t. ``(Mi, Beff, T1, T2, \
+          γ, dt)`` to return.
+        - ``fn_x``: callable, maps each derivative on its way out.
+    Outputs:
+        - ``grads``: `(6,)`, derivatives w.r.t. ``(Mi, Beff, T1, T2, γ, dt)`` \
+          ⊻ `None` if not needed.
+    """
+    π2γ, π2dt = _2π(γ), _2π(dt)
+    γ2πdt = π2γ*dt
+    E = None if T1 is None else torch.exp(-dt/torch.cat((T2, T2, T1), dim=-2))
+    doGE = (E is not None) and (any(needs_grad[2:4]) or needs_grad[5])
+    doGγ2πdt = any(needs_grad[4:6])
+    gB = (torch.empty(Beff.shape, dtype=h1.dtype, device=h1.device)
+          if needs_grad[1] else None)
+
+    gE = gγ2πdt = 0
+    for t0, t1, mc, Ms in segs:
+        for t in range(t1-1, t0-1, -1):
+            m0 = mc if t == t0 else Ms[..., t-t0-1:t-t0]
+            beff = Beff[..., t:t+1]
+            h1, p, gE_ = _adj_step(h1, m0, γ2πdt*beff, E, doGE)
+            if gB is not None:
+                gB[..., t:t+1] = fn_x(γ2πdt*p)
+            if doGγ2πdt:  # ∂L/∂γ2πdt = ∑ₜbeffₜᵀ∂L/∂wₜ
+                gγ2πdt = gγ2πdt + torch.sum(beff*p, dim=-2, keepdim=True)
+            if doGE:
+                gE = gE + gE_
+
+    gT1 = gT2 = gdt = 0
+    if doGE:
+        gT1, gT2, gdt = _relax_bwd(gE, E, T1, T2, dt)
+    return [fn_x(h1[..., 0]) if needs_grad[0] else None, gB,
+            fn_x(gT1.sum_to_size(T1.shape)) if needs_grad[2] else None,
+            fn_x(gT2.sum_to_size(T2.shape)) if needs_grad[3] else None,
+            (fn_x((gγ2πdt*π2dt).sum_to_size(γ.shape)) if needs_grad[4]
+             else None),
+            (fn_x((gγ2πdt*π2γ + gdt).sum_to_size(dt.shape))
+             if needs_grad[5] else None)]
+
+
+def _relax_fwd(T1: Optional[Tensor], T2: Optional[Tensor], dt: Tensor):
+    r"""Relaxation coefficients, and its in-place application on ``m1``
+
+    Usage:
+        ``E, e1_1, fn_relax_ = _relax_fwd(T1, T2, dt)``
+    """
+    if T1 is None:  # relaxations ignored
+        E = e1_1 = None
+    else:
+        E1, E2 = -dt/T1, -dt/T2
+        E1.exp_(), E2.exp_()  # should have fewer alloc than exp(-dt/T1)
+        E, e1_1 = torch.cat((E2, E2, E1), dim=-2), E1-1
+    return E, e1_1, _fn_relax(E, e1_1)
+
+
+def _relax_bwd(gE: Tensor, E: Tensor, T1: Tensor, T2: Tensor, dt: Tensor):
+    r"""``∂L/∂T1``, ``∂L/∂T2``, ``∂L/∂dt`` of relaxations, from ``∂L/∂E``
+
+    Usage:
+        ``gT1, gT2, gdt = _relax_bwd(gE, E, T1, T2, dt)``
+    Inputs:
+        - ``gE``: `(N, *Nd, xyz, 1)`, see :func:`_bwd_steps_`, unscaled.
+        - ``E``, ``T1``, ``T2``, ``dt``: see :func:`_relax_fwd`.
+    Outputs:
+        - ``gT1``, ``gT2``, ``gdt``: `(N, *Nd, 1, 1)`, not yet reduced to \
+          the shapes of ``T1``, ``T2``, ``dt``.
+    """
+    # E = exp(-dt/T): ∂E/∂T = E⋅dt/T², ∂E/∂dt = -E/T
+    gE1 = gE[..., 2:3, :]*E[..., 2:3, :]
+    gE2 = (gE[..., 0:1, :]+gE[..., 1:2, :])*E[..., 0:1, :]
+    return gE1*dt/T1**2, gE2*dt/T2**2, -(gE1/T1 + gE2/T2)
+
+
+def _relax_jvp(
+    E: Tensor, T1: Tensor, T2: Tensor, dt: Tensor,
+    Ṫ1: Optional[Tensor], Ṫ2: Optional[Tensor], ddt: Optional[Tensor]
+) -> Optional[Tensor]:
+    r"""Tangent of relaxation coefficients ``E``, see :func:`_relax_fwd`
+
+    Usage:
+        ``Ė = _relax_jvp(E, T1, T2, dt, Ṫ1, Ṫ2, ddt)``
+    Inputs:
+        - ``E``, ``T1``, ``T2``, ``dt``: see :func:`_relax_fwd`.
+        - ``Ṫ1``, ``Ṫ2``, ``ddt``: tangents of ``T1``, ``T2``, ``dt`` ⊻ `None`.
+    Outputs:
+        - ``Ė``: `(N, *Nd, xyz, 1)` ⊻ `None` if all tangents are `None`.
+    """
+    if (Ṫ1 is None) and (Ṫ2 is None) and (ddt is None):
+        return None
+
+    def fn_rate(T, Ṫ):  # E = exp(-dt/T): Ė = E⋅(dt⋅Ṫ/T² - ddt/T)
+        r = 0 if Ṫ is None else dt*Ṫ/T**2
+        return r if ddt is None else r - ddt/T
+
+    Ė = E.clone(memory_format=_contiguous_format)
+    Ė[..., 0:2, :].mul_(fn_rate(T2, Ṫ2))
+    Ė[..., 2:3, :].mul_(fn_rate(T1, Ṫ1))
+    return Ė
+
+
+def _fn_relax(E: Optional[Tensor], e1_1: Optional[Tensor]):
+    r"""In-place relaxation of ``m1``, ``fn_relax_(m1)``, from coefficients
+    """
+    if E is None:  # relaxations ignored
+        return lambda m1: None
+    return lambda m1: (m1.mul_(E))[..., 2:3, :].sub_(e1_1)
+
+
+def _ckpt_step(ckpt: Union[None, int, str], nT: int) -> Optional[int]:
+    r"""Time steps per segment of checkpointed spin history
+
+    Usage:
+        ``k = _ckpt_step(ckpt, nT)``
+    Inputs:
+        - ``ckpt``: `None` ⊻ int ⊻ `'sqrt'`, see :func:`blochsim`.
+        - ``nT``: int, number of time steps.
+    Outputs:
+        - ``k``: int ⊻ `None`, `None` if the full history is to be kept.
+    """
+    if ckpt is None:
+        return None
+    if ckpt == 'sqrt':  # ceil(√nT), minimizes `nT/k + k`
+        ckpt = int(-(-nT**0.5//1))
+    assert(isinstance(ckpt, int) and ckpt >= 1)
+    return None if ckpt >= nT else ckpt
+
+
+def _rot_views(Rot: Tensor, ts):
+    r"""Per step ``(u, ϕ, cϕ_1, sϕ)`` views of ``Rot``, `(nT, N, *Nd, 6, 1)`
+
+    For the ``rots`` of :func:`_fwd_steps_` and :func:`_bwd_steps_`.
+    """
+    for t in ts:
+        R = Rot[t]
+        yield R[..., 0:3, :], R[..., 3:4, :], R[..., 4:5, :], R[..., 5:6, :]
+
+
+def _do_cache_rot(cacheRot: Union[bool, int], nbytes: int) -> bool:
+    r"""Whether to keep the per step rotations, see :func:`blochsim`
+    """
+    if isinstance(cacheRot, bool):
+        return cacheRot
+    return nbytes <= cacheRot  # a "Byte" budget
+
+
+def _anchor_step(ckpt: Union[None, int, str], nT: int) -> int:
+    r"""Time steps between anchors of reversible adjoints
+
+    As :func:`_ckpt_step`, defaults to ``_kAnchor`` if ``ckpt`` is `None`.
+    """
+    return _ckpt_step(_kAnchor if ckpt is None else ckpt, nT) or nT
+
+
+def _ckpt_fwd_(m0: Tensor, Mckpt: Tensor, Mseg: Tensor, k: int, nT: int,
+               fn_seg_) -> Tensor:
+    r"""Forward time loop in segments, keeping spins of segment starts only
+
+    Inputs:
+        - ``m0``: `(N, *Nd, xyz, 1)`, spins before the first step.
+        - ``Mckpt``: `(N, *Nd, xyz, ceil(nT/k))`, checkpoints, filled \
+          in-place by the spins before each segment.
+        - ``Mseg``: `(N, *Nd, xyz, k)`, temporary segment history.
+        - ``k``: int, time steps per segment.
+        - ``nT``: int, number of time steps.
+        - ``fn_seg_``: callable, ``m1 = fn_seg_(mc, Ms, t0, t1)``, simulates \
+          steps ``t0:t1`` from ``mc``, filling the history ``Ms``.
+    Outputs:
+        - ``m1``: `(N, *Nd, xyz, 1)`, spins after the last step.
+    """
+    for s, t0 in enumerate(range(0, nT, k)):
+        t1 = min(t0+k, nT)
+        mc = Mckpt.narrow(-1, s, 1)
+        mc.copy_(m0)
+        m0 = fn_seg_(mc, Mseg.narrow(-1, 0, t1-t0), t0, t1)
+    return m0
+
+
+def _ckpt_bwd_(h1: Tensor, h0: Tensor, Mckpt: Tensor, Mseg: Tensor, k: int,
+               nT: int, fn_seg_, fn_seg_bwd_) -> Tuple[Tensor, Tensor]:
+    r"""Backward time loop in segments, recomputing each segment's history
+
+    Inputs:
+        - ``h1``, ``h0``: see :func:`_bwd_steps_`.
+        - ``Mckpt``, ``Mseg``, ``k``, ``nT``, ``fn_seg_``: see \
+          :func:`_ckpt_fwd_`, ``Mckpt`` is overwritten.
+        - ``fn_seg_bwd_``: callable, \
+          ``h1, h0 = fn_seg_bwd_(h1, h0, mc, Ms, t0, t1)``, backward of steps \
+          ``t0:t1``, see :func:`_bwd_steps_`.
+    Outputs:
+        - ``h1``, ``h0``: see :func:`_bwd_steps_`.
+    """
+    for s, t0 in reversed(list(enumerate(range(0, nT, k)))):
+        t1 = min(t0+k, nT)
+        mc, Ms = Mckpt.narrow(-1, s, 1), Mseg.narrow(-1, 0, t1-t0)
+        fn_seg_(mc, Ms, t0, t1)  # recompute the history of this segment
+        h1, h0 = fn_seg_bwd_(h1, h0, mc, Ms, t0, t1)
+    return h1, h0
+
+
+def _rev_m1s(m0: Tensor, Manc: Tensor, Mbuf: Tensor, k: int, nT: int):
+    r"""Holders of spins after each step, w/ anchors, for :func:`_fwd_steps_`
+
+    History free, ``Mbuf`` is ping-ponged. The spins before every ``k``-th
+    step are copied into the anchors ``Manc`` on the fly; the spins after the
+    last step, ``Manc[..., -1]``, are left to the caller.
+
+    Inputs:
+        - ``m0``: `(N, *Nd, xyz, 1)`, spins before the first step.
+        - ``Manc``: `(N, *Nd, xyz, ceil(nT/k)+1)`, float64, anchors.
+        - ``Mbuf``: `(N, *Nd, xyz, 2)`, ping-pong buffer.
+        - ``k``: int, time steps between anchors.
+        - ``nT``: int, number of time steps.
+    """
+    for t in range(nT):
+        if t % k == 0:
+            Manc[..., t//k:t//k+1].copy_(m0)
+        m0 = Mbuf.narrow(-1, t % 2, 1)
+        yield m0
+
+
+def _rev_m0s(Manc: Tensor, Mbuf: Tensor, k: int, nT: int, γbeffs,
+             E: Optional[Tensor], e1_1: Optional[Tensor]):
+    r"""Spins before each step, in reversed time order, by inverting steps
+
+    Each step, a rotation then a relaxation w/ ``E > 0``, is invertible.
+    Starting from the spins after the last step, ``Manc[..., -1]``, the spins
+    before step `t` are recomputed from those after it, in float64, and
+    reset to the anchor every ``k`` steps, so the drift of the inversion
+    never builds up over more than ``k`` steps.
+
+    Inputs:
+        - ``Manc``, ``k``, ``nT``: see :func:`_rev_m1s`.
+        - ``Mbuf``: `(N, *Nd, xyz, 2)`, ping-pong buffer, spins of step `t` \
+          are in ``Mbuf[..., t%2]``, and ``Mbuf[..., nT%2]`` is left for the \
+          caller to hold the spins after the last step.
+        - ``γbeffs``: iterable of `(N, *Nd, xyz, 1)`, ``γ2πdt⋅beff`` of each \
+          step, in reversed time order. Consumed before its step is yielded.
+        - ``E``, ``e1_1``: relaxation coefficients, see :func:`_relax_fwd`.
+    """
+    tkw = {'dtype': Manc.dtype, 'device': Manc.device}
+    NNd = Manc.shape[:-2]
+    if E is not None:
+        E, e1_1 = E.to(**tkw), e1_1.to(**tkw)
+
+    m = Manc[..., -1:].clone(memory_format=_contiguous_format)
+    γbeff, u, uxm = (torch.empty(NNd+(3, 1), **tkw) for _ in range(3))
+    ϕ, cϕ_1, sϕ = (torch.empty(NNd+(1, 1), **tkw) for _ in range(3))
+
+    for t, γbeff_ in zip(range(nT-1, -1, -1), γbeffs):
+        if t % k == 0:  # anchor
+            m.copy_(Manc[..., t//k:t//k+1])
+        else:
+            # Inverse relaxation: m̃₁ ≔ E⁻¹(m₁ + (E1-1)ẑ)
+            if E is not None:
+                m[..., 2:3, :].add_(e1_1)
+                m.div_(E)
+
+            # Inverse rotation, R(u, -ϕ)⁻¹ = R(u, ϕ):
+            # m₀ = m̃₁ + sϕ*u×m̃₁ + (cϕ-1)*(m̃₁ - uᵀm̃₁*u)
+            γbeff.copy_(γbeff_)
+            torch.norm(γbeff, dim=-2, keepdim=True, out=ϕ)
+            torch.sin(ϕ, out=sϕ)
+            torch.cos(ϕ, out=cϕ_1)
+            cϕ_1.sub_(1)
+            ϕ.clamp_(min=1e-12)
+            torch.div(γbeff, ϕ, out=u)
+
+            torch.mul(u, m, out=uxm)
+            torch.sum(uxm, dim=-2, keepdim=True, out=ϕ)  # ϕ reused as uᵀm̃₁
+            torch.cross(u, m, dim=-2, out=uxm)
+            torch.addcmul(m, ϕ, u, value=-1, out=u)  # m̃₁ - uᵀm̃₁*u
+            m.addcmul_(sϕ, uxm).addcmul_(cϕ_1, u)
+
+        m0 = Mbuf.narrow(-1, t % 2, 1)
+        m0.copy_(m)
+        yield m0
+
+
+def _fn_empty(workspace: Optional[utils.Workspace], tkw: dict):
+    r"""``torch.empty``, or borrowing from ``workspace`` when provided
+    """
+    if workspace is None:
+        return lambda shape: torch.empty(shape, **tkw)
+    return lambda shape: workspace.borrow(shape, dtype=tkw['dtype'],
+                                          device=tkw['device'])
 
 
 class BlochSim(Function):
     r"""BlochSim with explict Jacobian operation (backward)
 
-    This operator is only differentiable w.r.t. ``Mi`` and ``Beff``.
+    This operator is differentiable w.r.t. ``Mi``, ``Beff``, ``T1``, ``T2``,
+    ``γ`` and ``dt``.
 
     """
 
     @staticmethod
     def forward(
         ctx: CTX, Mi: Tensor, Beff: Tensor,
-        T1: Optional[Tensor], T2: Optional[Tensor], γ: Tensor, dt: Tensor
+        T1: Optional[Tensor], T2: Optional[Tensor], γ: Tensor, dt: Tensor,
+        engine: str = 'loop', doHist: bool = True,
+        workspace: Optional[utils.Workspace] = None,
+        ckpt: Union[None, int, str] = None, doReversible: bool = False,
+        cacheRot: Union[bool, int] = False
     ) -> Tensor:
         r"""Forward evolution of Bloch simulation
 
@@ -45,81 +863,167 @@ class BlochSim(Function):
             - ``T2``: `(N ⊻ 1, *Nd ⊻ len(Nd)*(1,), 1, 1)`, "Sec", T₂
             - ``γ``:  `(N ⊻ 1, *Nd ⊻ len(Nd)*(1,), 1, 1)`, "Hz/Gauss", gyro.
             - ``dt``: `(N ⊻ 1, len(Nd)*(1,), 1, 1)`, "Sec", dwell time.
+            - ``engine``: str, ``'loop'`` ⊻ ``'jit'``, see \
+              :func:`~mrphy.sims.blochsim`.
+            - ``doHist``: bool, if ``False``, or no input needs grad, spin \
+              history is not kept, and backward is not available. \
+              `ctx.needs_input_grad` does not reflect `torch.no_grad()`, \
+              hence this input.
+            - ``workspace``: mrphy.utils.Workspace, where the temporary \
+              buffers of forward and backward are borrowed from.
+            - ``ckpt``: `None` ⊻ int ⊻ `'sqrt'`, spin history checkpointing, \
+              see :func:`~mrphy.sims.blochsim`.
+            - ``doReversible``: bool, reversible adjoint, w/ anchors every \
+              ``ckpt`` steps, see :func:`~mrphy.sims.blochsim`.
+            - ``cacheRot``: bool ⊻ int, keep the rotations of forward for \
+              backward, see :func:`~mrphy.sims.blochsim`.
         Outputs:
             - ``Mo``: `(N, *Nd, xyz)`, Magetic spins after simulation.
         """
+        assert(engine in _engines)
+        ctx.save_for_forward(Mi, Beff, T1, T2, γ, dt)  # for `jvp`
+        needs_grad = ctx.needs_input_grad
+        doHist = doHist and any(needs_grad[0:6])
         NNd, nT = Beff.shape[:-2], Beff.shape[-1]
+        doRev = doHist and doReversible
+        assert(not doRev or engine == 'loop')
+        k = (_anchor_step(ckpt, nT) if doRev else
+             _ckpt_step(ckpt, nT) if doHist else None)
+        # `(u, ϕ, cϕ_1, sϕ)` per step, twice the size of the full history
+        doRot = (doHist and (k is None) and engine == 'loop' and
+                 _do_cache_rot(cacheRot, 2*Beff.numel()*Mi.element_size()))
         # (t)ensor (k)ey(w)ord, contiguous to avoid alloc/copy when reshape
         tkw = {'memory_format': _contiguous_format,
                'dtype': Mi.dtype, 'device': Mi.device}
 
         # %% Preprocessing
         γ2πdt = 2*π*γ*dt
-        γBeff = torch.empty(Beff.shape, **tkw)
-        torch.mul(γ2πdt, Beff, out=γBeff)
+        Mi0 = Mi  # the input, for backward
         Mi = Mi.clone(memory_format=_contiguous_format)[..., None]
-        # γBeff = γ2πdt*Beff.contiguous()
 
         assert((T1 is None) == (T2 is None))  # both or neither
+        E, e1_1, fn_relax_ = _relax_fwd(T1, T2, dt)
 
-        if T1 is None:  # relaxations ignored
-            E = e1_1 = None
-            fn_relax_ = lambda m1: None  # noqa: E731
-        else:
-            E1, E2 = -dt/T1, -dt/T2
-            E1.exp_(), E2.exp_()  # should have fewer alloc than exp(-dt/T1)
-            E, e1_1 = torch.cat((E2, E2, E1), dim=-2), E1-1
-            fn_relax_ = lambda m1: (m1.mul_(E)  # noqa: E731
-                                    )[..., 2:3, :].sub_(e1_1)
+        fn_empty = _fn_empty(workspace, tkw)
 
         # Pre-allocate intermediate variables, in case of overhead alloc's
-        u = torch.empty(Mi.shape, **tkw)  # (N, *Nd, xyz, 1)
-        ϕ, cϕ_1, sϕ = (torch.empty(NNd+(1, 1), **tkw) for _ in range(3))
+        u = fn_empty(Mi.shape)  # (N, *Nd, xyz, 1)
+        ϕ, cϕ_1, sϕ = (fn_empty(NNd+(1, 1)) for _ in range(3))
 
         # %% Other variables to be cached
-        m0, Mhst = Mi, torch.empty(NNd+(3, nT), **tkw)
+        if doHist:
+            # Not borrowed, it becomes `grad_Beff` in backward.
+            γBeff = torch.empty(Beff.shape, **tkw)
+            torch.mul(γ2πdt, Beff, out=γBeff)
+            if doRev:  # float64 anchors in `Mhst`, ping-pong `m` buffers
+                Mhst = _fn_empty(workspace, {**tkw, 'dtype': torch.float64})(
+                    NNd+(3, -(-nT//k)+1))
+                Mbuf = fn_empty(NNd+(3, 2))
+                m1s = _rev_m1s(Mi, Mhst, Mbuf, k, nT)
+                γbeffs = γBeff.split(1, dim=-1)
+            elif k is None:
+                Mhst = fn_empty(NNd+(3, nT))
+                m1s, γbeffs = Mhst.split(1, dim=-1), γBeff.split(1, dim=-1)
+            else:  # checkpoints in `Mhst`, a segment of history in `Mseg`
+                Mhst, Mseg = (fn_empty(NNd+(3, n)) for n in (-(-nT//k), k))
+        else:  # history free: ping-pong `m` buffers, `γbeff` made per step
+            γBeff = Mhst = None
+            Mbuf, γbeff = (fn_empty(NNd+(3, n)) for n in (2, 1))
+            m1s = (Mbuf.narrow(-1, t % 2, 1) for t in range(nT))
+            γbeffs = (torch.mul(γ2πdt, beff, out=γbeff)
+                      for beff in Beff.split(1, dim=-1))
+
+        Rot = fn_empty((nT,)+NNd+(6, 1)) if doRot else None
+
+        m0 = Mi
 
         # %% Simulation. could we learn to live right.
-        for m1, γbeff in zip(Mhst.split(1, dim=-1), γBeff.split(1, dim=-1)):
-            # Rotation
-            torch.norm(γbeff, dim=-2, keepdim=True, out=ϕ)
-            ϕ.clamp_(min=1e-12)
-            torch.div(γbeff, ϕ, out=u)
-
-            torch.sin(ϕ, out=sϕ)
-            torch.cos(ϕ, out=cϕ_1)
-            cϕ_1.sub_(1)  # (cϕ-1)
-
-            ϕ.clamp_(min=1e-12)
-            torch.div(γbeff, ϕ, out=u)
-
-            # wiki/Rotation_matrix#Rotation_matrix_from_axis_and_angle
-            # Angle is `-ϕ` as Bloch-eq is 𝑀×𝐵
-            # m₁ = R(u, -ϕ)m₀ = cϕ*m₀ + (1-cϕ)*uᵀm₀*u - sϕ*u×m₀
-            # m₁ = m₀ - sϕ*u×m₀ + (cϕ-1)*(m₀ - uᵀm₀*u), in-place friendly
-            torch.mul(u, m0, out=m1)  # using m₁ as an temporary storage
-            torch.sum(m1, dim=-2, keepdim=True, out=ϕ)  # ϕ reused as uᵀm₀
-
-            torch.cross(u, m0, dim=-2, out=m1)  # u×m₀
-            torch.addcmul(m0, sϕ, m1, value=-1, out=m1)  # m₀ - sϕ*(u×m₀)
-
-            torch.addcmul(m0, ϕ, u, value=-1, out=u)  # m₀ - uᵀm₀*u
-
-            torch.addcmul(m1, cϕ_1, u, out=m1)  # m₀-sϕ*u×m₀+(cϕ-1)*(m₀-uᵀm₀*u)
-
-            # Relaxation
-            fn_relax_(m1)
+        if doRev:
+            m0 = _fwd_steps_(m0, m1s, γbeffs, fn_relax_, u, ϕ, cϕ_1, sϕ)
+            Mhst[..., -1:].copy_(m0)
+        elif k is not None:
+            fn_seg_ = BlochSim._fn_seg(engine, γBeff, E, e1_1, fn_relax_,
+                                       u, ϕ, cϕ_1, sϕ)
+            m0 = _ckpt_fwd_(m0, Mhst, Mseg, k, nT, fn_seg_)
+        elif engine == 'jit':
+            m0 = (_get_jit_sweeps()[0](Mhst, Mi, γBeff, None, E, e1_1)
+                  if doHist else
+                  _get_jit_sweeps()[0](None, Mi, Beff, γ2πdt, E, e1_1))
+        else:
+            rots = _rot_views(Rot, range(nT)) if doRot else None
+            m0 = _fwd_steps_(m0, m1s, γbeffs, fn_relax_, u, ϕ, cϕ_1, sϕ,
+                             rots)
+
+        if doHist:
+            ctx.save_for_backward(Mi0, Mhst, γBeff, E, e1_1, γ2πdt, Rot,
+                                  T1, T2, γ, dt, Beff)
+            ctx.engine, ctx.workspace, ctx.k = engine, workspace, k
+            ctx.doReversible = doRev
+        Mo = m0[..., 0].clone()  # -> (N, *Nd, xyz)
+
+        if workspace is not None:  # `Mhst` is released by backward
+            workspace.release(u, ϕ, cϕ_1, sϕ,
+                              *((γbeff,) if not doHist else ()),
+                              *((Mbuf,) if doRev or not doHist else
+                                (Mseg,) if k is not None else ()))
+        return Mo
 
-            m0 = m1
+    @staticmethod
+    def _fn_seg(engine: str, γBeff: Tensor,
+                E: Optional[Tensor], e1_1: Optional[Tensor], fn_relax_,
+                u: Tensor, ϕ: Tensor, cϕ_1: Tensor, sϕ: Tensor):
+        r"""``fn_seg_(mc, Ms, t0, t1)`` of :func:`_ckpt_fwd_`
+        """
+        if engine == 'jit':
+            return lambda mc, Ms, t0, t1: _get_jit_sweeps()[0](
+                Ms, mc, γBeff[..., t0:t1], None, E, e1_1)
+        return lambda mc, Ms, t0, t1: _fwd_steps_(
+            mc, Ms.split(1, dim=-1), γBeff[..., t0:t1].split(1, dim=-1),
+            fn_relax_, u, ϕ, cϕ_1, sϕ)
 
-        ctx.save_for_backward(Mi, Mhst, γBeff, E, e1_1, γ2πdt)
-        Mo = Mhst[..., -1].clone()  # -> (N, *Nd, xyz)
-        return Mo
+    @staticmethod
+    def nbytes_per_spin(
+        nT: int, dtype: torch.dtype, *, doHist: bool = True,
+        engine: str = 'loop', ckpt: Union[None, int, str] = None,
+        doReversible: bool = False, doRot: bool = False
+    ) -> int:
+        r"""Bytes per spin that forward allocates and keeps for backward
+
+        Excludes the inputs, ``Beff`` in particular. Backward reuses these
+        buffers, e.g., ``γBeff`` becomes ``grad_Beff``.
+
+        Usage:
+            ``n = BlochSim.nbytes_per_spin(nT, dtype, *, doHist, engine,``\
+            `` ckpt, doReversible, doRot)``
+        Inputs:
+            - ``nT``: int, number of time steps.
+            - ``dtype``: torch.dtype, of ``Mi`` and ``Beff``.
+        Optionals:
+            - ``doHist``, ``engine``, ``ckpt``, ``doReversible``: see \
+              :func:`forward`.
+            - ``doRot``: [t/F], whether the per step rotations are cached, \
+              see ``cacheRot`` of :func:`forward`.
+        Outputs:
+            - ``n``: int, "Byte".
+        """
+        es = torch.empty((), dtype=dtype).element_size()
+        n = 6*es  # u, ϕ, cϕ_1, sϕ
+        if not doHist:
+            return n + 3*3*es  # Mbuf, γbeff
+        n += 3*nT*es  # γBeff
+        if doReversible:
+            k = _anchor_step(ckpt, nT)
+            return n + 3*(-(-nT//k)+1)*8 + 3*2*es  # float64 anchors, Mbuf
+        k = _ckpt_step(ckpt, nT)
+        if k is not None:
+            return n + 3*(-(-nT//k)+k)*es  # checkpoints, Mseg
+        return n + 3*nT*es + (6*nT*es if doRot and engine == 'loop' else 0)
 
     @staticmethod
     def backward(
         ctx: CTX, grad_Mo: Tensor
-    ) -> Tuple[Tensor, Tensor, None, None, None, None]:
+    ) -> Tuple[Tensor, Tensor, Tensor, Tensor, Tensor, Tensor, None, None,
+               None, None, None, None]:
         r"""Backward evolution of Bloch simulation Jacobians
 
         Inputs:
@@ -130,42 +1034,40 @@ class BlochSim(Function):
             - ``grad_Mi``: `(N, *Nd, xyz)`, derivative w.r.t. input Magetic \
               spins.
             - ``grad_Beff``: `(N,*Nd,xyz,nT)`, derivative w.r.t. B-effective.
-            - None*4, this implemendation do not provide derivatives w.r.t.: \
-              `T1`, `T2`, `γ`, and `dt`.
+            - ``grad_T1``, ``grad_T2``, ``grad_γ``, ``grad_dt``: derivatives \
+              w.r.t. ``T1``, ``T2``, ``γ``, ``dt``, of their shapes.
+            - None*6, for the non-tensor `engine`, `doHist`, `workspace`, \
+              `ckpt`, `doReversible`, `cacheRot`.
         """
-        # grads of configuration variables are not supported yet
         needs_grad = ctx.needs_input_grad
         grad_Beff = grad_Mi = grad_T1 = grad_T2 = grad_γ = grad_dt = None
 
-        if not any(needs_grad[0:2]):  # (Mi,Beff;T1,T2,γ,dt):
-            return grad_Mi, grad_Beff, grad_T1, grad_T2, grad_γ, grad_dt
+        if not any(needs_grad[0:6]):  # (Mi,Beff,T1,T2,γ,dt;engine,...)
+            return (grad_Mi, grad_Beff, grad_T1, grad_T2, grad_γ, grad_dt,
+                    None, None, None, None, None, None)
+
+        if torch.is_grad_enabled():  # `create_graph`, e.g., double backward
+            return BlochSim._backward_diff(ctx, grad_Mo)
 
         # %% Jacobians. If we turn back time,
-        # ctx.save_for_backward(Mi, Mhst, γBeff, E, e1_1, γ2πdt)
-        Mi, Mhst, γBeff, E, e1_1, γ2πdt = ctx.saved_tensors
-        NNd = γBeff.shape[:-2]
+        # ctx.save_for_backward(Mi, Mhst, γBeff, E, e1_1, γ2πdt, Rot,
+        #                       T1, T2, γ, dt, Beff)
+        (Mi, Mhst, γBeff, E, e1_1, γ2πdt, Rot,
+         T1, T2, γ, dt, Beff) = ctx.saved_tensors
+        Mi = Mi[..., None]
+        NNd, nT, k = γBeff.shape[:-2], γBeff.shape[-1], ctx.k
         # (t)ensor (k)ey(w)ord, contiguous to avoid alloc/copy when reshape
         tkw = {'memory_format': _contiguous_format,
                'dtype': Mi.dtype, 'device': Mi.device}
 
-        # assert((E is None) == (e1_1 is None))  # both or neither
-        if E is None:  # relaxations ignored
-            fn_relax_h1_ = lambda h1: None  # noqa: E731
-            fn_relax_m1_ = lambda m1: None  # noqa: E731
-        else:
-            fn_relax_h1_ = lambda h1: h1.mul_(E)  # noqa: E731
-
-            def fn_relax_m1_(m1):
-                m1[..., 2:3, :].add_(e1_1)
-                m1.div_(E)
-                return
+        workspace = ctx.workspace
+        fn_empty = _fn_empty(workspace, tkw)
 
         # Pre-allocate intermediate variables, in case of overhead alloc's
-        h0 = torch.empty(NNd+(3, 1), **tkw)
+        h0 = h0_buf = fn_empty(NNd+(3, 1))
 
-        u, uxh1 = (torch.empty(NNd+(3, 1), **tkw) for _ in range(2))
-        ϕ, cϕ_1, sϕ, utm0, uth1 = (torch.empty(NNd+(1, 1), **tkw)
-                                   for _ in range(5))
+        u, uxh1 = (fn_empty(NNd+(3, 1)) for _ in range(2))
+        ϕ, cϕ_1, sϕ, utm0, uth1 = (fn_empty(NNd+(1, 1)) for _ in range(5))
         # ϕis0 = torch.empty(NNd+(1, 1),
         #                    memory_format=tkw['memory_format'],
         #                    device=tkw['device'], dtype=torch.bool)
@@ -173,106 +1075,524 @@ class BlochSim(Function):
         # u_dflt = torch.tensor([[0.], [0.], [1.]],  # (xyz, 1)
         #                       device=tkw['device'], dtype=tkw['dtype'])
 
-        m1 = Mhst.narrow(-1, -1, 1)
+        # ∂L/∂E, accumulated over steps, for ∂L/∂T1, ∂L/∂T2, ∂L/∂dt
+        doGE = (E is not None) and (any(needs_grad[2:4]) or needs_grad[5])
+        gE = (torch.zeros(NNd+(3, 1), dtype=Mi.dtype, device=Mi.device)
+              if doGE else None)
+
+        # ∂L/∂B, also needed for ∂L/∂γ, ∂L/∂dt
+        doGBeff = needs_grad[1] or any(needs_grad[4:6])
 
         # scale by -γ2πdt, so output ∂L/∂B no longer needs multiply by -γ2πdt
         h1.mul_(-γ2πdt)
-        for m0, γbeff in zip(reversed((Mi,)+Mhst.split(1, dim=-1)[:-1]),
-                             reversed(γBeff.split(1, dim=-1))):
-            # %% Ajoint Relaxation:
-            fn_relax_h1_(h1)  # h₁ → h̃₁ ≔ ∂L/∂m̃₁ = E∂L/∂m₁
-            fn_relax_m1_(m1)  # m₁ → m̃₁ ≔ Rm₀ = E⁻¹m₁
-
-            # %% Adjoint Rotations:
-            # Prepare all the elements
-            torch.norm(γbeff, dim=-2, keepdim=True, out=ϕ)
-            # compute `sin`, `cos` before `ϕ.clamp_()`
-            torch.sin(ϕ, out=sϕ)
-            torch.cos(ϕ, out=cϕ_1)
-            cϕ_1.sub_(1)
+        if ctx.doReversible:  # `Mhst` holds anchors, spins recomputed
+            Mbuf = fn_empty(NNd+(3, 2))
+            m1 = Mbuf.narrow(-1, nT % 2, 1)
+            m1.copy_(Mhst[..., -1:])
+            m0s = _rev_m0s(Mhst, Mbuf, k, nT,
+                           reversed(γBeff.split(1, dim=-1)), E, e1_1)
+            γbeffs = reversed(γBeff.split(1, dim=-1))
+            h1, h0 = _bwd_steps_(h1, h0, m1, m0s, γbeffs, E, e1_1,
+                                 lambda g: None, u, uxh1, ϕ, cϕ_1, sϕ, utm0,
+                                 uth1, gE=gE, doGBeff=doGBeff)
+            if workspace is not None:
+                workspace.release(Mbuf)
+        elif k is not None:  # `Mhst` holds checkpoints, segments recomputed
+            Mseg = fn_empty(NNd+(3, k))
+            fn_seg_ = BlochSim._fn_seg(ctx.engine, γBeff, E, e1_1,
+                                       _fn_relax(E, e1_1), u, ϕ, cϕ_1, sϕ)
+            if ctx.engine == 'jit':
+                def fn_seg_bwd_(h1, h0, mc, Ms, t0, t1):
+                    return (_get_jit_sweeps()[1](h1, mc, Ms,
+                                                 γBeff[..., t0:t1], E, e1_1,
+                                                 gE, doGBeff),
+                            h0)
+            else:
+                def fn_seg_bwd_(h1, h0, mc, Ms, t0, t1):
+                    return _bwd_steps_(
+                        h1, h0, Ms.narrow(-1, -1, 1),
+                        reversed((mc,)+Ms.split(1, dim=-1)[:-1]),
+                        reversed(γBeff[..., t0:t1].split(1, dim=-1)),
+                        E, e1_1, lambda g: None, u, uxh1, ϕ, cϕ_1, sϕ,
+                        utm0, uth1, gE=gE, doGBeff=doGBeff)
+            h1, h0 = _ckpt_bwd_(h1, h0, Mhst, Mseg, k, nT, fn_seg_,
+                                fn_seg_bwd_)
+            if workspace is not None:
+                workspace.release(Mseg)
+        elif ctx.engine == 'jit':
+            h1 = _get_jit_sweeps()[1](h1, Mi, Mhst, γBeff, E, e1_1, gE,
+                                      doGBeff)
+        else:
+            m1 = Mhst.narrow(-1, -1, 1)
+            m0s = reversed((Mi,)+Mhst.split(1, dim=-1)[:-1])
+            γbeffs = reversed(γBeff.split(1, dim=-1))
+            rots = (None if Rot is None else
+                    _rot_views(Rot, range(nT-1, -1, -1)))
+            h1, h0 = _bwd_steps_(h1, h0, m1, m0s, γbeffs, E, e1_1,
+                                 lambda g: None, u, uxh1, ϕ, cϕ_1, sϕ, utm0,
+                                 uth1, rots, gE, doGBeff)
 
-            ϕ.clamp_(min=1e-12)
-            torch.div(γbeff, ϕ, out=u)
+        # %% Clean up
+        grad_Beff = γBeff if doGBeff else None
+
+        # %% ∂L/∂T1, ∂L/∂T2, ∂L/∂γ, ∂L/∂dt
+        if any(needs_grad[2:6]):
+            gT1 = gT2 = gdt = gγ2πdt = 0
+            if gE is not None:  # undo the multiply by -γ2πdt on gE
+                gT1, gT2, gdt = _relax_bwd(gE.div_(-γ2πdt), E, T1, T2, dt)
+            if any(needs_grad[4:6]):  # ∂L/∂γ2πdt = ∑ₜ(∂L/∂Bₜ)ᵀBₜ/γ2πdt
+                gγ2πdt = torch.linalg.vecdot(grad_Beff.flatten(-2),
+                                             Beff.flatten(-2))
+                gγ2πdt = gγ2πdt[..., None, None]/γ2πdt
+            if needs_grad[2]:
+                grad_T1 = gT1.sum_to_size(T1.shape)
+            if needs_grad[3]:
+                grad_T2 = gT2.sum_to_size(T2.shape)
+            if needs_grad[4]:
+                grad_γ = (gγ2πdt*(2*π*dt)).sum_to_size(γ.shape)
+            if needs_grad[5]:
+                grad_dt = (gγ2πdt*(2*π*γ) + gdt).sum_to_size(dt.shape)
 
-            # TODO: Resolve singularities of ϕ=0, control pov?
-            # torch.logical_not(ϕ, out=ϕis0)
-            # if torch.any(ϕis0):
-            #     u[ϕis0[..., 0, 0]] = u_dflt
+        # undo the multiply by -γ2πdt on h1
+        grad_Mi = h1[..., 0].div_(-γ2πdt[..., 0]) if needs_grad[0] else None
 
-            torch.mul(u, m0, out=h0)
-            torch.sum(h0, dim=-2, keepdim=True, out=utm0)  # uᵀm₀
+        if workspace is not None:  # `Mhst`, `Rot` are overwritten by now
+            isFree = (h1 is not h0_buf) or (not needs_grad[0])
+            workspace.release(Mhst, Rot, u, uxh1, ϕ, cϕ_1, sϕ, utm0, uth1,
+                              *((h0_buf,) if isFree else ()))
 
-            # %% Assemble h₀: (R(u, -ϕ)ᵀ ≡ R(u, ϕ))
-            # h₀ ≔ R(u, ϕ)h̃₁ = cϕ*h₁ + (1-cϕ)*uᵀh₁*u + sϕ*u×h₁
-            # h₀ = h̃₁ + (cϕ-1)*(h̃₁ - uᵀh̃₁*u) + sϕ*u×h̃₁, in-place friendly
-            torch.mul(u, h1, out=h0)  # using h0 as an temporary storage
-            torch.sum(h0, dim=-2, keepdim=True, out=uth1)  # uᵀh̃₁
+        # forward(ctx, Mi, Beff; T1, T2, γ, dt, engine, doHist, workspace,
+        #         ckpt, doReversible, cacheRot):
+        return (grad_Mi, grad_Beff, grad_T1, grad_T2, grad_γ, grad_dt,
+                None, None, None, None, None, None)
 
-            torch.cross(u, h1, dim=-2, out=uxh1)  # u×h̃₁
-            torch.addcmul(h1, uth1, u, value=-1, out=h0)  # h̃₁-uᵀh̃₁*u
+    @staticmethod
+    def _backward_diff(
+        ctx: CTX, grad_Mo: Tensor, xs: Optional[tuple] = None
+    ) -> Tuple[Tensor, Tensor, Tensor, Tensor, Tensor, Tensor, None, None,
+               None, None, None, None]:
+        r"""Differentiable backward, for ``create_graph=True``
+
+        The explicit backward sweep is not recorded by autograd, it is run
+        through :class:`BlochSimGrad` instead, over the spin history kept by
+        forward, left intact, so that its outputs can be differentiated
+        again, e.g., for Hessian-vector products. ``xs``, if provided, are
+        the ``(Mi, Beff, T1, T2, γ, dt)`` to connect the graph to, in place
+        of the saved inputs, see :func:`BlochSimThreads.backward`.
+        """
+        # ctx.save_for_backward(Mi, Mhst, γBeff, E, e1_1, γ2πdt, Rot,
+        #                       T1, T2, γ, dt, Beff)
+        (Mi, Mhst, _, _, _, _, _, T1, T2, γ, dt, Beff) = ctx.saved_tensors
+        xs = (Mi, Beff, T1, T2, γ, dt) if xs is None else xs
+        grads = BlochSimGrad.apply(grad_Mo, *xs, Mhst, ctx.k,
+                                   ctx.needs_input_grad[0:6])
+        return (*grads, None, None, None, None, None, None)
 
-            torch.addcmul(h1, cϕ_1, h0, out=h0)  # h̃₁ + (cϕ-1)*(h̃₁-uᵀh̃₁*u)
+    @staticmethod
+    def jvp(
+        ctx: CTX, Ṁi: Optional[Tensor], Ḃeff: Optional[Tensor],
+        Ṫ1: Optional[Tensor], Ṫ2: Optional[Tensor], dγ: Optional[Tensor],
+        ddt: Optional[Tensor], *args
+    ) -> Tensor:
+        r"""Forward-mode derivative of Bloch simulation, tangents of inputs
 
-            # Finish: h₀ = h̃₁ + (cϕ-1)*(h̃₁ - uᵀh̃₁*u) + sϕ*u×h̃₁
-            torch.addcmul(h0, sϕ, uxh1, value=1, out=h0)
+        Inputs:
+            - ``ctx``: `(1,)`, pytorch CTX cacheing object
+            - ``Ṁi``, ``Ḃeff``, ``Ṫ1``, ``Ṫ2``, ``dγ``, ``ddt``: tangents of \
+              ``Mi``, ``Beff``, ``T1``, ``T2``, ``γ``, ``dt``, of their \
+              shapes, ⊻ `None`.
+            - ``args``: tangents of the non-tensor inputs, ignored.
+        Outputs:
+            - ``Ṁo``: `(N, *Nd, xyz)`, tangent of the output Magetic spins.
 
-            # %% Assemble ∂L/∂B[..., t], store into γbeff
-            # -γδt⋅(+sϕ/ϕ⋅m₀×h̃₁
-            #       +(cϕ-1)/ϕ⋅(uᵀm₀⋅h̃₁+uᵀh̃₁⋅m₀)
-            #       +((sϕ/ϕ⋅m₀-m̃₁)ᵀ(u×h̃₁)-2(cϕ-1)/ϕ⋅uᵀm₀⋅uᵀh̃1)*u )
+        .. note::
+            The spins are simulated again, alongside their tangents, in one
+            forward sweep, w/o keeping any history.
+        """
+        return _blochsim_jvp(*ctx.saved_tensors, Ṁi, Ḃeff, Ṫ1, Ṫ2, dγ, ddt)
 
-            cϕ_1.div_(ϕ), sϕ.div_(ϕ)  # cϕ-1, sϕ → (cϕ-1)/ϕ, sϕ/ϕ
-            # if torch.any(ϕis0):  # handle division-by-0
-            #     cϕ_1[ϕis0], sϕ[ϕis0] = 0, 1
 
-            # %%% sϕ/ϕ⋅(m₀×h̃₁)
-            torch.cross(m0, h1, dim=-2, out=γbeff)  # m₀×h̃₁
-            γbeff.mul_(sϕ)  # sϕ/ϕ⋅(m₀×h̃₁)
+def _blochsim_jvp(
+    Mi: Tensor, Beff: Tensor,
+    T1: Optional[Tensor], T2: Optional[Tensor], γ: Tensor, dt: Tensor,
+    Ṁi: Optional[Tensor], Ḃeff: Optional[Tensor],
+    Ṫ1: Optional[Tensor], Ṫ2: Optional[Tensor], dγ: Optional[Tensor],
+    ddt: Optional[Tensor]
+) -> Tensor:
+    r"""Tangent of :class:`BlochSim`, see :func:`BlochSim.jvp`
+    """
+    γ2πdt, dγ2πdt, E, e1_1, Ė = _coefs_jvp(T1, T2, γ, dt, Ṫ1, Ṫ2, dγ, ddt)
+    Ṁi = torch.zeros_like(Mi) if Ṁi is None else Ṁi
+    Ṁo = _jvp_steps(Mi[..., None], Ṁi[..., None], Beff, Ḃeff, γ2πdt, dγ2πdt,
+                    E, e1_1, Ė)
+    return Ṁo[..., 0]
 
-            # %%% sϕ/ϕ⋅(m₀×h̃₁) + (cϕ-1)/ϕ⋅(uᵀm₀⋅h̃₁+uᵀh̃₁⋅m₀)
-            h1.mul_(utm0)  # uᵀm₀⋅h̃₁
-            torch.addcmul(h1, uth1, m0, out=h1)  # (uᵀm₀⋅h̃₁+uᵀh̃₁⋅m₀)
-            torch.addcmul(γbeff, cϕ_1, h1, value=1, out=γbeff)
 
-            # %%% sϕ/ϕ⋅(m₀×h̃₁) + (cϕ-1)/ϕ⋅(uᵀm₀⋅h̃₁+uᵀh̃₁⋅m₀)
-            #     -((m̃₁-sϕ/ϕ⋅m₀)ᵀ(u×h̃₁) + 2(cϕ-1)/ϕ⋅uᵀh̃1⋅uᵀm₀)⋅u
+def _coefs_jvp(
+    T1: Optional[Tensor], T2: Optional[Tensor], γ: Tensor, dt: Tensor,
+    Ṫ1: Optional[Tensor], Ṫ2: Optional[Tensor], dγ: Optional[Tensor],
+    ddt: Optional[Tensor]
+):
+    r"""``γ2πdt``, relaxation coefficients, and their tangents
 
-            # (m̃₁-sϕ/ϕ⋅m₀)ᵀ(u×h̃₁)
-            torch.addcmul(m1, sϕ, m0, value=-1, out=m1)  # (m̃₁-sϕ/ϕ⋅m₀)
-            m1.mul_(uxh1)
-            torch.sum(m1, dim=-2, keepdim=True, out=sϕ)
+    Usage:
+        ``γ2πdt, dγ2πdt, E, e1_1, Ė = _coefs_jvp(T1, T2, γ, dt, Ṫ1, Ṫ2, dγ, \
+        ddt)``
+    """
+    γ2πdt = 2*π*γ*dt
+    dγ2πdt = None
+    if dγ is not None:
+        dγ2πdt = 2*π*dγ*dt
+    if ddt is not None:
+        dγ2πdt = 2*π*γ*ddt if dγ2πdt is None else dγ2πdt + 2*π*γ*ddt
 
-            # ((m̃₁-sϕ/ϕ⋅m₀)ᵀ(u×h̃₁) + 2(cϕ-1)/ϕ⋅uᵀh̃₁⋅uᵀm₀)
-            uth1.mul_(utm0)  # uᵀh̃1⋅uᵀm₀
-            torch.addcmul(sϕ, cϕ_1, uth1, value=2, out=cϕ_1)
+    E, e1_1, _ = _relax_fwd(T1, T2, dt)
+    Ė = None if E is None else _relax_jvp(E, T1, T2, dt, Ṫ1, Ṫ2, ddt)
+    return γ2πdt, dγ2πdt, E, e1_1, Ė
 
-            torch.addcmul(γbeff, cϕ_1, u, value=-1, out=γbeff)
 
-            m1, h1, h0 = m0, h0, h1
+def _tangent(x: Tensor) -> Tensor:
+    r"""Tangent of a forward-mode dual tensor, zeros if it has none
+    """
+    ẋ = fwAD.unpack_dual(x).tangent
+    return torch.zeros_like(x) if ẋ is None else ẋ
 
-        # %% Clean up
-        grad_Beff = γBeff
 
-        # undo the multiply by -γ2πdt on h1
-        grad_Mi = h1[..., 0].div_(-γ2πdt[0, ...]) if needs_grad[0] else None
-        # forward(ctx, Mi, Beff; T1, T2, γ, dt):
-        return grad_Mi, grad_Beff, grad_T1, grad_T2, grad_γ, grad_dt
+class BlochSimGrad(Function):
+    r"""Backward of :class:`BlochSim`, differentiable once more
+
+    Forward is the adjoint sweep, :func:`_adj_grads`, over the spin history
+    kept by :class:`BlochSim`, read only. Backward, w/ cotangents ``v`` of
+    the derivatives, e.g., for Hessian-vector products, is the forward-mode
+    derivative of the very same sweep along ``v``, w/ the tangent spins
+    swept forward over the kept history, :func:`_jvp_steps`. No autograd
+    graph of the time loop is built: besides the kept history, its memory is
+    a tangent history of the same size, ⊻ tangent checkpoints and a segment,
+    w/ ``ckpt`` ⊻ ``doReversible``.
+    """
+
+    @staticmethod
+    def forward(
+        ctx: CTX, grad_Mo: Tensor, Mi: Tensor, Beff: Tensor,
+        T1: Optional[Tensor], T2: Optional[Tensor], γ: Tensor, dt: Tensor,
+        Mhst: Tensor, k: Optional[int], needs_grad: Tuple[bool, ...]
+    ) -> Tuple[Optional[Tensor], ...]:
+        r"""Derivatives of Bloch simulation, by its adjoint sweep
+
+        Inputs:
+            - ``ctx``: `(1,)`, pytorch CTX cacheing object
+            - ``grad_Mo``: `(N, *Nd, xyz)`, derivative w.r.t. output Magetic \
+              spins.
+            - ``Mi``, ``Beff``, ``T1``, ``T2``, ``γ``, ``dt``: see \
+              :class:`BlochSim`.
+            - ``Mhst``: spin history kept by :class:`BlochSim`, full ⊻ \
+              checkpoints ⊻ anchors.
+            - ``k``: `None` ⊻ int, time steps between checkpoints ⊻ anchors.
+            - ``needs_grad``: `(6,)`, derivatives to return.
+        Outputs:
+            - ``grad_Mi``, ``grad_Beff``, ``grad_T1``, ``grad_T2``, \
+              ``grad_γ``, ``grad_dt``: see :func:`BlochSim.backward`.
+        """
+        ctx.set_materialize_grads(False)
+        ctx.save_for_backward(grad_Mo, Mi, Beff, T1, T2, γ, dt, Mhst)
+        ctx.k, ctx.needs_grad = k, needs_grad
+
+        segs = BlochSimGrad._segs(Mi[..., None], Beff, T1, T2, γ, dt, Mhst,
+                                  k, True)
+        return tuple(_adj_grads(grad_Mo[..., None], segs, Beff, T1, T2, γ,
+                                dt, needs_grad, lambda x: x))
+
+    @staticmethod
+    def _segs(Mi: Tensor, Beff: Tensor, T1: Optional[Tensor],
+              T2: Optional[Tensor], γ: Tensor, dt: Tensor, Mhst: Tensor,
+              k: Optional[int], isReversed: bool):
+        r"""``(t0, t1, mc, Ms)`` of :func:`_hist_segs`, for :func:`_adj_grads`
+        """
+        NNd, nT = Beff.shape[:-2], Beff.shape[-1]
+        Mseg = (None if k is None else
+                torch.empty(NNd+(3, k), dtype=Mi.dtype, device=Mi.device))
+        γ2πdt = 2*π*γ*dt
+        E, e1_1, _ = _relax_fwd(T1, T2, dt)
+
+        def fn_seg_(mc, Ms, t0, t1):
+            return _sweep_fwd_(Ms, mc, Beff[..., t0:t1], γ2πdt, E, e1_1)
+
+        for _, t0, t1, mc, Ms in _hist_segs(Mi, Mhst, Mseg, k, nT, fn_seg_,
+                                            isReversed):
+            yield t0, t1, mc, Ms
+
+    @staticmethod
+    @once_differentiable
+    def backward(
+        ctx: CTX, vMi: Optional[Tensor], vBeff: Optional[Tensor],
+        vT1: Optional[Tensor], vT2: Optional[Tensor], vγ: Optional[Tensor],
+        vdt: Optional[Tensor]
+    ) -> Tuple[Optional[Tensor], ...]:
+        r"""Second-order adjoint of Bloch simulation
+
+        Inputs:
+            - ``ctx``: `(1,)`, pytorch CTX cacheing object
+            - ``vMi``, ``vBeff``, ``vT1``, ``vT2``, ``vγ``, ``vdt``: \
+              derivatives w.r.t. the outputs of forward, ⊻ `None`.
+        Outputs:
+            - ``grad_grad_Mo``: `(N, *Nd, xyz)`, derivative w.r.t. \
+              ``grad_Mo``, the tangent of ``Mo`` along ``v``.
+            - ``grad_Mi``, ``grad_Beff``, ``grad_T1``, ``grad_T2``, \
+              ``grad_γ``, ``grad_dt``: derivatives w.r.t. ``Mi``, ``Beff``, \
+              ``T1``, ``T2``, ``γ``, ``dt``, ⊻ `None`.
+            - None*3, for the `Mhst`, `k`, `needs_grad`.
+        """
+        grad_Mo, Mi, Beff, T1, T2, γ, dt, Mhst = ctx.saved_tensors
+        k, needs_grad = ctx.k, ctx.needs_grad
+        NNd, nT = Beff.shape[:-2], Beff.shape[-1]
+        tkw = {'dtype': Mi.dtype, 'device': Mi.device}
+        Mi = Mi[..., None]
+
+        # S = ⟨v, Jᵀg⟩ = gᵀJv: ∂S/∂g = Jv, ∂S/∂x = ∂(Jᵀg)/∂x⋅v, as Jᵀg is
+        # the gradient of gᵀMo(x), whose Hessian is symmetric.
+        γ2πdt, dγ2πdt, E, e1_1, Ė = _coefs_jvp(T1, T2, γ, dt, vT1, vT2, vγ,
+                                               vdt)
+        ṁ0 = torch.zeros_like(Mi) if vMi is None else vMi[..., None]
+        Ṁseg = torch.empty(NNd+(3, nT if k is None else k), **tkw)
+        Ṁckpt = None if k is None else torch.empty(NNd+(3, -(-nT//k)), **tkw)
+
+        def fn_tan(mc, ṁc, Ms, t0, t1):
+            return _jvp_steps(mc, ṁc, Beff[..., t0:t1],
+                              None if vBeff is None else vBeff[..., t0:t1],
+                              γ2πdt, dγ2πdt, E, e1_1, Ė, Ms,
+                              Ṁseg.narrow(-1, 0, t1-t0))
+
+        # %% Tangents, forward: ṁ at segment starts, Jv
+        ṁ = ṁ0
+        for t0, t1, mc, Ms in BlochSimGrad._segs(Mi, Beff, T1, T2, γ, dt,
+                                                 Mhst, k, False):
+            if k is not None:
+                Ṁckpt[..., t0//k:t0//k+1].copy_(ṁ)
+            ṁ = fn_tan(mc, ṁ, Ms, t0, t1)
+        grad_grad_Mo = ṁ[..., 0] if ctx.needs_input_grad[0] else None
+
+        # %% Adjoints, backward, on dual tensors, (h, ∂h/∂x⋅v)
+        with fwAD.dual_level():
+            def fn_dual(x, ẋ):  # zero tangents, off pytorch's slow path
+                if x is None:
+                    return x
+                return fwAD.make_dual(x, torch.zeros_like(x) if ẋ is None
+                                      else ẋ)
+
+            def segs():
+                for t0, t1, mc, Ms in BlochSimGrad._segs(
+                        Mi, Beff, T1, T2, γ, dt, Mhst, k, True):
+                    ṁc = ṁ0 if k is None else Ṁckpt[..., t0//k:t0//k+1]
+                    if k is not None:  # recompute the segment's tangents
+                        fn_tan(mc, ṁc, Ms, t0, t1)
+                    yield (t0, t1, fwAD.make_dual(mc, ṁc),
+                           fwAD.make_dual(Ms, Ṁseg.narrow(-1, 0, t1-t0)))
+
+            h1 = fwAD.make_dual(grad_Mo[..., None],
+                                torch.zeros_like(grad_Mo[..., None]))
+            grads = _adj_grads(h1, segs(), *map(
+                fn_dual, (Beff, T1, T2, γ, dt), (vBeff, vT1, vT2, vγ, vdt)),
+                needs_grad, _tangent)
+
+        # forward(ctx, grad_Mo, Mi, Beff, T1, T2, γ, dt, Mhst, k, needs_grad)
+        return (grad_grad_Mo, *grads, None, None, None)
+
+
+def _shard(x: Optional[Tensor], d: int, sl: slice) -> Optional[Tensor]:
+    r"""Slice ``x`` along dim ``d``, unless it is `None` or broadcast there
+    """
+    if (x is None) or (x.ndim <= d) or (x.shape[d] == 1):
+        return x
+    return x[(slice(None),)*d + (sl,)]
+
+
+def _threads_map(fn, items: list, nThreads: int) -> list:
+    r"""Map ``fn`` over ``items`` on a thread pool, intra-op threads pinned
+
+    Each worker pins torch intra-op threads to 1, so shards do not compete
+    for cores; the caller's setting is restored on return.
+    """
+    nth = torch.get_num_threads()
+
+    def fn1(x):
+        torch.set_num_threads(1)
+        return fn(x)
+
+    try:
+        with ThreadPoolExecutor(max_workers=nThreads) as executor:
+            return list(executor.map(fn1, items))
+    finally:
+        torch.set_num_threads(nth)
+
+
+class BlochSimThreads(Function):
+    r"""BlochSim with spins sharded over a pool of threads
+
+    Spins are independent. Shards of spins each run the entire time loop of
+    :class:`~mrphy.sims.BlochSim`, forward and backward, on their own worker
+    thread, with torch intra-op threads pinned to 1. Torch ops release the
+    GIL, the per-step python overhead does not.
+
+    This operator is differentiable w.r.t. ``Mi``, ``Beff``, ``T1``, ``T2``,
+    ``γ`` and ``dt``. Derivatives of inputs broadcast over the shards are
+    summed over the shards.
+    """
+
+    @staticmethod
+    def forward(
+        ctx: CTX, Mi: Tensor, Beff: Tensor,
+        T1: Optional[Tensor], T2: Optional[Tensor], γ: Tensor, dt: Tensor,
+        engine: str = 'loop', doHist: bool = True, nThreads: int = 1,
+        workspace: Optional[utils.Workspace] = None,
+        ckpt: Union[None, int, str] = None, doReversible: bool = False,
+        cacheRot: Union[bool, int] = False
+    ) -> Tensor:
+        r"""Forward evolution of Bloch simulation, sharded over threads
+
+        Inputs:
+            - ``ctx``: `(1,)`, pytorch CTX cacheing object
+            - ``Mi``, ``Beff``, ``T1``, ``T2``, ``γ``, ``dt``, ``engine``, \
+              ``doHist``, ``ckpt``, ``doReversible``, ``cacheRot``: see \
+              :class:`~mrphy.sims.BlochSim`. A ``cacheRot`` budget is \
+              split evenly over the shards.
+            - ``nThreads``: int, number of shards and worker threads.
+            - ``workspace``: see :class:`~mrphy.sims.BlochSim`, shared by \
+              the shards.
+        Outputs:
+            - ``Mo``: `(N, *Nd, xyz)`, Magetic spins after simulation.
+        """
+        # shard `nM` of compact `(N, nM, xyz)`, or `N` when `Mi` is `(N, xyz)`
+        d = (1 if Mi.ndim > 2 else 0)
+        n = Mi.shape[d]
+        nThreads = max(1, min(nThreads, n))
+        sls = [slice(i*n//nThreads, (i+1)*n//nThreads)
+               for i in range(nThreads)]
+
+        needs_grad = ctx.needs_input_grad[0:6]
+        doHist = doHist and any(needs_grad)
+        cacheRot_ = (cacheRot if isinstance(cacheRot, bool) else
+                     cacheRot//nThreads)
+        xs = (Mi, Beff, T1, T2, γ, dt)
+        ctx.save_for_forward(*xs)  # for `jvp`
+        ctx.d, ctx.sls, ctx.nThreads = d, sls, nThreads
+
+        def fn_fwd(sl):
+            xs_ = tuple((None if x is None else
+                         _shard(x, d, sl).detach().requires_grad_(g))
+                        for x, g in zip(xs, needs_grad))
+            with torch.set_grad_enabled(doHist):  # grad mode is per thread
+                Mo_ = BlochSim.apply(*xs_, engine, doHist, workspace, ckpt,
+                                     doReversible, cacheRot_)
+            return xs_, Mo_
+
+        shards = _threads_map(fn_fwd, sls, nThreads)
+
+        if doHist:  # per shard autograd graphs, walked by backward
+            ctx.save_for_backward(*xs)
+            ctx.shards = shards
+            ctx.isShard = tuple((x is not None) and (_shard(x, d, sls[0])
+                                                     is not x)
+                                for x in xs)
+
+        return torch.cat([Mo_.detach() for _, Mo_ in shards], dim=d)
+
+    @staticmethod
+    def backward(
+        ctx: CTX, grad_Mo: Tensor
+    ) -> Tuple[Tensor, Tensor, Tensor, Tensor, Tensor, Tensor, None, None,
+               None, None, None, None, None]:
+        r"""Backward evolution of Bloch simulation Jacobians, sharded
+
+        Inputs:
+            - ``ctx``: `(1,)`, pytorch CTX cacheing object
+            - ``grad_Mo``: `(N, *Nd, xyz)`, derivative w.r.t. output Magetic \
+              spins.
+        Outputs:
+            - ``grad_Mi``: `(N, *Nd, xyz)`, derivative w.r.t. input Magetic \
+              spins.
+            - ``grad_Beff``: `(N, *Nd, xyz, nT)`, derivative w.r.t. \
+              B-effective.
+            - ``grad_T1``, ``grad_T2``, ``grad_γ``, ``grad_dt``: derivatives \
+              w.r.t. ``T1``, ``T2``, ``γ``, ``dt``, of their shapes.
+            - None*7, for the non-tensor `engine`, `doHist`, `nThreads`, \
+              `workspace`, `ckpt`, `doReversible`, `cacheRot`.
+        """
+        needs_grad = ctx.needs_input_grad[0:6]
+        d, sls, shards = ctx.d, ctx.sls, ctx.shards
+
+        doDiff = torch.is_grad_enabled()  # `create_graph`
+        # ctx.save_for_backward(Mi, Beff, T1, T2, γ, dt)
+        xs = ctx.saved_tensors if doDiff else None
+
+        def fn_bwd(i):
+            xs_, Mo_ = shards[i]
+            grad_Mo_ = _shard(grad_Mo, d, sls[i])
+            if doDiff:  # shards are detached, graph onto shards of `xs`
+                return BlochSim._backward_diff(
+                    Mo_.grad_fn, grad_Mo_,
+                    tuple(_shard(x, d, sls[i]) for x in xs))[0:6]
+            xs_ = [x for x, g in zip(xs_, needs_grad) if g]
+            grads = iter(torch.autograd.grad(Mo_, xs_, grad_Mo_))
+            return [next(grads) if g else None for g in needs_grad]
+
+        grads = _threads_map(fn_bwd, range(len(shards)), ctx.nThreads)
+        if not doDiff:
+            ctx.shards = None  # inner graphs are freed by now
+
+        # sharded inputs are concatenated, broadcast ones summed
+        grads = [(None if not g else torch.cat(x, dim=d) if isShard else
+                  sum(x[1:], x[0]))
+                 for x, g, isShard in zip(zip(*grads), needs_grad,
+                                          ctx.isShard)]
+
+        # forward(ctx, Mi, Beff; T1, T2, γ, dt, engine, doHist, nThreads,
+        #         workspace, ckpt, doReversible, cacheRot):
+        return (*grads, None, None, None, None, None, None, None)
+
+    @staticmethod
+    def jvp(
+        ctx: CTX, Ṁi: Optional[Tensor], Ḃeff: Optional[Tensor],
+        Ṫ1: Optional[Tensor], Ṫ2: Optional[Tensor], dγ: Optional[Tensor],
+        ddt: Optional[Tensor], *args
+    ) -> Tensor:
+        r"""Forward-mode derivative of Bloch simulation, sharded
+
+        See :func:`BlochSim.jvp`, shards are swept on their own threads.
+        """
+        d, sls = ctx.d, ctx.sls
+        xs = ctx.saved_tensors + (Ṁi, Ḃeff, Ṫ1, Ṫ2, dγ, ddt)
+
+        def fn_jvp(sl):
+            return _blochsim_jvp(*(_shard(x, d, sl) for x in xs))
+
+        return torch.cat(_threads_map(fn_jvp, sls, ctx.nThreads), dim=d)
 
 
 def blochsim(
     Mi: Tensor, Beff: Tensor, *,
     T1: Optional[Tensor] = None, T2: Optional[Tensor] = None,
-    γ: Tensor = γH, dt: Tensor = dt0
+    γ: Tensor = γH, dt: Tensor = dt0, engine: str = 'loop',
+    doFastRFoff: bool = False, rfoff: Optional[Tensor] = None,
+    nThreads: Optional[int] = None,
+    workspace: Optional[utils.Workspace] = None,
+    ckpt: Union[None, int, str] = None, doReversible: bool = False,
+    cacheRot: Union[bool, int] = False,
+    tWindow: Optional[Tuple[int, int]] = None
 ) -> Tensor:
     r"""Bloch simulator with explicit Jacobian operation.
 
-    This function is only differentiable w.r.t. ``Mi`` and ``Beff``.
+    This function is differentiable w.r.t. ``Mi``, ``Beff``, ``T1``, ``T2``,
+    ``γ`` and ``dt``, in reverse and forward modes, see
+    :func:`BlochSim.jvp` for the latter, and twice in reverse mode, see the
+    note below.
 
     Setting `T1=T2=None` to opt for simulation ignoring relaxation.
 
     Usage:
-        ``Mo = blochsim(Mi, Beff, *, T1, T2, γ, dt)``
-        ``Mo = blochsim(Mi, Beff, *, T1=None, T2=None, γ, dt)``
+        ``Mo = blochsim(Mi, Beff, *, T1, T2, γ, dt, engine, doFastRFoff,``\
+        `` rfoff, nThreads, workspace, ckpt, doReversible, cacheRot,``\
+        `` tWindow)``
+        ``Mo = blochsim(Mi, Beff, *, T1=None, T2=None, γ, dt, engine)``
     Inputs:
         - ``Mi``: `(N, *Nd, xyz)`, Magnetic spins, assumed equilibrium \
           [[[0 0 1]]].
@@ -282,13 +1602,99 @@ def blochsim(
         - ``T2``: `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Sec", T2 relaxation.
         - ``γ``:  `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Hz/Gauss", gyro ratio.
         - ``dt``: `()` ⊻ `(N ⊻ 1,)`, "Sec", dwell time.
+        - ``engine``: [`'loop'`, `'jit'`], time loops of forward and backward \
+          in python (default), or compiled as whole sweeps via TorchScript. \
+          `'jit'` removes the per-step python and op-dispatch overhead, which \
+          dominates on CPU when ``nM`` is small and ``nT`` is long; the first \
+          call pays for the compilation.
+        - ``doFastRFoff``: [t/F], apply RF-off windows, i.e., time points \
+          where ``Beff[..., 0:2, t] == 0`` for all spins, in closed form. \
+          See the note below.
+        - ``rfoff``: `(nT,)`, bool, RF-off time points, where \
+          ``Beff[..., 0:2, :]`` is zero and constant, e.g., where \
+          ``pulse.rf`` is zero and does not require grad. If omitted, \
+          detected from ``Beff``. Only used when ``doFastRFoff``.
+        - ``nThreads``: int, shard spins over ``nThreads`` worker threads, \
+          each running the time loops of its shard, forward and backward, \
+          with torch intra-op threads pinned to 1. See \
+          :class:`~mrphy.sims.BlochSimThreads`.
+        - ``workspace``: mrphy.utils.Workspace, borrow the temporary buffers \
+          of forward and backward, e.g., `m` and `γBeff` per step, and spin \
+          history, from it, rather than allocating them per call. Useful \
+          when called repeatedly with identical shapes, e.g., pulse design.
+        - ``ckpt``: `None` ⊻ int ⊻ `'sqrt'`, checkpoint the spin history for \
+          backward every ``ckpt`` steps, or every ``ceil(sqrt(nT))`` steps, \
+          rather than keeping all of it (`None`, default). See the note below.
+        - ``doReversible``: [t/F], keep no spin history, backward recomputes \
+          it by inverting the steps, one at a time. ``ckpt`` then sets the \
+          interval of float64 anchors, default to 256. Only for ``'loop'``. \
+          See the note below.
+        - ``cacheRot``: [t/F] ⊻ int, keep each step's rotation axis `U`, \
+          angle `Φ`, `cos(Φ)-1` and `sin(Φ)`, `(nT, N, *Nd, 6)`, i.e., twice \
+          the spin history, for backward, rather than recomputing them there. \
+          If an int, "Byte", a memory budget: they are kept only if they fit \
+          within it. Only with the full spin history of ``'loop'``, i.e., \
+          ignored with ``ckpt``, ``doReversible`` or ``'jit'``.
+        - ``tWindow``: ``(t0, t1)``, only ``Beff[..., t0:t1]`` is trainable, \
+          see the note below. Not combined with ``doFastRFoff``.
     Outputs:
         - ``Mo``: `(N, *Nd, xyz)`, Magetic spins after simulation.
 
-    .. tip::
-        For alternative implementation:
-        Storing history for `U`, `Φ` and `UtM0` etc., which are also used in
-        `backward`, may avoid redundant computation, but comsumes more RAM.
+    .. note::
+        Spin history, `(N, *Nd, xyz, nT)`, is only kept for backward, i.e.,
+        when grad mode is enabled and any of ``Mi``, ``Beff``, ``T1``,
+        ``T2``, ``γ``, ``dt`` requires grad.
+        Otherwise, e.g., under ``torch.no_grad()``, memory is independent of
+        ``nT``, aside from ``Beff`` itself.
+
+    .. note::
+        With ``ckpt=k``, only the spins before every ``k``-th step are kept,
+        and backward recomputes the history of one `k`-step segment at a
+        time, from its checkpoint. History memory drops from ``nT`` to
+        ``ceil(nT/k)+k`` columns, at the cost of one more forward sweep in
+        backward. ``'sqrt'`` minimizes the memory. The `(N, *Nd, xyz, nT)`
+        ``γ⋅Beff`` is still kept, see :func:`blochsim_rfgr` to avoid it.
+
+    .. note::
+        Each step, a rotation then a relaxation w/ ``E1, E2 > 0``, is
+        invertible. With ``doReversible``, backward walks the spins back
+        from ``Mo``, in float64, and resets them to the exact spins at the
+        anchors, saved every ``ckpt`` steps, so the round-off amplified by
+        the inverse relaxation, ``exp(dt/T2)`` per step, stays bounded. The
+        kept spins are `(N, *Nd, xyz, ceil(nT/ckpt)+1)` float64 anchors
+        only, at the cost of one inverse step per step in backward.
+
+    .. note::
+        Backward w/ ``create_graph=True``, e.g., for Hessian-vector products
+        of second-order pulse design, runs the adjoint sweep over the spin
+        history kept by forward, intact, and its backward is a second-order
+        adjoint over the same history, :class:`BlochSimGrad`. No autograd
+        graph of the time loop is built; on top of the history, it keeps a
+        tangent history of the same size, ⊻ of a segment and checkpoints w/
+        ``ckpt`` ⊻ ``doReversible``.
+
+    .. note::
+        With ``tWindow=(t0, t1)``, ``Beff`` outside the window is treated
+        as constant, i.e., gets zero derivatives. Steps before `t0` are
+        simulated w/o history, and backward stops at `t0`, unless ``Mi``,
+        ``T1``, ``T2``, ``γ`` ⊻ ``dt`` require grad. Steps after `t1` are
+        simulated w/o history too, unless ``T1``, ``T2``, ``γ`` ⊻ ``dt``
+        require grad: their derivative w.r.t. the spins at `t1` is the
+        linear part of the affine steps, `(N, *Nd, xyz, xyz)`, swept as
+        tangents, :func:`_affine_steps`. The kept history then scales with
+        ``t1-t0``, the window length.
+
+    .. note::
+        During an RF-off window, every step rotates about `z`, and these
+        rotations commute, also with relaxation. So a window of `n` steps is
+        one `z`-rotation by the accumulated phase, ``-γ2πdt⋅∑Bz``, and one
+        relaxation of ``exp(-n⋅dt/T)``. Windows are differentiable w.r.t.
+        ``Mi`` and ``Beff[..., 2, :]`` via autograd, but not w.r.t.
+        ``Beff[..., 0:2, :]``, which is why windows detected from ``Beff``
+        are stepped as usual when ``Beff`` requires grad. Passing ``rfoff``
+        states ``Beff[..., 0:2, :]`` is constant there, e.g., w/ only the
+        gradients being designed.
+
     """
 
     # %% Defaults and move to the same device
@@ -302,13 +1708,557 @@ def blochsim(
     if T1 is not None:
         T1, T2 = (x.reshape(x.shape+(ndim-x.ndim)*(1,)) for x in (T1, T2))
 
-    return BlochSim.apply(Mi, Beff, T1, T2, γ, dt)
+    # spin history is only kept when autograd may need it
+    doHist = torch.is_grad_enabled()
+
+    def fn_bsim(M, B):
+        if (nThreads is None) or (nThreads <= 1):
+            return BlochSim.apply(M, B, T1, T2, γ, dt, engine, doHist,
+                                  workspace, ckpt, doReversible, cacheRot)
+        return BlochSimThreads.apply(M, B, T1, T2, γ, dt, engine, doHist,
+                                     nThreads, workspace, ckpt, doReversible,
+                                     cacheRot)
+
+    if tWindow is not None:  # only `Beff[..., t0:t1]` is trained
+        assert(not doFastRFoff)
+        (t0, t1), nT = tWindow, Beff.shape[-1]
+        assert(0 <= t0 < t1 <= nT)
+        Beff_, doGrad = Beff.detach(), torch.is_grad_enabled()
+        doPar = doGrad and any((x is not None) and x.requires_grad
+                               for x in (T1, T2, γ, dt))
+        # history before the window only for derivatives of the others
+        with torch.set_grad_enabled(doPar or (doGrad and Mi.requires_grad)):
+            M = fn_bsim(Mi, Beff_[..., :t0]) if t0 > 0 else Mi
+        M = fn_bsim(M, Beff[..., t0:t1])
+        if t1 == nT:
+            return M
+        if doPar or not (doGrad and M.requires_grad):
+            return fn_bsim(M, Beff_[..., t1:])
+        return _affine_steps(M, Beff_[..., t1:], T1, T2, γ, dt, fn_bsim)
+
+    if not doFastRFoff:
+        return fn_bsim(Mi, Beff)
+
+    nT = Beff.shape[-1]
+    if rfoff is None:
+        # RF within windows may be trained, its derivatives need the steps
+        if torch.is_grad_enabled() and Beff.requires_grad:
+            return fn_bsim(Mi, Beff)
+        rfoff = torch.all((Beff[..., 0:2, :] == 0).reshape(-1, nT), dim=0)
+    rfoff = rfoff.to(device=Beff.device)
+
+    runs = utils.runlength(rfoff)
+    ends = torch.cumsum(runs, dim=0).tolist()
+    isoff = rfoff[torch.cumsum(runs, dim=0) - runs].tolist()
+
+    M, t0 = Mi, 0
+    for t1, off in zip(ends, isoff):
+        if off and t1-t0 > 1:  # a single step is not worth a closed form
+            M = _rfoff_prec(M, Beff[..., 2, t0:t1], T1, T2, γ, dt)
+        else:
+            M = fn_bsim(M, Beff[..., t0:t1])
+        t0 = t1
+
+    return M
+
+
+def _affine_steps(
+    M: Tensor, Beff: Tensor,
+    T1: Optional[Tensor], T2: Optional[Tensor], γ: Tensor, dt: Tensor, fn_bsim
+) -> Tensor:
+    r"""Bloch simulation w/o history, differentiable w.r.t. ``M`` only
+
+    W/ all else constant, the steps are an affine map of the spins,
+    ``Mo = A⋅M + b``. Its linear part ``A`` is swept as the tangents of the
+    basis, :func:`_jvp_steps`, so that autograd keeps ``A`` rather than the
+    history of the steps.
+
+    Inputs:
+        - ``M``: `(N, *Nd, xyz)`, Magnetic spins.
+        - ``Beff``, ``T1``, ``T2``, ``γ``, ``dt``: as in \
+          :class:`~mrphy.sims.BlochSim`, constants.
+        - ``fn_bsim``: callable, ``Mo = fn_bsim(M, Beff)``.
+    Outputs:
+        - ``Mo``: `(N, *Nd, xyz)`, Magnetic spins after the steps.
+    """
+    with torch.no_grad():
+        Mo = fn_bsim(M, Beff)
+        γ2πdt, _, E, e1_1, _ = _coefs_jvp(T1, T2, γ, dt, None, None, None,
+                                          None)
+        eye = torch.eye(3, dtype=M.dtype, device=M.device)
+        A = _jvp_steps(M[..., None], eye.expand(M.shape+(3,)), Beff, None,
+                       γ2πdt, None, E, e1_1, None)
+    dM = M - M.detach()  # zeros, in the graph of `M`
+    return Mo + (A @ dM[..., None])[..., 0]
+
+
+def _rfoff_prec(
+    M: Tensor, Bz: Tensor,
+    T1: Optional[Tensor], T2: Optional[Tensor], γ: Tensor, dt: Tensor
+) -> Tensor:
+    r"""Closed form Bloch simulation of an RF-off window, via autograd
+
+    Inputs:
+        - ``M``: `(N, *Nd, xyz)`, Magnetic spins.
+        - ``Bz``: `(N, *Nd, nT)`, "Gauss", `z` component of B-effective.
+        - ``T1``, ``T2``, ``γ``, ``dt``: as in :class:`~mrphy.sims.BlochSim`.
+    Outputs:
+        - ``M``: `(N, *Nd, xyz)`, Magnetic spins after the window.
+    """
+    nT = Bz.shape[-1]
+    Mx, My, Mz = M.split(1, dim=-1)  # (N, *Nd, 1)
+
+    ϕ = -(2*π*γ*dt)[..., 0]*torch.sum(Bz, dim=-1, keepdim=True)
+    cϕ, sϕ = torch.cos(ϕ), torch.sin(ϕ)
+    Mx, My = cϕ*Mx-sϕ*My, sϕ*Mx+cϕ*My
+
+    if T1 is not None:
+        E1, E2 = torch.exp(-nT*dt/T1)[..., 0], torch.exp(-nT*dt/T2)[..., 0]
+        Mx, My, Mz = E2*Mx, E2*My, E1*Mz+1-E1
+
+    return torch.cat((Mx, My, Mz), dim=-1)
+
+
+def blochsim_scan(
+    Mi: Tensor, Beff: Tensor, *,
+    T1: Optional[Tensor] = None, T2: Optional[Tensor] = None,
+    γ: Tensor = γH, dt: Tensor = dt0
+) -> Tensor:
+    r"""Bloch simulator composing all time steps in parallel
+
+    Every step is an affine map, 𝑀 → 𝐴𝑀 + 𝐵. They are computed at once by
+    :func:`~mrphy.beffective.beff2ab_steps`, then composed pairwise in a tree
+    of depth ``ceil(log2(nT))``, instead of being applied one after another.
+    This exposes parallelism along time, which helps when ``nM`` is too small
+    to keep all cores busy, at the cost of `(N, *Nd, nT, xyz, 3+1)` memory.
+
+    This function is differentiable via autograd (implicit Jacobian).
+
+    Usage:
+        ``Mo = blochsim_scan(Mi, Beff, *, T1, T2, γ, dt)``
+        ``Mo = blochsim_scan(Mi, Beff, *, T1=None, T2=None, γ, dt)``
+    Inputs:
+        - ``Mi``: `(N, *Nd, xyz)`, Magnetic spins, assumed equilibrium \
+          [[[0 0 1]]].
+        - ``Beff``: `(N, *Nd, xyz, nT)`, "Gauss", B-effective, magnetic field.
+    Optionals:
+        - ``T1``: `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Sec", T1 relaxation.
+        - ``T2``: `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Sec", T2 relaxation.
+        - ``γ``:  `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Hz/Gauss", gyro ratio.
+        - ``dt``: `()` ⊻ `(N ⊻ 1,)`, "Sec", dwell time.
+    Outputs:
+        - ``Mo``: `(N, *Nd, xyz)`, Magetic spins after simulation.
+    """
+    assert(Mi.shape[:-1] == Beff.shape[:-2])
+    Beff = Beff.to(Mi.device)
+
+    AB = beffective.beff2ab_steps(Beff, T1=T1, T2=T2, γ=γ, dt=dt)
+    AB = beffective.ab_reduce(AB)  # -> (N, *Nd, xyz, 3+1)
+
+    Mo = (AB[..., 0:3] @ Mi[..., None]).squeeze(dim=-1) + AB[..., 3]
+    return Mo
+
+
+def blochsim_rle(
+    Mi: Tensor, Beff: Tensor, *,
+    T1: Optional[Tensor] = None, T2: Optional[Tensor] = None,
+    γ: Tensor = γH, dt: Tensor = dt0,
+    runs: Optional[Tensor] = None, doReport: bool = False
+) -> Union[Tensor, Tuple[Tensor, dict]]:
+    r"""Bloch simulator collapsing runs of constant B-effective
+
+    Pulses often hold RF and gradients constant over many dwell times, e.g.,
+    hard pulse plateaus, gradient flat tops. Each run of ``n`` identical
+    B-effective columns is applied as the ``n``-th power of its one step
+    affine map, 𝑀 → 𝐴𝑀 + 𝐵, computed by repeated squaring. Runs are then
+    composed as in :func:`~mrphy.sims.blochsim_scan`.
+
+    Relaxation does not commute with rotation, a run is therefore not simply
+    a rotation by ``n⋅ϕ`` followed by ``exp(-n⋅dt/T)``; the matrix power keeps
+    the result identical to the per step simulation.
+
+    This function is differentiable via autograd (implicit Jacobian). Each
+    column of a run has its own derivative, when ``Beff`` requires grad, runs
+    are therefore not collapsed, the steps are composed as in
+    :func:`~mrphy.sims.blochsim_scan` instead, and ``runs`` is ignored.
+
+    Usage:
+        ``Mo = blochsim_rle(Mi, Beff, *, T1, T2, γ, dt, runs)``
+        ``Mo, report = blochsim_rle(Mi, Beff, *, T1, T2, γ, dt, runs,``\
+        `` doReport=True)``
+    Inputs:
+        - ``Mi``: `(N, *Nd, xyz)`, Magnetic spins, assumed equilibrium \
+          [[[0 0 1]]].
+        - ``Beff``: `(N, *Nd, xyz, nT)`, "Gauss", B-effective, magnetic field.
+    Optionals:
+        - ``T1``: `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Sec", T1 relaxation.
+        - ``T2``: `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Sec", T2 relaxation.
+        - ``γ``:  `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Hz/Gauss", gyro ratio.
+        - ``dt``: `()` ⊻ `(N ⊻ 1,)`, "Sec", dwell time.
+        - ``runs``: `(nRuns,)`, int, lengths of runs of constant ``Beff``, \
+          e.g., from :func:`~mrphy.mobjs.Pulse.runlength`. If omitted, \
+          computed from ``Beff`` by :func:`~mrphy.utils.runlength`.
+        - ``doReport``: [t/F], also return a report of the compression.
+    Outputs:
+        - ``Mo``: `(N, *Nd, xyz)`, Magetic spins after simulation.
+        - ``report``: dict, ``{'nT': nT, 'nRuns': nRuns, 'nCollapsed': \
+          nT-nRuns}``, only if ``doReport``.
+    """
+    assert(Mi.shape[:-1] == Beff.shape[:-2])
+    Beff, nT = Beff.to(Mi.device), Beff.shape[-1]
+
+    if Beff.requires_grad and torch.is_grad_enabled():
+        runs = None  # per step ∂L/∂Beff, no collapsing
+        AB = beffective.beff2ab_steps(Beff, T1=T1, T2=T2, γ=γ, dt=dt)
+    else:
+        runs = (utils.runlength(Beff, dim=-1) if runs is None else
+                runs.to(device=Beff.device))
+        assert(runs.sum().item() == nT)
+
+        starts = torch.cumsum(runs, dim=0) - runs
+        AB = beffective.beff2ab_steps(Beff[..., starts], T1=T1, T2=T2, γ=γ,
+                                      dt=dt)
+
+        islong = runs > 1  # only runs longer than 1 need to be raised
+        AB[..., islong, :, :] = beffective.ab_power(AB[..., islong, :, :],
+                                                    runs[islong])
+    AB = beffective.ab_reduce(AB)  # -> (N, *Nd, xyz, 3+1)
+
+    Mo = (AB[..., 0:3] @ Mi[..., None]).squeeze(dim=-1) + AB[..., 3]
+    if not doReport:
+        return Mo
+
+    nRuns = nT if runs is None else runs.numel()
+    report = {'nT': nT, 'nRuns': nRuns, 'nCollapsed': nT-nRuns}
+    return Mo, report
+
+
+def blochsim_rfgr(
+    Mi: Tensor, rf: Tensor, gr: Tensor, loc: Tensor, *,
+    Δf: Optional[Tensor] = None, b1Map: Optional[Tensor] = None,
+    T1: Optional[Tensor] = None, T2: Optional[Tensor] = None,
+    γ: Tensor = γH, dt: Tensor = dt0, ckpt: Union[None, int, str] = None,
+    doReversible: bool = False
+) -> Tensor:
+    r"""Bloch simulator computing B-effectives inside the time loop
+
+    Fuses :func:`~mrphy.beffective.rfgr2beff` into :func:`blochsim`: each
+    step's `(N, *Nd, xyz)` B-effective is computed from ``rf[..., t, :]``,
+    ``gr[..., t]``, ``loc``, ``Δf`` and ``b1Map`` right before the step uses
+    it, so the `(N, *Nd, xyz, nT)` ``Beff`` is never formed.
+
+    Usage:
+        ``Mo = blochsim_rfgr(Mi, rf, gr, loc, *, Δf, b1Map, T1, T2, γ, dt,``\
+        `` ckpt, doReversible)``
+    Inputs:
+        - ``Mi``: `(N, *Nd, xyz)`, Magnetic spins, assumed equilibrium \
+          [[[0 0 1]]].
+        - ``rf``: `(N,xy,nT,(nCoils))`, "Gauss", `xy` for separating real and \
+          imag part.
+        - ``gr``: `(N,xyz,nT)`, "Gauss/cm".
+        - ``loc``: `(N,*Nd,xyz)`, "cm", locations.
+    Optionals:
+        - ``Δf``: `(N,*Nd,)`, "Hz", off-resonance.
+        - ``b1Map``: `(N, *Nd, xy (, nCoils)`, a.u., transmit sensitivity.
+        - ``T1``: `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Sec", T1 relaxation.
+        - ``T2``: `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Sec", T2 relaxation.
+        - ``γ``:  `()` ⊻ `(N ⊻ 1, *Nd ⊻ 1,)`, "Hz/Gauss", gyro ratio.
+        - ``dt``: `()` ⊻ `(N ⊻ 1,)`, "Sec", dwell time.
+        - ``ckpt``: `None` ⊻ int ⊻ `'sqrt'`, checkpointing of spin history, \
+          see :func:`blochsim`.
+        - ``doReversible``: [t/F], reversible adjoint, see :func:`blochsim`. \
+          Together, memory is independent of ``nT``, aside from the pulse, \
+          its gradient, and the `(N, *Nd, xyz)` float64 anchors every \
+          ``ckpt`` steps.
+    Outputs:
+        - ``Mo``: `(N, *Nd, xyz)`, Magetic spins after simulation.
+
+    .. note::
+        W/o grad, memory is `(N, *Nd)` bound, independent of ``nT``. With
+        grad, only the `(N, *Nd, xyz, nT)` spin history is kept, or with
+        ``ckpt='sqrt'``, its `(N, *Nd, xyz, 2⋅sqrt(nT))` checkpoints, and
+        derivatives w.r.t. ``Mi``, ``rf`` and ``gr`` are computed directly,
+        see :class:`~mrphy.sims.BlochSim_rfgr`. Should autograd need
+        derivatives w.r.t. other inputs, this falls back to
+        :func:`~mrphy.beffective.rfgr2beff` then :func:`blochsim`.
+    """
+    assert(Mi.shape[:-1] == loc.shape[:-1])
+    assert((T1 is None) == (T2 is None))  # both or neither
+    doHist = torch.is_grad_enabled()
+    xs = (loc, Δf, b1Map, T1, T2, γ, dt)
+    if doHist and any(x.requires_grad for x in xs if x is not None):
+        beff = beffective.rfgr2beff(rf, gr, loc, Δf=Δf, b1Map=b1Map, γ=γ)
+        return blochsim(Mi, beff, T1=T1, T2=T2, γ=γ, dt=dt, ckpt=ckpt,
+                        doReversible=doReversible)
+
+    return BlochSim_rfgr.apply(Mi, rf, gr, loc, Δf, b1Map, T1, T2, γ, dt,
+                               doHist, ckpt, doReversible)
+
+
+def _rfgr_setup(
+    Mi: Tensor, rf: Tensor, gr: Tensor, loc: Tensor,
+    Δf: Optional[Tensor], b1Map: Optional[Tensor],
+    T1: Optional[Tensor], T2: Optional[Tensor], γ: Tensor, dt: Tensor
+) -> tuple:
+    r"""Common preprocessing of forward and backward of :class:`BlochSim_rfgr`
+
+    Usage:
+        ``prep, γ2πdt, E, e1_1, fn_relax_ = _rfgr_setup(Mi, rf, gr, loc, Δf,``\
+        `` b1Map, T1, T2, γ, dt)``
+    Outputs:
+        - ``prep``: tuple, see :func:`~mrphy.beffective._rfgr2beff_prep`.
+        - ``γ2πdt``: `(N ⊻ 1, *Nd ⊻ 1, 1, 1)`, "rad/Gauss".
+        - ``E``, ``e1_1``, ``fn_relax_``: see :func:`_relax_fwd`.
+    """
+    rf, gr, loc = (x.to(device=Mi.device) for x in (rf, gr, loc))
+    prep = beffective._rfgr2beff_prep(rf, gr, loc, Δf=Δf, b1Map=b1Map, γ=γ)
+
+    # Make {γ, dt, T1, T2} compatible with (N, *Nd, :, :)
+    ndim = Mi.ndim+1
+    γ, dt = (x.reshape(x.shape+(ndim-x.ndim)*(1,)) for x in (γ, dt))
+    if T1 is not None:
+        T1, T2 = (x.reshape(x.shape+(ndim-x.ndim)*(1,)) for x in (T1, T2))
+
+    γ2πdt = 2*π*γ*dt
+    E, e1_1, fn_relax_ = _relax_fwd(T1, T2, dt)
+    return prep, γ2πdt, E, e1_1, fn_relax_
+
+
+def _rfgr_fwd(
+    Mi: Tensor, rf: Tensor, gr: Tensor, loc: Tensor,
+    Δf: Optional[Tensor], b1Map: Optional[Tensor],
+    T1: Optional[Tensor], T2: Optional[Tensor], γ: Tensor, dt: Tensor,
+    Mhst: Optional[Tensor] = None, k: Optional[int] = None,
+    doReversible: bool = False
+) -> Tensor:
+    r"""Forward of :func:`blochsim_rfgr`, history is kept if ``Mhst`` given
+
+    Inputs:
+        - ``Mi``, ``rf``, ``gr``, ``loc``, ``Δf``, ``b1Map``, ``T1``, \
+          ``T2``, ``γ``, ``dt``: see :func:`blochsim_rfgr`.
+        - ``Mhst``: `(N, *Nd, xyz, nT)`, in-place holder of spin history; \
+          or `(N, *Nd, xyz, ceil(nT/k))` of checkpoints, if ``k`` is given.
+        - ``k``: int, time steps per checkpointed segment, see \
+          :func:`_ckpt_fwd_`.
+        - ``doReversible``: bool, ``Mhst`` holds float64 anchors every ``k`` \
+          steps, see :func:`_rev_m1s`.
+    Outputs:
+        - ``Mo``: `(N, *Nd, xyz)`, Magetic spins after simulation.
+    """
+    NNd, nT = Mi.shape[:-1], gr.shape[-1]
+    tkw = {'memory_format': _contiguous_format,
+           'dtype': Mi.dtype, 'device': Mi.device}
+
+    prep, γ2πdt, _, _, fn_relax_ = _rfgr_setup(Mi, rf, gr, loc, Δf, b1Map,
+                                               T1, T2, γ, dt)
+
+    u, γbeff = (torch.empty(NNd+(3, 1), **tkw) for _ in range(2))
+    ϕ, cϕ_1, sϕ = (torch.empty(NNd+(1, 1), **tkw) for _ in range(3))
+
+    m0 = Mi.clone(memory_format=_contiguous_format)[..., None]
+    if (k is not None) and not doReversible:
+        Mseg = torch.empty(NNd+(3, k), **tkw)
+        fn_seg_ = _rfgr_fn_seg(prep, γ2πdt, fn_relax_, γbeff, u, ϕ, cϕ_1, sϕ)
+        return _ckpt_fwd_(m0, Mhst, Mseg, k, nT, fn_seg_)[..., 0].clone()
+
+    γbeffs = (beff.mul_(γ2πdt)
+              for beff in beffective._rfgr2beff_steps(*prep, out=γbeff))
+    if Mhst is None:  # ping-pong `m` buffers
+        Mbuf = torch.empty(NNd+(3, 2), **tkw)
+        m1s = (Mbuf.narrow(-1, t % 2, 1) for t in range(nT))
+    elif doReversible:  # ping-pong `m` buffers, anchors in `Mhst`
+        Mbuf = torch.empty(NNd+(3, 2), **tkw)
+        m1s = _rev_m1s(m0, Mhst, Mbuf, k, nT)
+    else:
+        m1s = Mhst.split(1, dim=-1)
+
+    m0 = _fwd_steps_(m0, m1s, γbeffs, fn_relax_, u, ϕ, cϕ_1, sϕ)
+    if doReversible:
+        Mhst[..., -1:].copy_(m0)
+    return m0[..., 0].clone()
+
+
+def _rfgr_fn_seg(prep: tuple, γ2πdt: Tensor, fn_relax_, γbeff: Tensor,
+                 u: Tensor, ϕ: Tensor, cϕ_1: Tensor, sϕ: Tensor):
+    r"""``fn_seg_(mc, Ms, t0, t1)`` of :func:`_ckpt_fwd_`, B-effective fused
+    """
+    def fn_seg_(mc, Ms, t0, t1):
+        γbeffs = (beff.mul_(γ2πdt)
+                  for beff in beffective._rfgr2beff_steps(
+                      *prep, out=γbeff, ts=range(t0, t1)))
+        return _fwd_steps_(mc, Ms.split(1, dim=-1), γbeffs, fn_relax_,
+                           u, ϕ, cϕ_1, sϕ)
+    return fn_seg_
+
+
+class BlochSim_rfgr(Function):
+    r"""BlochSim of rf and gr with explict Jacobian operation (backward)
+
+    B-effective is computed per time step inside both forward and backward
+    loops, see :func:`~mrphy.sims.blochsim_rfgr`. Backward contracts each
+    step's `(N, *Nd, xyz)` ``∂L/∂beff`` right away, into ``∂L/∂rf`` via
+    ``b1Map``, and into ``∂L/∂gr`` via ``loc``, so neither the
+    `(N, *Nd, xyz, nT)` ``Beff``, nor its gradient, is ever formed.
+
+    This operator is only differentiable w.r.t. ``Mi``, ``rf`` and ``gr``.
+    """
+
+    @staticmethod
+    def forward(
+        ctx: CTX, Mi: Tensor, rf: Tensor, gr: Tensor, loc: Tensor,
+        Δf: Optional[Tensor], b1Map: Optional[Tensor],
+        T1: Optional[Tensor], T2: Optional[Tensor], γ: Tensor, dt: Tensor,
+        doHist: bool = True, ckpt: Union[None, int, str] = None,
+        doReversible: bool = False
+    ) -> Tensor:
+        r"""Forward evolution of Bloch simulation
+
+        Inputs:
+            - ``ctx``: `(1,)`, pytorch CTX cacheing object
+            - ``Mi``, ``rf``, ``gr``, ``loc``, ``Δf``, ``b1Map``, ``T1``, \
+              ``T2``, ``γ``, ``dt``, ``ckpt``, ``doReversible``: see \
+              :func:`~mrphy.sims.blochsim_rfgr`.
+            - ``doHist``: bool, see :class:`~mrphy.sims.BlochSim`.
+        Outputs:
+            - ``Mo``: `(N, *Nd, xyz)`, Magetic spins after simulation.
+        """
+        doHist = doHist and any(ctx.needs_input_grad[0:3])
+        nT, doRev = gr.shape[-1], doHist and doReversible
+        k = (_anchor_step(ckpt, nT) if doRev else
+             _ckpt_step(ckpt, nT) if doHist else None)
+        # full history ⊻ checkpoints ⊻ float64 anchors
+        nHst, dtype = ((-(-nT//k)+1, torch.float64) if doRev else
+                       (nT if k is None else -(-nT//k), Mi.dtype))
+        Mhst = (torch.empty(Mi.shape+(nHst,), dtype=dtype,
+                            device=Mi.device) if doHist else None)
+
+        Mo = _rfgr_fwd(Mi, rf, gr, loc, Δf, b1Map, T1, T2, γ, dt, Mhst, k,
+                       doRev)
+
+        if doHist:
+            ctx.save_for_backward(Mi, Mhst, rf, gr, loc, Δf, b1Map,
+                                  T1, T2, γ, dt)
+            ctx.k, ctx.doReversible = k, doRev
+        return Mo
+
+    @staticmethod
+    def backward(
+        ctx: CTX, grad_Mo: Tensor
+    ) -> Tuple[Tensor, Tensor, Tensor, None, None, None, None, None, None,
+               None, None, None, None]:
+        r"""Backward evolution of Bloch simulation Jacobians
+
+        Inputs:
+            - ``ctx``: `(1,)`, pytorch CTX cacheing object
+            - ``grad_Mo``: `(N, *Nd, xyz)`, derivative w.r.t. output Magetic \
+              spins.
+        Outputs:
+            - ``grad_Mi``: `(N, *Nd, xyz)`, derivative w.r.t. input Magetic \
+              spins.
+            - ``grad_rf``: `(N,xy,nT,(nCoils))`, derivative w.r.t. ``rf``.
+            - ``grad_gr``: `(N,xyz,nT)`, derivative w.r.t. ``gr``.
+            - None*10, this implemendation do not provide derivatives \
+              w.r.t.: `loc`, `Δf`, `b1Map`, `T1`, `T2`, `γ`, `dt`, \
+              `doHist`, `ckpt`, `doReversible`.
+        """
+        needs_grad = ctx.needs_input_grad
+        grad_Mi = grad_rf = grad_gr = None
+
+        if not any(needs_grad[0:3]):
+            return (grad_Mi, grad_rf, grad_gr) + (None,)*10
+
+        Mi, Mhst, rf, gr, loc, Δf, b1Map, T1, T2, γ, dt = ctx.saved_tensors
+        NNd, nT, k = Mhst.shape[:-2], gr.shape[-1], ctx.k
+        tkw = {'memory_format': _contiguous_format,
+               'dtype': Mi.dtype, 'device': Mi.device}
+
+        prep, γ2πdt, E, e1_1, fn_relax_ = _rfgr_setup(
+            Mi, rf, gr, loc, Δf, b1Map, T1, T2, γ, dt)
+        rfs, grs, locf, Bz0, W = prep
+        N, nM = locf.shape[:2]
+
+        # Pre-allocate intermediate variables, in case of overhead alloc's
+        h0, u, uxh1, γbeff = (torch.empty(NNd+(3, 1), **tkw)
+                              for _ in range(4))
+        ϕ, cϕ_1, sϕ, utm0, uth1 = (torch.empty(NNd+(1, 1), **tkw)
+                                   for _ in range(5))
+        grad_rfs, grad_grs = torch.empty_like(rfs), torch.empty_like(grs)
+
+        # %% ∂L/∂beff of step `t`, contracted into ∂L/∂rf, ∂L/∂gr of step `t`
+        ts, gbeff = reversed(range(nT)), γbeff.view(N, nM, 3)
+        locT = locf.transpose(1, 2)  # (N, xyz, nM)
+        WT = (None if W is None else
+              W.reshape(N, nM*2, W.shape[-1]).transpose(1, 2))
+
+        def fn_gbeff_(_):
+            t = next(ts)
+            grad_grs[:, t] = locT @ gbeff[..., 2:3]
+            if W is None:
+                grad_rfs[:, t, :, 0] = torch.sum(gbeff[..., 0:2], dim=1)
+            else:
+                grad_rfs[:, t] = WT @ gbeff[..., 0:2].reshape(N, nM*2, 1)
+            return
+
+        # %% Jacobians. If we turn back time,
+        h1 = grad_Mo.clone(memory_format=_contiguous_format)[..., None]
+        h1.mul_(-γ2πdt)  # output ∂L/∂B no longer needs multiply by -γ2πdt
+
+        def fn_seg_bwd_(h1, h0, m0, Ms, t0, t1):
+            m0s = reversed((m0,)+Ms.split(1, dim=-1)[:-1])
+            γbeffs = (beff.mul_(γ2πdt)
+                      for beff in beffective._rfgr2beff_steps(
+                          *prep, out=γbeff, ts=reversed(range(t0, t1))))
+            return _bwd_steps_(h1, h0, Ms.narrow(-1, -1, 1), m0s, γbeffs,
+                               E, e1_1, fn_gbeff_, u, uxh1, ϕ, cϕ_1, sϕ,
+                               utm0, uth1)
+
+        if ctx.doReversible:  # `Mhst` holds anchors, spins recomputed
+            Mbuf = torch.empty(NNd+(3, 2), **tkw)
+            m1 = Mbuf.narrow(-1, nT % 2, 1)
+            m1.copy_(Mhst[..., -1:])
+            γbeffs = (beff.mul_(γ2πdt)
+                      for beff in beffective._rfgr2beff_steps(
+                          *prep, out=γbeff, ts=reversed(range(nT))))
+            m0s = _rev_m0s(Mhst, Mbuf, k, nT, γbeffs, E, e1_1)
+            # `m0s` computes each step's `γbeff`, in place, before yielding
+            h1, _ = _bwd_steps_(h1, h0, m1, m0s, (γbeff for _ in range(nT)),
+                                E, e1_1, fn_gbeff_, u, uxh1, ϕ, cϕ_1, sϕ,
+                                utm0, uth1)
+        elif k is None:
+            h1, _ = fn_seg_bwd_(h1, h0, Mi[..., None], Mhst, 0, nT)
+        else:  # `Mhst` holds checkpoints, segments recomputed
+            Mseg = torch.empty(NNd+(3, k), **tkw)
+            fn_seg_ = _rfgr_fn_seg(prep, γ2πdt, fn_relax_, γbeff,
+                                   u, ϕ, cϕ_1, sϕ)
+            h1, _ = _ckpt_bwd_(h1, h0, Mhst, Mseg, k, nT, fn_seg_,
+                               fn_seg_bwd_)
+
+        # %% Clean up
+        if needs_grad[0]:  # undo the multiply by -γ2πdt on h1
+            grad_Mi = h1[..., 0].div_(-γ2πdt[..., 0])
+
+        if needs_grad[1]:
+            if W is None:  # (N, nT, xy, 1) -> (N, xy, nT, (nCoils))
+                grad_rf = grad_rfs[..., 0].transpose(1, 2)
+                if rf.ndim == 4:
+                    grad_rf = grad_rf[..., None].expand(rf.shape)
+            else:  # (N, nT, xy⋅nCoils, 1) -> (N, xy, nT, (nCoils))
+                grad_rf = grad_rfs.reshape(N, nT, 2, -1).transpose(1, 2)
+                grad_rf = grad_rf if rf.ndim == 4 else grad_rf[..., 0]
+
+        if needs_grad[2]:  # (N, nT, xyz, 1) -> (N, xyz, nT)
+            grad_gr = grad_grs[..., 0].transpose(1, 2)
+
+        # forward(ctx, Mi, rf, gr; loc, Δf, b1Map, T1, T2, γ, dt, doHist,
+        #         ckpt, doReversible):
+        return (grad_Mi, grad_rf, grad_gr) + (None,)*10
 
 
 class FreePrec(Function):
     r"""Free precession with explicit Jacobian operation (backward)
 
-    This operator is only differentiable w.r.t. ``Mi``.
+    This operator is differentiable w.r.t. ``Mi``, ``dur``, ``T1``, ``T2``
+    and ``Δf``.
 
     """
 
@@ -360,14 +2310,18 @@ class FreePrec(Function):
             Mo[..., 0:2].mul_(E2)
             Mo[..., 2:3].mul_(E1).sub_(E1_1)
 
-        ctx.save_for_backward(cϕ, sϕ, E1, E2, tmp)
+        # `Mi` is only needed for derivatives w.r.t. `dur`, `T1`, `T2`, `Δf`
+        doMi = any(ctx.needs_input_grad[1:5])
+        ctx.save_for_backward(cϕ, sϕ, E1, E2, tmp, Mi if doMi else None,
+                              dur, T1, T2, Δf)
+        ctx.save_for_forward(cϕ, sϕ, E1, E2, Mi, dur, T1, T2, Δf)  # `jvp`
 
         return Mo
 
     @staticmethod
     def backward(
         ctx: CTX, grad_Mo: Tensor
-    ) -> Tuple[Tensor, None, None, None, None]:
+    ) -> Tuple[Tensor, Tensor, Tensor, Tensor, Tensor]:
         r"""Backward operation of free precession
 
         Inputs:
@@ -377,20 +2331,54 @@ class FreePrec(Function):
         Outputs:
             - ``grad_Mi``: `(N, *Nd, xyz)`, derivative w.r.t. input Magetic \
               spins.
-            - None*4, this implemendation do not provide derivatives w.r.t.: \
-              `dur`, `T1`, `T2`, and `Δf`.
+            - ``grad_dur``, ``grad_T1``, ``grad_T2``, ``grad_Δf``: \
+              derivatives w.r.t. ``dur``, ``T1``, ``T2``, ``Δf``, of their \
+              shapes.
         """  # If we turn back time,
-        # grads of configuration variables are not supported yet
         needs_grad = ctx.needs_input_grad
         grad_Mi = grad_dur = grad_T1 = grad_T2 = grad_Δf = None
 
-        if not any(needs_grad[0:1]):
+        if not any(needs_grad[0:5]):
             return grad_Mi, grad_dur, grad_T1, grad_T2, grad_Δf
 
-        grad_Mi = grad_Mo.clone(memory_format=_contiguous_format)
+        # ctx.save_for_backward(cϕ, sϕ, E1, E2, tmp, Mi, dur, T1, T2, Δf)
+        cϕ, sϕ, E1, E2, tmp, Mi, dur, T1, T2, Δf = ctx.saved_tensors
+
+        # %% ∂L/∂{dur, T1, T2, Δf}
+        # Mo = [E2⋅R(ϕ)Mixy; E1⋅(Miz-1)+1], ϕ = -2πΔf⋅dur
+        if any(needs_grad[1:5]):
+            if cϕ is None:  # precessed Mixy
+                Px, Py = Mi[..., 0], Mi[..., 1]
+            else:
+                Px = cϕ*Mi[..., 0] - sϕ*Mi[..., 1]
+                Py = sϕ*Mi[..., 0] + cϕ*Mi[..., 1]
+
+            gdur = 0
+            if E1 is not None:  # E = exp(-dur/T): ∂E/∂T = E⋅dur/T², ...
+                gE1 = grad_Mo[..., 2:3]*(Mi[..., 2:3]-1)*E1  # ∂L/∂E1⋅E1
+                gE2 = (grad_Mo[..., 0]*Px + grad_Mo[..., 1]*Py)[..., None]*E2
+                gdur = -(gE1/T1 + gE2/T2)  # ∂E/∂dur = -E/T
+                if needs_grad[2]:
+                    grad_T1 = (gE1*dur/T1**2).sum_to_size(T1.shape)
+                if needs_grad[3]:
+                    grad_T2 = (gE2*dur/T2**2).sum_to_size(T2.shape)
+
+            if Δf is not None:  # ∂L/∂ϕ = E2⋅(∂L/∂Moy⋅Px - ∂L/∂Mox⋅Py)
+                gϕ = grad_Mo[..., 1]*Px - grad_Mo[..., 0]*Py
+                gϕ = (gϕ if E2 is None else gϕ*E2[..., 0])*(-2*π)
+                if needs_grad[4]:
+                    grad_Δf = (gϕ*dur[..., 0]).sum_to_size(Δf.shape)
+                gdur = gdur + (gϕ*Δf)[..., None]
+
+            if needs_grad[1]:
+                grad_dur = (gdur.sum_to_size(dur.shape)
+                            if isinstance(gdur, Tensor) else
+                            torch.zeros_like(dur))
+
+        if not needs_grad[0]:
+            return grad_Mi, grad_dur, grad_T1, grad_T2, grad_Δf
 
-        # ctx.save_for_backward(cϕ, sϕ, E1, E2, E1_1)
-        cϕ, sϕ, E1, E2, tmp = ctx.saved_tensors
+        grad_Mi = grad_Mo.clone(memory_format=_contiguous_format)
 
         # Relaxation
         if E1 is not None:
@@ -410,6 +2398,46 @@ class FreePrec(Function):
 
         return grad_Mi, grad_dur, grad_T1, grad_T2, grad_Δf
 
+    @staticmethod
+    def jvp(
+        ctx: CTX, Ṁi: Optional[Tensor], ḋur: Optional[Tensor],
+        Ṫ1: Optional[Tensor], Ṫ2: Optional[Tensor], Δḟ: Optional[Tensor]
+    ) -> Tensor:
+        r"""Forward-mode derivative of free precession
+
+        Inputs:
+            - ``ctx``: `(1,)`, pytorch CTX cacheing object
+            - ``Ṁi``, ``ḋur``, ``Ṫ1``, ``Ṫ2``, ``Δḟ``: tangents of ``Mi``, \
+              ``dur``, ``T1``, ``T2``, ``Δf``, of their shapes, ⊻ `None`.
+        Outputs:
+            - ``Ṁo``: `(N, *Nd, xyz)`, tangent of the output Magetic spins.
+        """
+        cϕ, sϕ, E1, E2, Mi, dur, T1, T2, Δf = ctx.saved_tensors
+        Ṁi = torch.zeros_like(Mi) if Ṁi is None else Ṁi
+        (Px, Py, Pz), (Ṗx, Ṗy, Ṗz) = Mi.unbind(-1), Ṁi.unbind(-1)
+
+        # Precession, P = R(ϕ)Mi: Ṗ = R(ϕ)Ṁi + ϕ̇⋅[-Py; Px], ϕ = -2πΔf⋅dur
+        if Δf is not None:
+            Px, Py = cϕ*Px - sϕ*Py, sϕ*Px + cϕ*Py
+            Ṗx, Ṗy = cϕ*Ṗx - sϕ*Ṗy, sϕ*Ṗx + cϕ*Ṗy
+            dϕ = 0 if Δḟ is None else Δḟ*dur[..., 0]
+            dϕ = dϕ if ḋur is None else dϕ + Δf*ḋur[..., 0]
+            dϕ = -(2*π)*dϕ
+            Ṗx, Ṗy = Ṗx - dϕ*Py, Ṗy + dϕ*Px
+
+        # Relaxation, Mo = [E2⋅Pxy; E1⋅(Pz-1)+1], Ė = E⋅(dur⋅Ṫ/T² - ḋur/T)
+        if E1 is not None:
+            def fn_rate(T, Ṫ):
+                r = 0 if Ṫ is None else dur*Ṫ/T**2
+                return (r if ḋur is None else r - ḋur/T)
+
+            Ė1, Ė2 = E1*fn_rate(T1, Ṫ1), E2*fn_rate(T2, Ṫ2)
+            E1, E2, Ė1, Ė2 = (x[..., 0] for x in (E1, E2, Ė1, Ė2))
+            Ṗx, Ṗy = E2*Ṗx + Ė2*Px, E2*Ṗy + Ė2*Py
+            Ṗz = E1*Ṗz + Ė1*(Pz-1)
+
+        return torch.stack((Ṗx, Ṗy, Ṗz), dim=-1)
+
 
 def freeprec(
     Mi: Tensor, dur: Tensor, *,
@@ -418,7 +2446,8 @@ def freeprec(
 ) -> Tensor:
     r"""Isochromats free precession with given relaxation and off-resonance
 
-    This function is only differentiable w.r.t. ``Mi``.
+    This function is differentiable w.r.t. ``Mi``, ``dur``, ``T1``, ``T2``
+    and ``Δf``, in reverse and forward modes.
 
     Setting `T1=T2=None` to opt for simulation ignoring relaxation.
 
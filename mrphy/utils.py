@@ -3,8 +3,9 @@ r"""MRphy utilities
 Utilities for data indexing, conversions, spin rotation.
 """
 
-from typing import Any, Tuple, Union
+from typing import Any, Optional, Tuple, Union
 from numbers import Number
+import threading
 
 import torch
 import numpy as np
@@ -20,8 +21,9 @@ else:
     ndarrayA = ndarray_c
 
 
-__all__ = ['ctrsub', 'g2k', 'g2s', 'k2g', 'rf_c2r', 'rf_r2c', 'rf2tρθ',
-           'rfclamp', 's2g', 's2ts', 'sclamp', 'ts2s', 'tρθ2rf', 'uφrot']
+__all__ = ['Workspace', 'ctrsub', 'g2k', 'g2s', 'k2g', 'rf_c2r', 'rf_r2c',
+           'rf2tρθ', 'rfclamp', 'runlength', 's2g', 's2ts', 'sclamp', 'ts2s',
+           'tρθ2rf', 'uφrot']
 
 
 def ctrsub(shape: Any) -> Any:
@@ -232,6 +234,32 @@ def rfclamp(rf: Tensor, rfmax: Tensor, *, eps: Number = 1e-7) -> Tensor:
     return rf.mul(((rfmax[:, None, None, ...]-eps)/rf_abs).clamp_(max=1))
 
 
+def runlength(x: Tensor, *, dim: int = -1) -> Tensor:
+    r"""Lengths of runs of identical slices along a dimension
+
+    Slices ``x.select(dim, t)`` and ``x.select(dim, t+1)`` belong to the same
+    run, only if they are identical over all other dimensions, e.g., over the
+    whole batch and all spins.
+
+    Usage:
+        ``runs = runlength(x, *, dim)``
+    Inputs:
+        - ``x``: `(..., nT, ...)`, e.g., B-effective `(N, *Nd, xyz, nT)`.
+    Optionals:
+        - ``dim``: int, the dimension along which runs are searched.
+    Outputs:
+        - ``runs``: `(nRuns,)`, int64, lengths of runs in order, \
+          ``runs.sum() == nT``.
+    """
+    x = x.movedim(dim, -1)
+    nT = x.shape[-1]
+    x = x.reshape(-1, nT)
+    changed = torch.any(x[:, 1:] != x[:, :-1], dim=0)  # (nT-1,)
+    starts = torch.cat((changed.new_ones((1,)), changed)).nonzero()[:, 0]
+    runs = torch.diff(starts, append=starts.new_tensor([nT]))
+    return runs
+
+
 def s2g(s: Tensor, dt: Tensor = dt0) -> Tensor:
     r"""Compute gradients from slew rates.
 
@@ -353,3 +381,94 @@ def uϕrot(U: Tensor, Φ: Tensor, Vi: Tensor) -> Tensor:
           + sΦ*torch.cross(U.expand_as(Vi), Vi, dim=dim))
 
     return Vo
+
+
+class Workspace(object):
+    r"""Pool of reusable buffers, keyed by shape, dtype and device
+
+    Usage:
+        ``ws = Workspace(*, maxBytes)``
+        ``x = ws.borrow(shape, *, dtype, device)``; ``ws.release(x)``
+        ``with Workspace(*, maxBytes) as ws:``
+    Optionals:
+        - ``maxBytes``: int, "Byte", cap of the buffers kept for reuse. \
+          Released buffers beyond the cap are dropped to the allocator. \
+          Default ``None``, no cap.
+    Properties:
+        - ``nbytes``: int, "Byte", buffers currently kept for reuse.
+
+    A borrowed buffer is uninitialized, like ``torch.empty``, contiguous, and
+    exclusive until released; do not release a buffer that is still referred
+    to. Keeping buffers across calls, e.g., of
+    :func:`~mrphy.sims.blochsim` in a pulse design loop, removes their
+    allocation and page-faulting from later calls. ``clear()``, or exiting a
+    ``with`` block, drops all kept buffers.
+    """
+
+    def __init__(self, *, maxBytes: Optional[int] = None):
+        self.maxBytes = maxBytes
+        self.nbytes = 0
+        self._pool = {}  # {(shape, dtype, device): [Tensor, ...]}
+        self._lock = threading.Lock()  # e.g., threads of `BlochSimThreads`
+        return
+
+    def __enter__(self) -> 'Workspace':
+        return self
+
+    def __exit__(self, *args):
+        self.clear()
+        return
+
+    def borrow(
+        self, shape: tuple, *,
+        dtype: torch.dtype = torch.float32,
+        device: torch.device = torch.device('cpu')
+    ) -> Tensor:
+        r"""Borrow a buffer, allocate one if none is kept
+
+        Usage:
+            ``x = ws.borrow(shape, *, dtype, device)``
+        Outputs:
+            - ``x``: `shape`, uninitialized.
+        """
+        device = torch.device(device)
+        if (device.index is None) and (device.type != 'cpu'):
+            # as the `x.device` keys of `release`, e.g., `cuda` -> `cuda:0`
+            device = torch.empty(0, device=device).device
+        key = (tuple(shape), dtype, device)
+        with self._lock:
+            xs = self._pool.get(key)
+            if xs:
+                x = xs.pop()
+                self.nbytes -= x.nbytes
+                return x
+        return torch.empty(shape, dtype=dtype, device=device)
+
+    def release(self, *xs: Optional[Tensor]):
+        r"""Return borrowed buffers for reuse, `None` are ignored
+
+        Usage:
+            ``ws.release(*xs)``
+        """
+        with self._lock:
+            for x in xs:
+                if x is None:
+                    continue
+                if ((self.maxBytes is not None) and
+                        (self.nbytes + x.nbytes > self.maxBytes)):
+                    continue  # dropped, freed once unreferenced
+                key = (tuple(x.shape), x.dtype, x.device)
+                self._pool.setdefault(key, []).append(x)
+                self.nbytes += x.nbytes
+        return
+
+    def clear(self):
+        r"""Drop all kept buffers
+
+        Usage:
+            ``ws.clear()``
+        """
+        with self._lock:
+            self._pool.clear()
+            self.nbytes = 0
+        return
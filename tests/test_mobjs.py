@@ -1,11 +1,15 @@
 from copy import deepcopy
+import os
+import subprocess
+import sys
+
 import numpy as np
 import torch
 import pytest
 from torch import tensor, cuda
 
 from mrphy import γH, dt0, π, _slice
-from mrphy import mobjs
+from mrphy import mobjs, slowsims, utils
 
 # TODO:
 # unit_tests for objects `.to()` methods
@@ -63,6 +67,26 @@ def to_np(x):
     return x.detach().cpu().numpy()
 
 
+def _fn_loss(M_):  # additive across spin shards
+    return torch.sum(M_[..., 0]**2 + M_[..., 1])
+
+
+def _applypulse_dist(rank, nRanks, initMethod, γ, dtype, res):
+    # worker of `test_applypulse_dist`, one rank of a 'gloo' process group
+    torch.distributed.init_process_group('gloo', init_method=initMethod,
+                                         rank=rank, world_size=nRanks)
+    device = torch.device('cpu')
+    cube, p = _setup(tensor([[1.]]), tensor([[4e-2]]), γ, device, dtype)
+    rf, gr = p.rf.clone().requires_grad_(), p.gr.clone().requires_grad_()
+    p = mobjs.Pulse(rf, gr, dt=p.dt, device=device, dtype=dtype)
+
+    loss = cube.shard(rank, nRanks).applypulse_dist(p, _fn_loss)
+    loss.backward()
+    res[rank, 0], res[rank, 1:] = loss, torch.cat((rf.grad.reshape(-1),
+                                                   gr.grad.reshape(-1)))
+    torch.distributed.destroy_process_group()
+
+
 class Test_mobjs:
 
     device = torch.device('cuda' if cuda.is_available() else 'cpu')
@@ -130,6 +154,364 @@ class Test_mobjs:
 
         return
 
+    def test_applypulse_rfoff(self):
+        atol = self.atol
+
+        T1_, T2 = tensor([[1.]]), tensor([[4e-2]])
+        cube, p = _setup(T1_, T2, self.γ, device=self.device, dtype=self.dtype)
+        # offset Δf, as per step `BlochSim` is singular at `Beff == 0`
+        cube.Δf = (torch.sum(-cube.loc[0:1, :, :, :, 0:2], dim=-1)+0.1)*cube.γ
+
+        rf = p.rf.clone()
+        rf[:, :, 100:200], rf[:, :, 400:] = 0, 0  # e.g., spoiler, rewinder
+        gr = p.gr.clone().requires_grad_()
+        p = mobjs.Pulse(rf, gr, dt=p.dt, device=self.device, dtype=self.dtype)
+
+        res = []
+        for doFastRFoff in (False, True):
+            M_ = cube.applypulse(p, doFastRFoff=doFastRFoff)
+            grad_gr, = torch.autograd.grad(torch.sum(M_), gr)
+            res.append((to_np(M_), to_np(grad_gr)))
+
+        for x_ref, x in zip(*res):
+            assert(x_ref == pytest.approx(x, abs=atol))
+
+        # RF design: ∂L/∂rf within RF-off windows is not zero
+        rf.requires_grad = True
+        p = mobjs.Pulse(rf, gr, dt=p.dt, device=self.device, dtype=self.dtype)
+        res = []
+        for doFastRFoff in (False, True):
+            M_ = cube.applypulse(p, doFastRFoff=doFastRFoff)
+            grads = torch.autograd.grad(torch.sum(M_), (rf, gr))
+            res.append(tuple(to_np(x) for x in (M_, *grads)))
+
+        assert(np.any(res[0][1][:, :, 100:200] != 0))
+        for x_ref, x in zip(*res):
+            assert(x_ref == pytest.approx(x, abs=atol))
+        return
+
+    def test_applypulse_chunks(self):
+        atol = self.atol
+
+        T1_, T2 = tensor([[1.]]), tensor([[4e-2]])
+        cube, p = _setup(T1_, T2, self.γ, device=self.device, dtype=self.dtype)
+        cube.Δf = (torch.sum(-cube.loc[0:1, :, :, :, 0:2], dim=-1)+0.1)*cube.γ
+        b1Map_ = torch.rand((1, cube.nM, 2, 2), **self.dkw)
+
+        rf = p.rf[..., None].repeat(1, 1, 1, 2).requires_grad_()
+        gr = p.gr.clone().requires_grad_()
+        p = mobjs.Pulse(rf, gr, dt=p.dt, device=self.device, dtype=self.dtype)
+
+        res = []
+        for kw in ({}, {'chunkSize': 4}, {'memBudget': 2**18},
+                   {'nThreads': 3}, {'chunkSize': 8, 'nThreads': 2},
+                   {'chunkSize': 8, 'workspace': utils.Workspace()},
+                   {'doFuseBeff': True}, {'ckpt': 'sqrt'},
+                   {'doFuseBeff': True, 'ckpt': 5}, {'doReversible': True},
+                   {'doFuseBeff': True, 'doReversible': True},
+                   {'cacheRot': True}):
+            M_ = cube.applypulse(p, b1Map_=b1Map_, **kw)
+            grads = torch.autograd.grad(torch.sum(M_), (rf, gr))
+            res.append((to_np(M_),)+tuple(to_np(x) for x in grads))
+
+            with torch.no_grad():
+                M_ = cube.applypulse(p, b1Map_=b1Map_, **kw)
+            assert(to_np(M_) == pytest.approx(res[0][0], abs=atol))
+
+        for res_chunk in res[1:]:
+            for x_ref, x in zip(res[0], res_chunk):
+                assert(x_ref == pytest.approx(x, abs=atol))
+        return
+
+    def test_applypulse_membudget(self):
+        # Peak memory of forward and backward must stay within `memBudget`,
+        # for history, checkpoints, anchors, cached rotations and multi-coil.
+        # Measured in fresh processes, as `ru_maxrss` never decreases, after
+        # a warm-up, for the one-off allocations of a first call. The mmap
+        # threshold is fixed, glibc's dynamic one keeps freed chunks in heap.
+        script = (
+            "import resource, torch\n"
+            "from mrphy import mobjs\n"
+            "nM, nT, nCoils, memBudget = 3000, 300, {nCoils}, 2**24\n"
+            "kw, kw_ap = {{'dtype': torch.float64}}, {kw_ap}\n"
+            "T1, T2 = torch.tensor([[1.]]), torch.tensor([[4e-2]])\n"
+            "rf = (torch.rand((1, 2, nT, nCoils), **kw)*0.01)\n"
+            "gr = torch.rand((1, 3, nT), **kw)\n"
+            "rf.requires_grad, gr.requires_grad = True, True\n"
+            "p = mobjs.Pulse(rf, gr, **kw)\n"
+            "loc_ = torch.rand((1, nM, 3), **kw)-0.5\n"
+            "b1Map_ = torch.rand((1, nM, 2, nCoils), **kw)\n"
+            "def fn_ap(n, **kw_chunk):\n"
+            "    arr = mobjs.SpinArray((1, n), T1=T1, T2=T2, **kw)\n"
+            "    M_ = arr.applypulse(p, loc_=loc_[:, :n],"
+            " b1Map_=b1Map_[:, :n], **kw_chunk, **kw_ap)\n"
+            "    torch.sum(M_).backward()\n"
+            "fn_ap(2, chunkSize=1)\n"
+            "rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+            "fn_ap(nM, memBudget=memBudget)\n"
+            "rss1 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+            "print((rss1 - rss0)*1024/memBudget)\n")
+
+        env = {**os.environ, 'MALLOC_MMAP_THRESHOLD_': str(2**17)}
+        for nCoils, kw_ap in ((1, {}), (8, {'ckpt': 'sqrt'}),
+                              (8, {'cacheRot': True})):
+            ratio = float(subprocess.run(
+                [sys.executable, '-c', script.format(nCoils=nCoils,
+                                                     kw_ap=kw_ap)],
+                capture_output=True, text=True, check=True, env=env).stdout)
+            assert(ratio < 1.1)  # an approximate cap
+        return
+
+    def test_applypulse_params(self):
+        atol = self.atol
+
+        T1_, T2 = tensor([[1.]]), tensor([[4e-2]])
+        cube, p = _setup(T1_, T2, self.γ, device=self.device, dtype=self.dtype)
+        cube.Δf = (torch.sum(-cube.loc[0:1, :, :, :, 0:2], dim=-1)+0.1)*cube.γ
+
+        T1_ = (cube.T1_*(1+torch.rand(cube.T1_.shape, **self.dkw)))
+        T1_.requires_grad_()
+        dt = p.dt.clone().requires_grad_()
+        rf, gr = p.rf, p.gr
+
+        def fn_setup():  # fresh graphs from the leaves `T1_` and `dt`
+            cube.T1_, cube.T2_ = T1_, T1_/20
+            return mobjs.Pulse(rf, gr, dt=dt, device=self.device,
+                               dtype=self.dtype)
+
+        res = []
+        for kw in ({}, {'chunkSize': 4}, {'nThreads': 3},
+                   {'doFuseBeff': True}, {'ckpt': 'sqrt'}):
+            p = fn_setup()
+            M_ = cube.applypulse(p, **kw)
+            grads = torch.autograd.grad(torch.sum(M_), (T1_, dt))
+            res.append((to_np(grads[0]), to_np(grads[1]*dt)))  # ∂L/∂log(dt)
+
+        # against autograd through the reference simulator
+        p = fn_setup()
+        beff_ = cube.pulse2beff(p)
+        M_ = slowsims.blochsim(cube.M_, beff_, T1=cube.T1_, T2=cube.T2_,
+                               γ=cube.γ_, dt=p.dt)
+        grads = torch.autograd.grad(torch.sum(M_), (T1_, dt))
+        res_ref = (to_np(grads[0]), to_np(grads[1]*dt))
+
+        for res_kw in res:
+            for x_ref, x in zip(res_ref, res_kw):
+                assert(x_ref == pytest.approx(x, abs=atol))
+        return
+
+    def test_PulseOperator(self):
+        atol = self.atol
+
+        T1_, T2 = tensor([[1.]]), tensor([[4e-2]])
+        cube, p = _setup(T1_, T2, self.γ, device=self.device, dtype=self.dtype)
+        cube.Δf = (torch.sum(-cube.loc[0:1, :, :, :, 0:2], dim=-1)+0.1)*cube.γ
+        b1Map_ = torch.rand((1, cube.nM, 2, 2), **self.dkw)
+
+        rf = p.rf[..., None].repeat(1, 1, 1, 2)
+        p = mobjs.Pulse(rf, p.gr, dt=p.dt, device=self.device,
+                        dtype=self.dtype)
+
+        Ms_ = torch.randn((4,)+cube.M_.shape, **self.dkw)  # initial states
+
+        p.clear_cache()
+        for doRelax in (True, False):
+            op = p.to_operator(cube, doRelax=doRelax, b1Map_=b1Map_)
+            Mos_ = op(Ms_)
+
+            # cached on the pulse, by tensors
+            assert(op is p.to_operator(cube, doRelax=doRelax, b1Map_=b1Map_))
+
+            for M_, Mo_ in zip(Ms_, Mos_):
+                cube.M_ = M_
+                Mref_ = cube.applypulse(p, doRelax=doRelax, b1Map_=b1Map_)
+                assert(to_np(Mo_) == pytest.approx(to_np(Mref_), abs=atol))
+
+        cube.T1_ = cube.T1_*2  # new tensor, new operator
+        assert(op is not p.to_operator(cube, doRelax=False, b1Map_=b1Map_))
+        op = p.to_operator(cube, doRelax=False, b1Map_=b1Map_)
+        b1Map_.mul_(0.5)  # in-place, new operator
+        op1 = p.to_operator(cube, doRelax=False, b1Map_=b1Map_)
+        assert(op is not op1)
+        cube.M_ = Ms_[0]
+        Mref_ = cube.applypulse(p, doRelax=False, b1Map_=b1Map_)
+        assert(to_np(op1(Ms_[0])) == pytest.approx(to_np(Mref_), abs=atol))
+
+        # copies start w/ an empty cache, e.g., `interpT`
+        assert(len(p._ops) > 0)
+        assert(len(deepcopy(p)._ops) == 0 and len(p.interpT(p.dt)._ops) == 0)
+
+        # autograd through 𝐴/𝐵, not cached
+        rf = rf.clone().requires_grad_()
+        p = mobjs.Pulse(rf, p.gr, dt=p.dt, device=self.device,
+                        dtype=self.dtype)
+        op = p.to_operator(cube, b1Map_=b1Map_)
+        assert(len(p._ops) == 0)
+        grad1, = torch.autograd.grad(_fn_loss(op(Ms_)), rf)
+
+        loss = 0
+        for M_ in Ms_:
+            cube.M_ = M_
+            loss = loss + _fn_loss(cube.applypulse(p, b1Map_=b1Map_))
+        grad2, = torch.autograd.grad(loss, rf)
+        assert(to_np(grad1) == pytest.approx(to_np(grad2), abs=atol))
+        return
+
+    def test_steadystate(self):
+        atol = self.atol
+
+        T1_, T2 = tensor([[1.]]), tensor([[4e-2]])
+        cube, p = _setup(T1_, T2, self.γ, device=self.device, dtype=self.dtype)
+        cube.Δf = (torch.sum(-cube.loc[0:1, :, :, :, 0:2], dim=-1)+0.1)*cube.γ
+        cube.T1_, cube.T2_ = cube.T1_*0.05, cube.T2_*0.5  # faster convergence
+
+        rf = (p.rf*0.2).requires_grad_()
+        p = mobjs.Pulse(rf, p.gr, dt=p.dt, device=self.device,
+                        dtype=self.dtype)
+        dur, M0_ = tensor(1e-2, **self.dkw), cube.M_
+
+        for doSpoil in (False, True):
+            cube.M_ = M0_
+            M_ = cube.steadystate(p, dur, doSpoil=doSpoil)
+            grad1, = torch.autograd.grad(_fn_loss(M_), rf)
+
+            # against repeating TRs
+            op = p.to_operator(cube)
+            Mref_ = M0_
+            for _ in range(150):
+                cube.M_ = op(Mref_)
+                Mref_ = cube.freeprec(dur)
+                if doSpoil:
+                    Mref_ = Mref_*tensor([0., 0., 1.], **self.dkw)
+            Mref_ = op(Mref_)
+            grad2, = torch.autograd.grad(_fn_loss(Mref_), rf)
+
+            assert(to_np(M_) == pytest.approx(to_np(Mref_), abs=atol))
+            assert(to_np(grad1) == pytest.approx(to_np(grad2), abs=atol))
+        return
+
+    def test_applyrepeat(self):
+        atol = self.atol
+
+        T1_, T2 = tensor([[1.]]), tensor([[4e-2]])
+        cube, p = _setup(T1_, T2, self.γ, device=self.device, dtype=self.dtype)
+        cube.Δf = (torch.sum(-cube.loc[0:1, :, :, :, 0:2], dim=-1)+0.1)*cube.γ
+
+        rf = (p.rf*0.2).requires_grad_()
+        p = mobjs.Pulse(rf, p.gr, dt=p.dt, device=self.device,
+                        dtype=self.dtype)
+        dur, K = tensor(1e-2, **self.dkw), [0, 1, 5, 37]
+
+        for doSpoil in (False, True):
+            M_ = cube.applyrepeat(p, dur, K, doSpoil=doSpoil)
+            grad1, = torch.autograd.grad(_fn_loss(M_), rf)
+            assert(M_.shape == (cube.shape[0], cube.nM, len(K), 3))
+
+            # against repeating TRs
+            Mref_, M0_, loss = [], cube.M_, 0
+            for k in range(K[-1]+1):
+                if k in K:
+                    Mref_.append(cube.M_)
+                    loss = loss + _fn_loss(cube.M_)
+                cube.applypulse(p, doUpdate=True)
+                cube.freeprec(dur, doUpdate=True)
+                if doSpoil:
+                    cube.M_ = cube.M_*tensor([0., 0., 1.], **self.dkw)
+            grad2, = torch.autograd.grad(loss, rf)
+            cube.M_ = M0_
+
+            assert(to_np(M_) == pytest.approx(to_np(torch.stack(Mref_, -2)),
+                                              abs=atol))
+            assert(to_np(grad1) == pytest.approx(to_np(grad2), abs=atol))
+
+        M = cube.applyrepeat(p, dur, K[-1], doEmbed=True, doSpoil=True,
+                             doUpdate=True)
+        assert(to_np(cube.M_) == pytest.approx(to_np(Mref_[-1]), abs=atol))
+        assert(M.shape == cube.shape+(3,))
+
+        # ints of numpy and 0-d tensors, sequences of them, K >= 0
+        cube.M_ = M0_
+        with torch.no_grad():
+            for K_ in (np.int64(K[-1]), tensor(K[-1])):
+                M_ = cube.applyrepeat(p, dur, K_, doSpoil=True)
+                assert(to_np(M_) == pytest.approx(to_np(Mref_[-1]),
+                                                  abs=atol))
+            for K_ in (tensor(K), np.array(K), tensor(K[-1:])):
+                M_ = cube.applyrepeat(p, dur, K_, doSpoil=True)
+                assert(M_.shape == (cube.shape[0], cube.nM, len(K_), 3))
+                assert(to_np(M_[..., -1, :]) ==
+                       pytest.approx(to_np(Mref_[-1]), abs=atol))
+            for K_ in (-1, [1, -2], tensor(-1), [], [1.5]):
+                with pytest.raises((AssertionError, TypeError)):
+                    cube.applyrepeat(p, dur, K_)
+        return
+
+    def test_applypulse_procs(self):
+        atol = self.atol
+
+        T1_, T2 = tensor([[1.]]), tensor([[4e-2]])
+        cube, p = _setup(T1_, T2, self.γ, device=self.device, dtype=self.dtype)
+        if cube.is_cuda:
+            return
+        b1Map_ = torch.rand((1, cube.nM, 2, 2), **self.dkw)
+        p = mobjs.Pulse(p.rf[..., None].repeat(1, 1, 1, 2), p.gr, dt=p.dt,
+                        device=self.device, dtype=self.dtype)
+
+        with torch.no_grad():
+            M_ref = to_np(cube.applypulse(p, b1Map_=b1Map_))
+            for kw in ({'startMethod': 'fork'}, {'startMethod': 'spawn'},
+                       {'startMethod': 'forkserver', 'chunkSize': 5}):
+                M_ = cube.applypulse(p, b1Map_=b1Map_, nProcs=2, **kw)
+                assert(to_np(M_) == pytest.approx(M_ref, abs=atol))
+
+        # shared copies, the caller's tensors are not moved
+        assert(M_.is_shared() and not p.rf.is_shared())
+        assert(not any(x.is_shared() for x in (cube.M_, cube.loc_, cube.Δf_)))
+
+        # w/ grad, falls back to the in-process simulation
+        rf = p.rf.clone().requires_grad_()
+        p = mobjs.Pulse(rf, p.gr, dt=p.dt, device=self.device,
+                        dtype=self.dtype)
+        with pytest.warns(UserWarning, match='nProcs'):
+            M_ = cube.applypulse(p, b1Map_=b1Map_, nProcs=2)
+        assert(M_.requires_grad and not M_.is_shared())
+        assert(to_np(M_) == pytest.approx(M_ref, abs=atol))
+        return
+
+    def test_applypulse_dist(self, tmp_path):
+        atol, nRanks = self.atol, 3
+
+        T1_, T2 = tensor([[1.]]), tensor([[4e-2]])
+        cube, p = _setup(T1_, T2, self.γ, device=self.device, dtype=self.dtype)
+
+        # shards partition the spins
+        shards = [cube.shard(rank, nRanks) for rank in range(nRanks)]
+        assert(sum(x.nM for x in shards) == cube.nM)
+        M_ = torch.cat([x.M_ for x in shards], dim=1)
+        loc_ = torch.cat([x.loc_ for x in shards], dim=1)
+        assert(to_np(M_) == pytest.approx(to_np(cube.M_), abs=atol))
+        assert(to_np(loc_) == pytest.approx(to_np(cube.loc_), abs=atol))
+
+        if cube.is_cuda:
+            return
+
+        rf, gr = p.rf.clone().requires_grad_(), p.gr.clone().requires_grad_()
+        p = mobjs.Pulse(rf, gr, dt=p.dt, device=self.device, dtype=self.dtype)
+        loss = _fn_loss(cube.applypulse(p))
+        loss.backward()
+        res_ref = torch.cat((loss[None], rf.grad.reshape(-1),
+                             gr.grad.reshape(-1)))
+
+        res = res_ref.new_empty((nRanks,)+res_ref.shape).share_memory_()
+        initMethod = 'file://' + str(tmp_path / 'init')
+        torch.multiprocessing.spawn(_applypulse_dist, nprocs=nRanks,
+                                    args=(nRanks, initMethod, self.γ,
+                                          self.dtype, res))
+        for rank in range(nRanks):
+            assert(to_np(res[rank]) == pytest.approx(to_np(res_ref),
+                                                     abs=atol))
+        return
+
     def test_freeprec(self):
         dkw, atol = self.dkw, self.atol
 
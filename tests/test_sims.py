@@ -1,11 +1,15 @@
 import torch
 import pytest
 from torch import tensor, cuda
+import torch.autograd.forward_ad as fwAD
 
 from mrphy import γH, dt0, π
-from mrphy import beffective, sims, slowsims
+from mrphy import beffective, sims, slowsims, mobjs, utils
 
+import os
 import time
+import subprocess
+import sys
 
 
 class Test_sims:
@@ -140,6 +144,780 @@ class Test_sims:
         assert(pytest.approx(grad_M0_1b, abs=atol) == grad_M0_2b)
         assert(pytest.approx(grad_beff_1b, abs=atol) == grad_beff_2b)
 
+    def test_blochsim_engines(self):
+        """
+        Compare `engine='jit'` against the default `engine='loop'`.
+        """
+        f_t2np = lambda x: x.detach().clone().cpu().numpy()  # noqa: E731
+
+        print('\n')
+        dkw, atol = self.dkw, self.atol
+        γ, dt = self.γ, self.dt
+
+        N, nM, nT = 1, 32, 200
+        M0 = torch.rand((N, nM, 3), **dkw)
+        beff = (torch.rand((N, nM, 3, nT), **dkw)-0.5)
+        M0.requires_grad, beff.requires_grad = True, True
+        T1, T2 = tensor([[1.]], **dkw), tensor([[4e-2]], **dkw)
+
+        res = {}
+        for engine in ('loop', 'jit'):
+            M0.grad, beff.grad = None, None
+            Mo = sims.blochsim(M0, beff, T1=T1, T2=T2, γ=γ, dt=dt,
+                               engine=engine)
+            torch.sum(Mo).backward()
+            res[engine] = tuple(f_t2np(x) for x in (Mo, M0.grad, beff.grad))
+
+        for x_loop, x_jit in zip(res['loop'], res['jit']):
+            assert(pytest.approx(x_loop, abs=atol) == x_jit)
+
+        # w/o relaxations
+        M0.grad, beff.grad = None, None
+        torch.sum(sims.blochsim(M0, beff, γ=γ, dt=dt)).backward()
+        grads_loop = f_t2np(M0.grad), f_t2np(beff.grad)
+
+        M0.grad, beff.grad = None, None
+        torch.sum(sims.blochsim(M0, beff, γ=γ, dt=dt, engine='jit')).backward()
+        grads_jit = f_t2np(M0.grad), f_t2np(beff.grad)
+
+        for x_loop, x_jit in zip(grads_loop, grads_jit):
+            assert(pytest.approx(x_loop, abs=atol) == x_jit)
+        return
+
+    def test_blochsim_threads(self):
+        """
+        Compare spin-sharded `nThreads` against the serial simulation.
+        """
+        f_t2np = lambda x: x.detach().clone().cpu().numpy()  # noqa: E731
+
+        print('\n')
+        dkw, atol = self.dkw, self.atol
+        γ, dt = self.γ, self.dt
+
+        N, nM, nT = 2, 65, 100  # `nM` not divisible by the shards
+        M0 = torch.rand((N, nM, 3), **dkw)
+        beff = (torch.rand((N, nM, 3, nT), **dkw)-0.5)
+        M0.requires_grad, beff.requires_grad = True, True
+        T1 = torch.rand((N, nM), **dkw) + 0.5  # per spin, sharded along
+        T2, γ = T1/10, γ.expand(N, nM).clone()
+
+        nThreadss = (1, 2, 3)
+        res = {}
+        for nThreads in nThreadss:
+            M0.grad, beff.grad = None, None
+            Mo = sims.blochsim(M0, beff, T1=T1, T2=T2, γ=γ, dt=dt,
+                               nThreads=nThreads)
+            torch.sum(Mo).backward()
+            res[nThreads] = tuple(f_t2np(x) for x in (Mo, M0.grad, beff.grad))
+
+        for nThreads in nThreadss[1:]:
+            for x_1, x_n in zip(res[1], res[nThreads]):
+                assert(pytest.approx(x_1, abs=atol) == x_n)
+
+        # w/o relaxations, only `Beff` requires grad
+        grads = []
+        for nThreads in (None, 3):
+            beff.grad = None
+            Mo = sims.blochsim(M0.detach(), beff, γ=γ, dt=dt,
+                               nThreads=nThreads)
+            torch.sum(Mo).backward()
+            grads.append(f_t2np(beff.grad))
+        assert(pytest.approx(grads[0], abs=atol) == grads[1])
+
+        with torch.no_grad():
+            Mo_n = sims.blochsim(M0, beff, γ=γ, dt=dt, nThreads=3)
+            Mo_1 = sims.blochsim(M0, beff, γ=γ, dt=dt)
+        assert(pytest.approx(f_t2np(Mo_1), abs=atol) == f_t2np(Mo_n))
+        return
+
+    def test_blochsim_workspace(self):
+        """
+        Repeated simulations borrowing buffers from a `utils.Workspace`, as in
+        a design loop, against allocating them per call.
+        """
+        f_t2np = lambda x: x.detach().clone().cpu().numpy()  # noqa: E731
+
+        print('\n')
+        dkw, atol = self.dkw, self.atol
+        γ, dt = self.γ, self.dt
+
+        N, nM, nT = 1, 64, 200
+        M0 = torch.rand((N, nM, 3), **dkw)
+        beff = (torch.rand((N, nM, 3, nT), **dkw)-0.5)
+        beff[..., 0:2, 60:80] = 0  # RF-off window, chains 3 `BlochSim`
+        M0.requires_grad, beff.requires_grad = True, True
+        T1, T2 = tensor([[1.]], **dkw), tensor([[4e-2]], **dkw)
+        kw = {'T1': T1, 'T2': T2, 'γ': γ, 'dt': dt}
+
+        res = {}
+        ws = utils.Workspace()
+        for workspace in (None, ws):
+            for doFastRFoff in (False, True, False, True):
+                M0.grad, beff.grad = None, None
+                Mo = sims.blochsim(M0, beff, doFastRFoff=doFastRFoff,
+                                   workspace=workspace, **kw)
+                torch.sum(Mo).backward()
+                res[workspace, doFastRFoff] = tuple(
+                    f_t2np(x) for x in (Mo, M0.grad, beff.grad))
+                with torch.no_grad():
+                    Mo = sims.blochsim(M0, beff, doFastRFoff=doFastRFoff,
+                                       workspace=workspace, **kw)
+                    assert(pytest.approx(f_t2np(Mo), abs=atol) ==
+                           res[workspace, doFastRFoff][0])
+            if workspace is not None:
+                nbytes = ws.nbytes
+                assert(nbytes > 0)
+                Mo = sims.blochsim(M0, beff, workspace=ws, **kw)
+                torch.sum(Mo).backward()
+                assert(ws.nbytes == nbytes)  # all reused, none added
+
+        for doFastRFoff in (False, True):
+            for x_ref, x in zip(res[None, doFastRFoff], res[ws, doFastRFoff]):
+                assert(pytest.approx(x_ref, abs=atol) == x)
+        return
+
+    def test_rfgr2beff(self):
+        """
+        Multi-coil, multi-dim `Nd`, against the complex coil combination.
+        """
+        f_t2np = lambda x: x.detach().clone().cpu().numpy()  # noqa: E731
+
+        dkw, atol, γ = self.dkw, self.atol, self.γ
+
+        N, Nd, nT, nCoils = 2, (3, 4, 5), 100, 4
+        loc = torch.rand((N, *Nd, 3), **dkw)-0.5
+        Δf = (torch.rand((N, *Nd), **dkw)-0.5)*100
+        rf = (torch.rand((N, 2, nT, nCoils), **dkw)-0.5).requires_grad_()
+        gr = (torch.rand((N, 3, nT), **dkw)-0.5).requires_grad_()
+        b1Map = torch.rand((N, *Nd, 2, nCoils), **dkw)-0.5
+
+        def fn_ref(rf, gr, b1Map):
+            b1 = torch.complex(b1Map[..., 0, :], b1Map[..., 1, :])
+            B1 = torch.einsum('n...c,ntc->n...t', b1,
+                              torch.complex(rf[:, 0], rf[:, 1]))
+            Bz = torch.einsum('n...x,nxt->n...t', loc, gr) + (Δf/γ)[..., None]
+            return torch.stack((B1.real, B1.imag, Bz), dim=-2)
+
+        for b1Map_kw in (b1Map, b1Map[:1, :1, :1, :1]):  # w/ broadcasting
+            beff_ref = fn_ref(rf, gr, b1Map_kw.expand_as(b1Map))
+            grads_ref = torch.autograd.grad(torch.sum(beff_ref**2), (rf, gr))
+
+            beff = beffective.rfgr2beff(rf, gr, loc, Δf=Δf, b1Map=b1Map_kw,
+                                        γ=γ)
+            grads = torch.autograd.grad(torch.sum(beff**2), (rf, gr))
+            assert(pytest.approx(f_t2np(beff_ref), abs=atol) == f_t2np(beff))
+            for x_ref, x in zip(grads_ref, grads):
+                assert(pytest.approx(f_t2np(x_ref), abs=atol) == f_t2np(x))
+
+            # in-place, w/o autograd
+            out = torch.empty_like(beff)
+            with torch.no_grad():
+                beff = beffective.rfgr2beff(rf, gr, loc, Δf=Δf,
+                                            b1Map=b1Map_kw, γ=γ, out=out)
+            assert(beff is out)
+            assert(pytest.approx(f_t2np(beff_ref), abs=atol) == f_t2np(beff))
+        return
+
+    def test_blochsim_rfgr(self):
+        """
+        B-effective computed inside the time loop, against `rfgr2beff` then
+        `blochsim`.
+        """
+        f_t2np = lambda x: x.detach().clone().cpu().numpy()  # noqa: E731
+
+        print('\n')
+        dkw, atol = self.dkw, self.atol
+        γ, dt = self.γ, self.dt
+
+        nT = 200
+        # `N1` of `b1Map`, `1` to be broadcasted when `N > 1`
+        for N, Nd, nCoils, N1 in ((2, (64,), 3, 2), (2, (4, 3, 2), 2, 1),
+                                  (1, (4, 3, 2), None, 1)):
+            M0 = torch.rand((N, *Nd, 3), **dkw)
+            loc = torch.rand((N, *Nd, 3), **dkw)-0.5
+            Δf = (torch.rand((N, *Nd), **dkw)-0.5)*100
+            rf = (torch.rand((N, 2, nT) + ((nCoils,) if nCoils else ()),
+                             **dkw)-0.5)*0.1
+            gr = torch.rand((N, 3, nT), **dkw)-0.5
+            b1Map = (None if nCoils is None else
+                     torch.rand((N1, *Nd, 2, nCoils), **dkw)-0.5)
+            T1 = torch.rand((N, *Nd), **dkw)+0.5
+            T2 = T1/20
+            kw = {'T1': T1, 'T2': T2, 'γ': γ, 'dt': dt}
+
+            with torch.no_grad():
+                beff = beffective.rfgr2beff(rf, gr, loc, Δf=Δf, b1Map=b1Map,
+                                            γ=γ)
+                Mo_ref = sims.blochsim(M0, beff, **kw)
+
+                Mo = sims.blochsim_rfgr(M0, rf, gr, loc, Δf=Δf, b1Map=b1Map,
+                                        **kw)
+            assert(pytest.approx(f_t2np(Mo_ref), abs=atol) == f_t2np(Mo))
+
+            # w/ grad
+            rf.requires_grad = True
+            Mo = sims.blochsim_rfgr(M0, rf, gr, loc, Δf=Δf, b1Map=b1Map, **kw)
+            assert(pytest.approx(f_t2np(Mo_ref), abs=atol) == f_t2np(Mo))
+            torch.sum(Mo).backward()
+            grad_rf = f_t2np(rf.grad)
+
+            rf.grad = None
+            beff = beffective.rfgr2beff(rf, gr, loc, Δf=Δf, b1Map=b1Map, γ=γ)
+            torch.sum(sims.blochsim(M0, beff, **kw)).backward()
+            assert(pytest.approx(f_t2np(rf.grad), abs=atol) == grad_rf)
+
+        # Peak memory of forward and backward w.r.t. rf and gr, in fresh
+        # processes, as `ru_maxrss` never decreases.
+        script = (
+            "import resource, torch\n"
+            "from mrphy import sims, beffective\n"
+            "nM, nT, kw = 10000, 1000, {{'dtype': torch.float64}}\n"
+            "M0, loc = (torch.rand((1, nM, 3), **kw) for _ in range(2))\n"
+            "rf = torch.rand((1, 2, nT), **kw).requires_grad_()\n"
+            "gr = torch.rand((1, 3, nT), **kw).requires_grad_()\n"
+            "rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+            "if {doFuse}:\n"
+            "    Mo = sims.blochsim_rfgr(M0, rf, gr, loc)\n"
+            "else:\n"
+            "    Mo = sims.blochsim(M0, beffective.rfgr2beff(rf, gr, loc))\n"
+            "torch.sum(Mo).backward()\n"
+            "rss1 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+            "print(rss1 - rss0)\n")
+
+        drss = [int(subprocess.run(
+            [sys.executable, '-c', script.format(doFuse=doFuse)],
+            capture_output=True, text=True, check=True).stdout)
+            for doFuse in (False, True)]  # KiB on Linux
+        print('peak memory increase (KiB), two-stage vs fused:', drss)
+        assert(drss[1] < drss[0]/2)
+        return
+
+    def test_blochsim_ckpt(self):
+        """
+        Checkpointed spin history, against the full history.
+        """
+        f_t2np = lambda x: x.detach().clone().cpu().numpy()  # noqa: E731
+
+        print('\n')
+        dkw, atol = self.dkw, self.atol
+        γ, dt = self.γ, self.dt
+
+        N, nM, nT = 2, 32, 101
+        M0 = torch.rand((N, nM, 3), **dkw)
+        beff = torch.rand((N, nM, 3, nT), **dkw)-0.5
+        M0.requires_grad, beff.requires_grad = True, True
+        T1, T2 = tensor([[1.]], **dkw), tensor([[4e-2]], **dkw)
+        kw = {'T1': T1, 'T2': T2, 'γ': γ, 'dt': dt}
+
+        res = {}
+        for engine in ('loop', 'jit'):
+            for ckpt in (None, 1, 7, 'sqrt', nT):
+                M0.grad, beff.grad = None, None
+                Mo = sims.blochsim(M0, beff, engine=engine, ckpt=ckpt, **kw)
+                torch.sum(Mo).backward()
+                res[engine, ckpt] = tuple(f_t2np(x)
+                                          for x in (Mo, M0.grad, beff.grad))
+
+        for key, xs in res.items():
+            for x_ref, x in zip(res['loop', None], xs):
+                assert(pytest.approx(x_ref, abs=atol) == x)
+
+        # B-effective fused, checkpointed
+        loc = torch.rand((N, nM, 3), **dkw)-0.5
+        rf = ((torch.rand((N, 2, nT), **dkw)-0.5)*0.1).requires_grad_()
+        gr = (torch.rand((N, 3, nT), **dkw)-0.5).requires_grad_()
+        res = []
+        for ckpt in (None, 'sqrt'):
+            rf.grad, gr.grad = None, None
+            Mo = sims.blochsim_rfgr(M0, rf, gr, loc, ckpt=ckpt, **kw)
+            torch.sum(Mo).backward()
+            res.append(tuple(f_t2np(x) for x in (Mo, rf.grad, gr.grad)))
+        for x_ref, x in zip(*res):
+            assert(pytest.approx(x_ref, abs=atol) == x)
+        return
+
+    def test_blochsim_reversible(self):
+        """
+        Reversible adjoint, spins recomputed backward in time, against the
+        full history.
+        """
+        f_t2np = lambda x: x.detach().clone().cpu().numpy()  # noqa: E731
+
+        print('\n')
+        dkw, atol = self.dkw, self.atol
+        γ, dt = self.γ, self.dt
+
+        N, nM, nT = 2, 32, 301
+        M0 = torch.rand((N, nM, 3), **dkw)
+        beff = torch.rand((N, nM, 3, nT), **dkw)-0.5
+        M0.requires_grad, beff.requires_grad = True, True
+        T1, T2 = tensor([[1.]], **dkw), tensor([[4e-2]], **dkw)
+
+        for kw in ({'T1': T1, 'T2': T2}, {'T1': None, 'T2': None}):
+            res = {}
+            for doRev, ckpt in ((False, None), (True, None), (True, 1),
+                                (True, 7), (True, 'sqrt'), (True, nT)):
+                M0.grad, beff.grad = None, None
+                Mo = sims.blochsim(M0, beff, γ=γ, dt=dt, ckpt=ckpt,
+                                   doReversible=doRev, **kw)
+                torch.sum(Mo).backward()
+                res[doRev, ckpt] = tuple(f_t2np(x)
+                                         for x in (Mo, M0.grad, beff.grad))
+
+            for xs in res.values():
+                for x_ref, x in zip(res[False, None], xs):
+                    assert(pytest.approx(x_ref, abs=atol) == x)
+
+        # float32, drift of the inversion is bounded by the anchors
+        kw32 = {'dtype': torch.float32, 'device': self.device}
+        M0_, beff_ = (x.detach().to(**kw32).requires_grad_()
+                      for x in (M0, beff))
+        kw = {'T1': T1.to(**kw32), 'T2': T2.to(**kw32), 'γ': γ.to(**kw32),
+              'dt': dt.to(**kw32)}
+        res = []
+        for doRev in (False, True):
+            M0_.grad, beff_.grad = None, None
+            torch.sum(sims.blochsim(M0_, beff_, doReversible=doRev,
+                                    **kw)).backward()
+            res.append(tuple(f_t2np(x) for x in (M0_.grad, beff_.grad)))
+        for x_ref, x in zip(*res):
+            assert(pytest.approx(x_ref, abs=1e-4) == x)
+
+        # B-effective fused
+        loc = torch.rand((N, nM, 3), **dkw)-0.5
+        rf = ((torch.rand((N, 2, nT), **dkw)-0.5)*0.1).requires_grad_()
+        gr = (torch.rand((N, 3, nT), **dkw)-0.5).requires_grad_()
+        res = []
+        for doRev in (False, True):
+            rf.grad, gr.grad = None, None
+            Mo = sims.blochsim_rfgr(M0, rf, gr, loc, T1=T1, T2=T2, γ=γ,
+                                    dt=dt, doReversible=doRev)
+            torch.sum(Mo).backward()
+            res.append(tuple(f_t2np(x) for x in (Mo, rf.grad, gr.grad)))
+        for x_ref, x in zip(*res):
+            assert(pytest.approx(x_ref, abs=atol) == x)
+        return
+
+    def test_blochsim_cacherot(self):
+        """
+        Rotations kept from forward for backward, against recomputing them.
+        """
+        f_t2np = lambda x: x.detach().clone().cpu().numpy()  # noqa: E731
+
+        print('\n')
+        dkw, atol = self.dkw, self.atol
+        γ, dt = self.γ, self.dt
+
+        N, nM, nT = 1, 32, 200
+        M0 = torch.rand((N, nM, 3), **dkw)
+        beff = torch.rand((N, nM, 3, nT), **dkw)-0.5
+        beff[..., 100:120] = 0  # zero B-effective has no rotation axis
+        M0.requires_grad, beff.requires_grad = True, True
+        T1, T2 = tensor([[1.]], **dkw), tensor([[4e-2]], **dkw)
+        kw = {'T1': T1, 'T2': T2, 'γ': γ, 'dt': dt}
+
+        nbytes = 2*beff.numel()*beff.element_size()
+        res = {}
+        for cacheRot in (False, True, nbytes, nbytes-1):
+            M0.grad, beff.grad = None, None
+            Mo = sims.blochsim(M0, beff, cacheRot=cacheRot, **kw)
+            torch.sum(Mo).backward()
+            res[cacheRot] = tuple(f_t2np(x) for x in (Mo, M0.grad, beff.grad))
+
+        for xs in res.values():
+            for x_ref, x in zip(res[False], xs):
+                assert(pytest.approx(x_ref, abs=atol) == x)
+        return
+
+    def test_blochsim_params(self):
+        """
+        Derivatives w.r.t. `T1`, `T2`, `γ` and `dt`, against autograd of
+        `slowsims.blochsim`.
+        """
+        f_t2np = lambda x: x.detach().clone().cpu().numpy()  # noqa: E731
+
+        print('\n')
+        dkw, atol = self.dkw, self.atol
+
+        N, nM, nT = 2, 32, 64
+        M0 = torch.rand((N, nM, 3), **dkw)
+        beff = torch.rand((N, nM, 3, nT), **dkw)-0.5
+        beff[..., 10:12] = 0  # zero B-effective has no rotation axis
+        M0.requires_grad, beff.requires_grad = True, True
+
+        # per spin, and broadcast, parameters
+        T1s = (torch.rand((N, nM), **dkw)+0.5, tensor([[1.]], **dkw))
+        for T1 in T1s:
+            T2 = (T1/20).detach()
+            γ = (γH.to(**dkw)*(1+0.1*torch.rand(T1.shape, **dkw)))
+            dt = dt0.to(**dkw)*torch.ones((T1.shape[0], 1), **dkw)
+            xs = (M0, beff, T1, T2, γ, dt)
+            for x in xs[2:]:
+                x.requires_grad = True
+
+            def fn_grads(fn_bsim, **kw):
+                for x in xs:
+                    x.grad = None
+                Mo = fn_bsim(M0, beff, T1=T1, T2=T2, γ=γ, dt=dt, **kw)
+                torch.sum(Mo*Mo).backward()
+                # ∂L/∂log(dt), ∂L/∂dt is too large for `atol`
+                return tuple(f_t2np(x.grad*(x if x is dt else 1))
+                             for x in xs)
+
+            # ∂L/∂log(dt) sums O(1) terms of opposite signs
+            atols = (atol,)*5 + (100*atol,)
+
+            res0 = fn_grads(slowsims.blochsim)
+            for kw in ({}, {'engine': 'jit'}, {'ckpt': 7},
+                       {'engine': 'jit', 'ckpt': 'sqrt'},
+                       {'doReversible': True, 'ckpt': 5},
+                       {'cacheRot': True}, {'nThreads': 3}):
+                res = fn_grads(sims.blochsim, **kw)
+                for x_ref, x, atol_ in zip(res0, res, atols):
+                    assert(pytest.approx(x_ref, abs=atol_) == x)
+
+        # w/o relaxation
+        for x in xs:
+            x.grad = None
+        Mo = sims.blochsim(M0, beff, γ=γ, dt=dt)
+        torch.sum(Mo*Mo).backward()
+        grads = tuple(f_t2np(x) for x in (M0.grad, beff.grad, γ.grad,
+                                          dt*dt.grad))
+        for x in xs:
+            x.grad = None
+        Mo = slowsims.blochsim(M0, beff, γ=γ, dt=dt)
+        torch.sum(Mo*Mo).backward()
+        for x_ref, x, atol_ in zip(grads, (M0.grad, beff.grad, γ.grad,
+                                           dt*dt.grad), atols[2:]):
+            assert(pytest.approx(f_t2np(x), abs=atol_) == x_ref)
+        return
+
+    def test_blochsim_jvp(self):
+        """
+        Forward-mode derivatives, against `slowsims` via double backward.
+        """
+        f_t2np = lambda x: x.detach().clone().cpu().numpy()  # noqa: E731
+
+        print('\n')
+        dkw, atol = self.dkw, self.atol
+
+        N, nM, nT = 2, 32, 64
+        M0 = torch.rand((N, nM, 3), **dkw)
+        beff = torch.rand((N, nM, 3, nT), **dkw)-0.5
+        T1 = torch.rand((N, nM), **dkw)+0.5
+        T2 = T1/20
+        γ = (γH.to(**dkw)*(1+0.1*torch.rand(T1.shape, **dkw)))
+        dt = dt0.to(**dkw)*torch.ones((N, 1), **dkw)
+        xs = (M0, beff, T1, T2, γ, dt)
+        # scaled tangents, so that all inputs contribute comparably
+        vs = tuple(torch.randn_like(x)*x.abs().mean() for x in xs)
+
+        def fn_bsim(*xs, fn=slowsims.blochsim, **kw):
+            M0, beff, T1, T2, γ, dt = xs
+            return fn(M0, beff, T1=T1, T2=T2, γ=γ, dt=dt, **kw)
+
+        Ṁo_ref = f_t2np(torch.autograd.functional.jvp(fn_bsim, xs, vs)[1])
+
+        for kw in ({}, {'nThreads': 3}):
+            with fwAD.dual_level(), torch.no_grad():
+                Mo = fn_bsim(*(fwAD.make_dual(x, v) for x, v in zip(xs, vs)),
+                             fn=sims.blochsim, **kw)
+                Ṁo = f_t2np(fwAD.unpack_dual(Mo).tangent)
+            assert(pytest.approx(Ṁo_ref, abs=atol) == Ṁo)
+
+        # free precession
+        dur = torch.tensor(0.5, **dkw)
+        Δf = torch.rand((N, nM), **dkw)*10
+        xs = (M0, dur, T1, T2, Δf)
+        vs = tuple(torch.randn_like(x) for x in xs)
+
+        def fn_fp(*xs, fn=slowsims.freeprec):
+            M0, dur, T1, T2, Δf = xs
+            return fn(M0, dur, T1=T1, T2=T2, Δf=Δf)
+
+        Ṁo_ref = f_t2np(torch.autograd.functional.jvp(fn_fp, xs, vs)[1])
+        with fwAD.dual_level():
+            Mo = fn_fp(*(fwAD.make_dual(x, v) for x, v in zip(xs, vs)),
+                       fn=sims.freeprec)
+            Ṁo = f_t2np(fwAD.unpack_dual(Mo).tangent)
+        assert(pytest.approx(Ṁo_ref, abs=atol) == Ṁo)
+        return
+
+    def test_blochsim_hvp(self):
+        """
+        Double backward, Hessian-vector products, against `slowsims`.
+        """
+        f_t2np = lambda x: x.detach().clone().cpu().numpy()  # noqa: E731
+
+        print('\n')
+        dkw, atol = self.dkw, self.atol
+
+        N, nM, nT = 2, 8, 32
+        M0 = torch.rand((N, nM, 3), **dkw)
+        beff = torch.rand((N, nM, 3, nT), **dkw)-0.5
+        T1 = torch.rand((N, nM), **dkw)+0.5
+        T2 = T1/20
+        γ = (γH.to(**dkw)*(1+0.1*torch.rand(T1.shape, **dkw)))
+        dt = dt0.to(**dkw)*torch.ones((N, 1), **dkw)
+        xs = (M0, beff, T1, T2, γ, dt)
+        for x in xs:
+            x.requires_grad = True
+        vs = tuple(torch.randn_like(x) for x in xs)
+
+        def fn_hvp(fn, **kw):
+            Mo = fn(M0, beff, T1=T1, T2=T2, γ=γ, dt=dt, **kw)
+            gs = torch.autograd.grad(torch.sum(Mo*Mo), xs, create_graph=True)
+            hvs = torch.autograd.grad(sum(torch.sum(g*v)
+                                          for g, v in zip(gs, vs)), xs)
+            return tuple(f_t2np(hv) for hv in hvs)
+
+        res0 = fn_hvp(slowsims.blochsim)
+        for kw in ({}, {'engine': 'jit'}, {'ckpt': 7},
+                   {'doReversible': True}, {'nThreads': 3}):
+            res = fn_hvp(sims.blochsim, **kw)
+            for x_ref, x in zip(res0, res):  # `rel`, `Hv` of `dt` is ~1e8
+                assert(pytest.approx(x_ref, rel=1e-9, abs=atol) == x)
+
+        # Peak memory of double backward over the kept history, in units of
+        # `Beff`, vs. that of backward: no second `O(nT)` autograd graph, only
+        # `∂L/∂B`, `∂L/∂B⋅v`, the tangent history, and `Hv`. Measured in
+        # fresh processes, as `ru_maxrss` never decreases, after a warm-up.
+        script = (
+            "import resource, torch\n"
+            "from mrphy import sims\n"
+            "nM, nT, kw = 10000, 200, {{'dtype': torch.float64}}\n"
+            "T1, T2 = (torch.tensor([[T]], **kw) for T in (1., 4e-2))\n"
+            "def fn(n):\n"
+            "    M0 = torch.rand((1, n, 3), **kw)\n"
+            "    beff = torch.rand((1, n, 3, nT), **kw)-0.5\n"
+            "    beff.requires_grad = True\n"
+            "    Mo = sims.blochsim(M0, beff, T1=T1, T2=T2, **{kw})\n"
+            "    g, = torch.autograd.grad(torch.sum(Mo*Mo), beff,"
+            " create_graph={doHvp})\n"
+            "    if {doHvp}:\n"
+            "        torch.autograd.grad(torch.sum(g*torch.randn_like(g)),"
+            " beff)\n"
+            "fn(2)\n"
+            "rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+            "fn(nM)\n"
+            "rss1 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+            "print((rss1 - rss0)*1024/(nM*3*nT*8))\n")
+
+        env = {**os.environ, 'MALLOC_MMAP_THRESHOLD_': str(2**17)}
+        for kw in ({}, {'ckpt': 'sqrt'}):
+            ratio = [float(subprocess.run(
+                [sys.executable, '-c', script.format(kw=kw, doHvp=doHvp)],
+                capture_output=True, text=True, check=True, env=env).stdout)
+                for doHvp in (False, True)]
+            assert(ratio[1] - ratio[0] < 5)  # redoing the sims took ~25
+        return
+
+    def test_blochsim_window(self):
+        """
+        Derivatives w.r.t. a time window of B-effective, against the window
+        of the full derivatives.
+        """
+        f_t2np = lambda x: x.detach().clone().cpu().numpy()  # noqa: E731
+
+        print('\n')
+        dkw, atol = self.dkw, self.atol
+        γ, dt = self.γ, self.dt
+
+        N, nM, nT = 2, 32, 200
+        M0 = torch.rand((N, nM, 3), **dkw).requires_grad_()
+        beff = (torch.rand((N, nM, 3, nT), **dkw)-0.5).requires_grad_()
+        T1, T2 = tensor([[1.]], **dkw), tensor([[4e-2]], **dkw)
+        T1.requires_grad = True
+        kw = {'T2': T2, 'γ': γ, 'dt': dt}
+
+        Mo_ref = sims.blochsim(M0, beff, T1=T1, **kw)
+        grads_ref = torch.autograd.grad(torch.sum(Mo_ref), (beff, M0, T1))
+        Mo_ref, grad_ref = f_t2np(Mo_ref), f_t2np(grads_ref[0])
+
+        for tWindow in ((150, 200), (0, 50), (60, 100), (199, 200)):
+            for kw_ in ({}, {'engine': 'jit'}, {'ckpt': 'sqrt'},
+                        {'doReversible': True}, {'nThreads': 3}):
+                # w/ `Mi`, `T1` constant, and in the graph
+                for n in range(3):
+                    M0_, T1_ = (x.detach().requires_grad_(i < n)
+                                for i, x in enumerate((M0, T1)))
+                    Mo = sims.blochsim(M0_, beff, T1=T1_, tWindow=tWindow,
+                                       **kw, **kw_)
+                    grad, *grads = torch.autograd.grad(
+                        torch.sum(Mo), (beff, M0_, T1_)[:1+n])
+                    grad = f_t2np(grad)
+                    t0, t1 = tWindow
+                    assert(pytest.approx(Mo_ref, abs=atol) == f_t2np(Mo))
+                    assert(pytest.approx(grad_ref[..., t0:t1], abs=atol)
+                           == grad[..., t0:t1])
+                    assert((grad[..., :t0] == 0).all())
+                    assert((grad[..., t1:] == 0).all())
+                    for x_ref, x in zip(grads_ref[1:], grads):
+                        assert(pytest.approx(f_t2np(x_ref), abs=atol)
+                               == f_t2np(x))
+        return
+
+    def test_blochsim_scan(self):
+        f_t2np = lambda x: x.detach().clone().cpu().numpy()  # noqa: E731
+
+        print('\n')
+        dkw, atol = self.dkw, self.atol
+        γ, dt = self.γ, self.dt
+
+        N, nM, nT = 2, 64, 301  # odd `nT` for an unpaired tree node
+        M0 = torch.rand((N, nM, 3), **dkw)
+        beff = torch.rand((N, nM, 3, nT), **dkw)-0.5
+        beff[..., 100:120] = 0  # zero B-effective has no rotation axis
+        M0.requires_grad, beff.requires_grad = True, True
+        T1, T2 = tensor([[1.]], **dkw), tensor([[4e-2]], **dkw)
+
+        for kw in ({'T1': T1, 'T2': T2}, {'T1': None, 'T2': None}):
+            res = []
+            for fn in (sims.blochsim, sims.blochsim_scan):
+                M0.grad, beff.grad = None, None
+                Mo = fn(M0, beff, γ=γ, dt=dt, **kw)
+                torch.sum(Mo).backward()
+                res.append(tuple(f_t2np(x) for x in (Mo, M0.grad, beff.grad)))
+
+            for x_ref, x in zip(*res):
+                assert(pytest.approx(x_ref, abs=atol) == x)
+        return
+
+    def test_blochsim_rle(self):
+        f_t2np = lambda x: x.detach().clone().cpu().numpy()  # noqa: E731
+
+        dkw, atol = self.dkw, self.atol
+        γ, dt = self.γ, self.dt
+
+        # hard pulse plateau, gradient-only gap, then a varying segment
+        N, nM, nT = 1, 64, 300
+        rf, gr = torch.zeros((N, 2, nT), **dkw), torch.zeros((N, 3, nT), **dkw)
+        rf[:, 0, 0:100], gr[:, 2, 100:150] = 0.05, 0.5
+        rf[:, :, 200:] = torch.rand((N, 2, 100), **dkw)*0.05
+        pulse = mobjs.Pulse(rf, gr, dt=dt, **dkw)
+
+        runs = pulse.runlength()
+        assert(runs[0:3].tolist() == [100, 50, 50] and runs.numel() == 103)
+
+        loc = torch.rand((N, nM, 3), **dkw)-0.5
+        beff = pulse.beff(loc, γ=γ)
+        M0 = torch.rand((N, nM, 3), **dkw)
+        T1, T2 = tensor([[1.]], **dkw), tensor([[4e-2]], **dkw)
+        M0.requires_grad, T1.requires_grad = True, True
+
+        Mo_1 = sims.blochsim(M0, beff, T1=T1, T2=T2, γ=γ, dt=dt)
+        grads_1 = torch.autograd.grad(torch.sum(Mo_1), (M0, T1))
+
+        for r in (runs, None):  # runs from `Pulse`, or found from `beff`
+            Mo_2, report = sims.blochsim_rle(M0, beff, T1=T1, T2=T2, γ=γ,
+                                             dt=dt, runs=r, doReport=True)
+            assert(report['nCollapsed'] == nT - 103)
+            assert(pytest.approx(f_t2np(Mo_1), abs=atol) == f_t2np(Mo_2))
+
+        grads_2 = torch.autograd.grad(torch.sum(Mo_2), (M0, T1))
+        for g_1, g_2 in zip(grads_1, grads_2):
+            assert(pytest.approx(f_t2np(g_1), abs=atol) == f_t2np(g_2))
+
+        # ∂L/∂Beff, per step, as from `blochsim`
+        beff.requires_grad = True
+        Mo_1 = sims.blochsim(M0, beff, T1=T1, T2=T2, γ=γ, dt=dt)
+        grads_1 = torch.autograd.grad(torch.sum(Mo_1), (M0, beff))
+
+        Mo_2, report = sims.blochsim_rle(M0, beff, T1=T1, T2=T2, γ=γ, dt=dt,
+                                         runs=runs, doReport=True)
+        assert(report['nCollapsed'] == 0)
+        assert(pytest.approx(f_t2np(Mo_1), abs=atol) == f_t2np(Mo_2))
+
+        grads_2 = torch.autograd.grad(torch.sum(Mo_2), (M0, beff))
+        for g_1, g_2 in zip(grads_1, grads_2):
+            assert(pytest.approx(f_t2np(g_1), abs=atol) == f_t2np(g_2))
+        return
+
+    def test_blochsim_rfoff(self):
+        f_t2np = lambda x: x.detach().clone().cpu().numpy()  # noqa: E731
+
+        dkw, atol = self.dkw, self.atol
+        γ, dt = self.γ, self.dt
+
+        N, nM, nT = 1, 64, 400
+        M0 = torch.rand((N, nM, 3), **dkw)
+        beff = torch.rand((N, nM, 3, nT), **dkw)-0.5
+        beff[..., 0:2, 50:150], beff[..., 0:2, 300:301] = 0, 0  # RF-off
+        beff[..., 0:2, 390:] = 0  # trailing RF-off, e.g. rewinder
+        M0.requires_grad, beff.requires_grad = True, True
+        T1, T2 = tensor([[1.]], **dkw), tensor([[4e-2]], **dkw)
+
+        rfoff = torch.all((beff[..., 0:2, :] == 0).reshape(-1, nT), dim=0)
+
+        for kw in ({'T1': T1, 'T2': T2}, {'T1': None, 'T2': None}):
+            res = []
+            for doFastRFoff, rfoff_ in ((False, None), (True, None),
+                                        (True, rfoff)):
+                Mo = sims.blochsim(M0, beff, γ=γ, dt=dt,
+                                   doFastRFoff=doFastRFoff, rfoff=rfoff_,
+                                   **kw)
+                grads = torch.autograd.grad(torch.sum(Mo), (M0, beff))
+                res.append((f_t2np(Mo), f_t2np(grads[0]),
+                            f_t2np(grads[1][..., 2, :]),
+                            f_t2np(grads[1][..., 0:2, 150:300]),
+                            f_t2np(grads[1])))
+
+            # windows detected from `beff` requiring grad are stepped as usual
+            for x_ref, x in zip(res[0], res[1]):
+                assert(pytest.approx(x_ref, abs=atol) == x)
+            # ∂L/∂Beff[..., 0:2, :] is not provided within given RF-off windows
+            for x_ref, x in zip(res[0][:4], res[2][:4]):
+                assert(pytest.approx(x_ref, abs=atol) == x)
+        return
+
+    def test_blochsim_nohist(self):
+        f_t2np = lambda x: x.detach().clone().cpu().numpy()  # noqa: E731
+
+        dkw, atol = self.dkw, self.atol
+        γ, dt = self.γ, self.dt
+
+        N, nM, nT = 1, 64, 300
+        M0 = torch.rand((N, nM, 3), **dkw)
+        beff = torch.rand((N, nM, 3, nT), **dkw)-0.5
+        beff.requires_grad = True
+        T1, T2 = tensor([[1.]], **dkw), tensor([[4e-2]], **dkw)
+
+        for engine in ('loop', 'jit'):
+            kw = {'T1': T1, 'T2': T2, 'γ': γ, 'dt': dt, 'engine': engine}
+            Mo_1 = sims.blochsim(M0, beff, **kw)
+            with torch.no_grad():
+                Mo_2 = sims.blochsim(M0, beff, **kw)
+            Mo_3 = sims.blochsim(M0, beff.detach(), **kw)
+            assert(Mo_1.requires_grad and not Mo_2.requires_grad)
+            for Mo in (Mo_2, Mo_3):
+                assert(pytest.approx(f_t2np(Mo_1), abs=atol) == f_t2np(Mo))
+
+        # Peak memory must not scale with `nT`. `Beff` is expanded, so that
+        # only `Mhst`-like allocations could scale with `nT`. Measured in
+        # fresh processes, as `ru_maxrss` never decreases.
+        script = (
+            "import resource, torch\n"
+            "from mrphy import sims\n"
+            "nM, nT = 10000, {nT}\n"
+            "kw = {{'dtype': torch.float64}}\n"
+            "M0 = torch.rand((1, nM, 3), **kw)\n"
+            "beff = torch.rand((1, nM, 3, 1), **kw).expand(-1, -1, -1, nT)\n"
+            "rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+            "sims.blochsim(M0, beff, T1=torch.tensor(1.),"
+            " T2=torch.tensor(4e-2), engine='{engine}')\n"
+            "rss1 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+            "print(rss1 - rss0)\n")
+
+        for engine in ('loop', 'jit'):
+            drss = [int(subprocess.run(
+                [sys.executable, '-c', script.format(nT=nT, engine=engine)],
+                capture_output=True, text=True, check=True).stdout)
+                for nT in (10, 2000)]  # KiB on Linux
+            print(f'peak memory increase (KiB), engine={engine}:', drss)
+            # `Mhst` of nT=2000 would take 10000*3*2000*8 B ≈ 470 MiB
+            assert(drss[1] - drss[0] < 32*1024)
+        return
+
     def test_freeprec(self):
         """
         *Note*:
@@ -193,10 +971,45 @@ class Test_sims:
         M0.grad = None
 
         assert(pytest.approx(grad_M0_1, abs=atol) == grad_M0_2)
+
+        # derivatives w.r.t. `dur`, `T1`, `T2`, `Δf`, per spin and broadcast
+        T1s = (torch.rand((N, nM), **dkw)+0.5, tensor([[1.]], **dkw))
+        for T1 in T1s:
+            T2 = (T1/20).detach()
+            dur_ = dur.clone()
+            xs = (M0, dur_, T1, T2, Δf)
+            for x in xs:
+                x.requires_grad = True
+
+            for kw in ({'T1': T1, 'T2': T2, 'Δf': Δf}, {'Δf': Δf},
+                       {'T1': T1, 'T2': T2}):
+                res = []
+                for fn in (slowsims.freeprec, sims.freeprec):
+                    Mo = fn(M0, dur_, **kw)
+                    xs_ = [x for x in xs
+                           if any(x is v for v in kw.values())]
+                    grads = torch.autograd.grad(torch.sum(Mo*Mo),
+                                                [M0, dur_]+xs_)
+                    res.append(tuple(f_t2np(x) for x in grads))
+                for x_ref, x in zip(*res):
+                    assert(pytest.approx(x_ref, abs=atol) == x)
         return
 
 
 if __name__ == '__main__':
     tmp = Test_sims()
     tmp.test_blochsims()
+    tmp.test_blochsim_engines()
+    tmp.test_blochsim_threads()
+    tmp.test_blochsim_workspace()
+    tmp.test_rfgr2beff()
+    tmp.test_blochsim_rfgr()
+    tmp.test_blochsim_ckpt()
+    tmp.test_blochsim_reversible()
+    tmp.test_blochsim_cacherot()
+    tmp.test_blochsim_params()
+    tmp.test_blochsim_jvp()
+    tmp.test_blochsim_hvp()
+    tmp.test_blochsim_window()
+    tmp.test_blochsim_nohist()
     tmp.test_freeprec()
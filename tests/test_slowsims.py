@@ -62,6 +62,10 @@ class Test_slowsims:
         beff = beffective.rfgr2beff(rf, gr, loc, Δf=Δf, b1Map=b1Map, γ=γ)
 
         A, B = beffective.beff2ab(beff, E1=E1, E2=E2, γ=γ, dt=dt)
+        with torch.no_grad():  # in-place steps
+            A4, B4 = beffective.beff2ab(beff, E1=E1, E2=E2, γ=γ, dt=dt)
+        A5, B5 = beffective.beff2ab(beff, E1=E1, E2=E2, γ=γ, dt=dt,
+                                    blkSize=100)
 
         # sim
         Mo1 = slowsims.blochsim(M0, beff, T1=T1, T2=T2, γ=γ, dt=dt)
@@ -72,6 +76,8 @@ class Test_slowsims:
                                              E1, E1_1, E2, γ2πdt)
 
         Mo3 = slowsims.blochsim_ab(M0, A, B)
+        Mo4 = slowsims.blochsim_ab(M0, A4, B4)
+        Mo5 = slowsims.blochsim_ab(M0, A5, B5)
 
         # assertion
         Mo0 = np.array(
@@ -80,8 +86,9 @@ class Test_slowsims:
               [-0.677062008711222, 0.673391604920576, -0.143262993311057]]])
         ref = pytest.approx(Mo0, abs=atol)
 
-        f1, f2, f3 = (self.np(x) == ref for x in (Mo1, Mo2, Mo3))
-        assert(f1 and f2 and f3)
+        f1, f2, f3, f4, f5 = (self.np(x) == ref
+                              for x in (Mo1, Mo2, Mo3, Mo4, Mo5))
+        assert(f1 and f2 and f3 and f4 and f5)
 
         # Verify gradients can chain rule back to `rf` and `gr`
         foo = torch.sum(Mo1)
@@ -86,6 +86,16 @@ class Test_utils:
         assert(to_np(rf0) == pytest.approx(to_np(rf1), abs=atol))
         return
 
+    def test_runlength(self):
+        dkw = self.dkw
+        x = tensor([[[1., 1., 2., 2., 2., 3.],
+                     [0., 0., 0., 0., 0., 0.]]], **dkw)
+        assert(utils.runlength(x).tolist() == [2, 3, 1])
+        assert(utils.runlength(x, dim=1).tolist() == [1, 1])
+        x[0, 1, 3] = 1  # a change in any slice entry breaks the run
+        assert(utils.runlength(x).tolist() == [2, 1, 1, 1, 1])
+        return
+
     def test_sclamptan(self):
         shape, smax, atol = (1, 3, 10), smax0, self.atol
         s0 = utils.sclamp(smax0*((torch.rand(shape)-0.5)*4), smax)
@@ -94,6 +104,34 @@ class Test_utils:
         assert(to_np(s0) == pytest.approx(to_np(s1), abs=atol))
         return
 
+    def test_workspace(self):
+        dkw = self.dkw
+        nbyte = torch.empty((), **dkw).element_size()
+
+        with utils.Workspace() as ws:
+            x, y = ws.borrow((2, 3), **dkw), ws.borrow((2, 3), **dkw)
+            assert(x.data_ptr() != y.data_ptr() and ws.nbytes == 0)
+            ws.release(x, None)
+            assert(ws.nbytes == 6*nbyte)
+            assert(ws.borrow((2, 3), **dkw) is x)  # reused
+            assert(ws.borrow((3, 2), **dkw) is not y)  # keyed by shape
+            ws.release(x, y)
+        assert(ws.nbytes == 0)  # cleared on exit
+
+        # index-less device strings, e.g., `'cuda'`, key as `x.device`
+        with utils.Workspace() as ws:
+            kw = {'dtype': self.dtype, 'device': self.device.type}
+            x = ws.borrow((2, 3), **kw)
+            ws.release(x)
+            assert(ws.borrow((2, 3), **kw) is x)  # reused
+
+        ws = utils.Workspace(maxBytes=8*nbyte)
+        ws.release(*(ws.borrow((2, 3), **dkw) for _ in range(2)))
+        assert(ws.nbytes == 6*nbyte)  # 2nd one dropped, beyond the cap
+        ws.clear()
+        assert(ws.nbytes == 0)
+        return
+
 
 if __name__ == '__main__':
     tmp = Test_utils()
@@ -101,4 +139,6 @@ if __name__ == '__main__':
     tmp.test_kgs()
     tmp.test_rc_rf()
     tmp.test_rfclamptan()
+    tmp.test_runlength()
     tmp.test_sclamptan()
+    tmp.test_workspace()